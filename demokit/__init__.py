@@ -0,0 +1,38 @@
+"""
+CMU Graphics - Demo Toolkit
+===========================
+Tools for measuring and running the demos in this repository. None of the
+demos need this package; it loads them from the outside.
+
+Modules:
+- stub_cmu_graphics: a stand-in for the cmu_graphics library that keeps
+  track of shapes and property writes but never opens a window
+- loader: loads a demo script against cmu_graphics (or the stand-in)
+  without blocking in cmu_graphics.run()
+- bench: drives each demo's callbacks for N frames and reports frame
+  times and property writes as JSON
+- coalesce: buffers shape property writes until the end of a frame and
+  drops the overwritten and unchanged ones
+- raster: draws shapes into a Pillow image without a window
+- static_layer: draws the shapes that never change into cached images so
+  only the moving shapes are drawn each frame
+- culling: hides the shapes that are out of view or transparent, and
+  shows them again when they come back
+- export: renders a demo's frames to a GIF or PNG files, drawing them in
+  a process pool
+- profiler: times each callback and the demo's own functions, counts
+  frames over the step budget and can show the frame rate on the canvas
+- geometry: the outlines of shapes as points, for raster and picking
+- picking: finds the shape under a point with a grid of bounding boxes
+  and exact tests that follow rotateAngle
+- replay: records a demo's input callbacks with their frames and replays
+  them exactly, seeking from periodic snapshots of the demo's state
+- launcher: switches between several demos in one window, building
+  each one the first time it is shown
+- scene: loads scenes described in JSON or TOML files, validated once and
+  cached in a compiled form keyed by the file's hash
+- run: runs a demo in a real cmu_graphics window with features switched on
+
+Run the tools from the repository root, for example:
+    python -m demokit.bench --frames 300 --out bench.json
+"""
@@ -0,0 +1,265 @@
+"""
+CMU Graphics - Demo Benchmark
+=============================
+Measures how much work each demo does per frame, without a display.
+
+Each demo is loaded against the stand-in cmu_graphics module (see
+stub_cmu_graphics.py) and then driven for N frames by a fixed script of
+inputs: onStep every frame (unless app.paused), plus key presses, held
+arrow keys, key releases and mouse clicks at set frames. The same inputs
+are used every run, so two runs on different revisions can be compared.
+
+For every demo the benchmark reports:
+- frames per second: how many frames the callbacks could run per second
+- mean and 99th-percentile time of each callback (onStep, onKeyPress, ...)
+- property writes per frame (ball.centerX = ..., shadow.opacity = ...)
+
+Run from the repository root:
+    python -m demokit.bench
+    python -m demokit.bench --frames 1000 --out bench.json
+    python -m demokit.bench --compare bench.json     (flag regressions)
+    python -m demokit.bench "projects/bouncing_ball/main.py --balls 2000"
+    python -m demokit.bench --coalesce      (buffer writes, see coalesce.py)
+    python -m demokit.bench --cull          (hide shapes out of view, see culling.py)
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import shlex
+import subprocess
+import sys
+import time
+
+from demokit.coalesce import installCoalescer
+from demokit.culling import installCuller
+from demokit.loader import REPO_ROOT, loadDemo
+
+DEFAULT_DEMOS = [
+    'basics/shapes.py',
+    'basics/simple_animation.py',
+    'projects/bouncing_ball/main.py',
+    'projects/timeline/main.py',
+    'projects/orbits/main.py',
+]
+
+# The input script: which keys are pressed and held, and when
+KEY_PRESSES = ['up', 'left', 'right', 'space', 'space', 'r']
+KEY_PRESS_EVERY = 45        # frames between key presses
+HOLD_EVERY = 120            # frames between the starts of held-key periods
+HOLD_FRAMES = 15            # how long each arrow key is held
+CLICK_EVERY = 90            # frames between mouse clicks
+
+# A metric is a regression if it got this much worse (0.25 = 25%) ...
+DEFAULT_TOLERANCE = 0.25
+# ... and by more than this much in absolute terms, so tiny timings that
+# jitter from run to run don't count
+MIN_MS_CHANGE = 0.01
+MIN_WRITES_CHANGE = 0.5
+
+
+def inputsForFrame(frame, rng):
+    """
+    The input callbacks to call on `frame`, as a list of (name, args).
+    cmu_graphics handles input events before calling onStep, so the
+    benchmark does the same.
+    """
+    events = []
+    if frame % KEY_PRESS_EVERY == KEY_PRESS_EVERY - 1:
+        key = KEY_PRESSES[(frame // KEY_PRESS_EVERY) % len(KEY_PRESSES)]
+        events.append(('onKeyPress', (key,)))
+
+    holdFrame = frame % HOLD_EVERY
+    heldKey = 'left' if (frame // HOLD_EVERY) % 2 == 0 else 'right'
+    if holdFrame < HOLD_FRAMES:
+        events.append(('onKeyHold', ([heldKey],)))
+    elif holdFrame == HOLD_FRAMES:
+        events.append(('onKeyRelease', (heldKey,)))
+
+    if frame % CLICK_EVERY == CLICK_EVERY - 1:
+        events.append(('onMousePress', (rng.randrange(20, 380),
+                                        rng.randrange(40, 300))))
+    return events
+
+
+def percentile(sortedTimes, fraction):
+    if not sortedTimes:
+        return 0.0
+    return sortedTimes[min(len(sortedTimes) - 1, int(len(sortedTimes) * fraction))]
+
+
+def summarizeTimes(times):
+    times = sorted(times)
+    return {
+        'calls': len(times),
+        'meanMs': sum(times) / len(times) if times else 0.0,
+        'p99Ms': percentile(times, 0.99),
+    }
+
+
+def benchDemo(spec, frames, seed=0, coalesce=False, cull=False):
+    """
+    Loads the demo described by `spec` ("path [args...]"), drives it for
+    `frames` frames and returns its results as a dictionary. With
+    coalesce=True the demo's property writes go through a Coalescer; with
+    cull=True a Culler hides the shapes out of view after every callback.
+    """
+    path, *args = shlex.split(spec)
+    start = time.perf_counter()
+    demo = loadDemo(path, args, seed=seed)
+    loadMs = (time.perf_counter() - start) * 1000
+    coalescer = installCoalescer(demo) if coalesce else None
+    culler = installCuller(demo) if cull else None
+
+    backend = demo.cmu.backend
+    rng = random.Random(seed)
+    callbackTimes = {}
+    frameTimes = []
+    frameWrites = []
+
+    backend.startFrame()
+    for frame in range(frames):
+        events = inputsForFrame(frame, rng)
+        if not demo.app.paused:
+            events.append(('onStep', ()))
+
+        frameMs = 0.0
+        for name, eventArgs in events:
+            fn = demo.callback(name)
+            if fn is None:
+                continue
+            callStart = time.perf_counter()
+            fn(*eventArgs)
+            ms = (time.perf_counter() - callStart) * 1000
+            callbackTimes.setdefault(name, []).append(ms)
+            frameMs += ms
+        frameTimes.append(frameMs)
+        frameWrites.append(backend.startFrame())
+
+    totalSeconds = sum(frameTimes) / 1000
+    frameSummary = summarizeTimes(frameTimes)
+    result = {
+        'loadMs': loadMs,
+        'shapes': len(backend.shapes),
+        'frames': frames,
+        'fps': frames / totalSeconds if totalSeconds > 0 else None,
+        'frameMs': {'mean': frameSummary['meanMs'], 'p99': frameSummary['p99Ms']},
+        'writesPerFrame': sum(frameWrites) / frames if frames else 0.0,
+        'callbacks': {name: summarizeTimes(times)
+                      for name, times in sorted(callbackTimes.items())},
+    }
+    if coalescer is not None:
+        result['coalescer'] = coalescer.report()
+    if culler is not None:
+        result['culler'] = culler.report()
+    return result
+
+
+def gitRevision():
+    """The current git commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              cwd=REPO_ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def findRegressions(old, new, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compares two benchmark results (as loaded from the JSON files) and
+    returns a list of messages, one for each metric that got worse.
+    """
+    messages = []
+    for spec, newResult in new['demos'].items():
+        oldResult = old['demos'].get(spec)
+        if oldResult is None:
+            continue
+        checks = [
+            ('mean frame time', oldResult['frameMs']['mean'],
+             newResult['frameMs']['mean'], MIN_MS_CHANGE, 'ms'),
+            ('p99 frame time', oldResult['frameMs']['p99'],
+             newResult['frameMs']['p99'], MIN_MS_CHANGE, 'ms'),
+            ('writes per frame', oldResult['writesPerFrame'],
+             newResult['writesPerFrame'], MIN_WRITES_CHANGE, ''),
+        ]
+        for name, before, after, minChange, unit in checks:
+            if after > before * (1 + tolerance) and after - before > minChange:
+                messages.append(f'{spec}: {name} went from {before:.3f}{unit} '
+                                f'to {after:.3f}{unit}')
+    return messages
+
+
+def printResults(results):
+    for spec, result in results['demos'].items():
+        fps = result['fps']
+        fpsText = f'{fps:,.0f}' if fps is not None else 'n/a (no callbacks)'
+        print(f'{spec}')
+        print(f'  load {result["loadMs"]:.1f} ms, {result["shapes"]} shapes, '
+              f'{fpsText} frames/sec, {result["writesPerFrame"]:.1f} writes/frame')
+        if 'coalescer' in result:
+            writes = result['coalescer']
+            print(f'  coalescer: {writes["requested"]:.1f} writes requested per step, '
+                  f'{writes["saved"]:.1f} saved ({writes["superseded"]:.1f} '
+                  f'overwritten, {writes["unchanged"]:.1f} unchanged)')
+        if 'culler' in result:
+            culled = result['culler']
+            print(f'  culler: {culled["culled"]:.1f} of {culled["shapes"]:.1f} '
+                  f'shapes culled per frame ({culled["offCanvas"]:.1f} out of '
+                  f'view, {culled["transparent"]:.1f} transparent), at most '
+                  f'{culled["mostCulled"]}')
+        for name, stats in result['callbacks'].items():
+            print(f'  {name:<14} {stats["calls"]:>6} calls   '
+                  f'mean {stats["meanMs"]:.4f} ms   p99 {stats["p99Ms"]:.4f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the demos headlessly')
+    parser.add_argument('demos', nargs='*', default=DEFAULT_DEMOS,
+                        help='demo scripts, optionally with arguments in quotes')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='save the results to this JSON file')
+    parser.add_argument('--compare', metavar='JSON',
+                        help='earlier results to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--coalesce', action='store_true',
+                        help='buffer property writes and report writes saved')
+    parser.add_argument('--cull', action='store_true',
+                        help='hide the shapes out of view and report how many')
+    args = parser.parse_args()
+
+    results = {
+        'revision': gitRevision(),
+        'python': platform.python_version(),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'frames': args.frames,
+        'coalesce': args.coalesce,
+        'cull': args.cull,
+        'demos': {spec: benchDemo(spec, args.frames, args.seed, args.coalesce,
+                                  args.cull)
+                  for spec in args.demos},
+    }
+    printResults(results)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Saved results to {args.out}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        regressions = findRegressions(old, results, args.tolerance)
+        print(f'Compared with revision {old.get("revision")}: '
+              f'{len(regressions)} regression(s)')
+        for message in regressions:
+            print('  ' + message)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
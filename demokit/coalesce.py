@@ -0,0 +1,218 @@
+"""
+CMU Graphics - Property Write Coalescer
+=======================================
+Cuts down the number of shape property writes a demo makes per frame.
+
+Every assignment like `ball.centerX = 100` is sent straight to cmu_graphics,
+which updates the shape right away. Many of those writes are wasted:
+
+- simple_animation.py moves movingCircle.centerX twice in one onStep, so
+  the first write is overwritten before the frame is ever drawn
+- the bouncing ball sets shadow.width and shadow.opacity every step, even
+  when the ball hasn't moved and the values are the same as before
+
+installCoalescer() replaces each shape in a loaded demo's global variables
+with a ShapeProxy. A proxy keeps property writes in a small dictionary
+instead of sending them on. Writing a property again replaces the waiting
+value, and reading it back gives the waiting value. When the callback
+returns (the end of the frame, just before cmu_graphics redraws), every
+proxy sends its waiting writes to its shape in one go, skipping the ones
+that would not change anything.
+
+    demo = loadDemo('basics/simple_animation.py')
+    coalescer = installCoalescer(demo)
+    demo.call('onStep')
+    print(coalescer.lastFrame)   # writes requested, applied and saved
+
+Shapes that are not global variables (for example the swarm's Circles,
+which live in a list) are left alone.
+"""
+
+from demokit.loader import CALLBACK_NAMES, sameArity
+
+
+def isShape(value):
+    """
+    True for cmu_graphics shapes (real or stand-in): anything whose class has
+    the hits() and toFront() shape methods.
+    """
+    cls = type(value)
+    return callable(getattr(cls, 'hits', None)) and \
+        callable(getattr(cls, 'toFront', None))
+
+
+class ShapeProxy:
+    """
+    Stands in for one shape. Property writes wait in _pending until
+    flush(); reading a property that is waiting returns the waiting value.
+    Reading any other property, or calling a shape method (contains,
+    toFront, ...), flushes first, so the shape is always up to date when
+    cmu_graphics itself has to look at it.
+    """
+
+    def __init__(self, shape, coalescer):
+        object.__setattr__(self, '_shape', shape)
+        object.__setattr__(self, '_pending', {})
+        object.__setattr__(self, '_coalescer', coalescer)
+
+    def __getattr__(self, name):
+        pending = self._pending
+        if name in pending:
+            return pending[name]
+        if pending:
+            self.flush()
+        shape = self._shape
+        if callable(getattr(type(shape), name, None)):
+            method = getattr(shape, name)
+
+            def callMethod(*args, **kwargs):
+                self.flush()
+                args = [unwrap(arg) for arg in args]
+                return method(*args, **kwargs)
+            return callMethod
+        return getattr(shape, name)
+
+    def __setattr__(self, name, value):
+        pending = self._pending
+        coalescer = self._coalescer
+        coalescer.requested += 1
+        if not pending:
+            coalescer.dirty.append(self)
+        elif name in pending:
+            # Overwritten before it was drawn. Remove it so the new value
+            # goes to the end: the order of the remaining writes is kept
+            # (setting left after centerX must still win).
+            coalescer.superseded += 1
+            del pending[name]
+        pending[name] = value
+
+    def flush(self):
+        """Sends the waiting writes to the shape, skipping unchanged values."""
+        pending = self._pending
+        if not pending:
+            return
+        shape = self._shape
+        coalescer = self._coalescer
+        for name, value in pending.items():
+            try:
+                unchanged = getattr(shape, name) == value
+            except AttributeError:
+                unchanged = False
+            if unchanged:
+                coalescer.unchanged += 1
+            else:
+                setattr(shape, name, value)
+                coalescer.applied += 1
+        pending.clear()
+
+    def __iter__(self):
+        self.flush()
+        return iter(self._shape)
+
+    def __len__(self):
+        self.flush()
+        return len(self._shape)
+
+    def __repr__(self):
+        return f'ShapeProxy({self._shape!r})'
+
+
+def unwrap(value):
+    """The real shape behind a proxy (anything else is returned as is)."""
+    if isinstance(value, ShapeProxy):
+        value.flush()
+        return value._shape
+    return value
+
+
+class Coalescer:
+    """
+    Keeps track of the proxies with waiting writes and counts, for each
+    frame and in total:
+
+      requested  - property writes the demo made
+      superseded - writes overwritten by a later write in the same frame
+      unchanged  - writes dropped because the shape already had that value
+      applied    - writes actually sent to cmu_graphics
+    """
+
+    COUNTERS = ['requested', 'superseded', 'unchanged', 'applied']
+
+    def __init__(self):
+        self.dirty = []
+        self.frames = 0
+        self.totals = dict.fromkeys(self.COUNTERS, 0)
+        self.lastFrame = dict.fromkeys(self.COUNTERS, 0)
+        self.lastFrame['saved'] = 0
+        self.resetCounters()
+
+    def resetCounters(self):
+        self.requested = 0
+        self.superseded = 0
+        self.unchanged = 0
+        self.applied = 0
+
+    def proxy(self, shape):
+        return ShapeProxy(shape, self)
+
+    def flush(self):
+        """Sends every proxy's waiting writes to its shape."""
+        dirty = self.dirty
+        self.dirty = []
+        for proxy in dirty:
+            proxy.flush()
+
+    def endFrame(self):
+        """
+        Flushes every proxy with waiting writes, then stores this frame's
+        counters in lastFrame (plus 'saved', the writes that were skipped)
+        and adds them to the totals.
+        """
+        self.flush()
+        frame = {name: getattr(self, name) for name in self.COUNTERS}
+        frame['saved'] = frame['superseded'] + frame['unchanged']
+        for name in self.COUNTERS:
+            self.totals[name] += frame[name]
+        self.frames += 1
+        self.lastFrame = frame
+        self.resetCounters()
+        return frame
+
+    def report(self):
+        """Average writes per frame so far, as a dictionary."""
+        frames = max(self.frames, 1)
+        report = {name: self.totals[name] / frames for name in self.COUNTERS}
+        report['saved'] = report['superseded'] + report['unchanged']
+        return report
+
+
+def installCoalescer(demo):
+    """
+    Puts a ShapeProxy in place of every shape in the demo's global
+    variables, and makes each of the demo's callbacks flush the waiting
+    writes when it returns. A frame ends after each onStep: the counters
+    for a frame include the writes of any key or mouse callbacks before it.
+    Returns the Coalescer.
+    """
+    coalescer = Coalescer()
+    namespace = demo.namespace
+    for name, value in list(namespace.items()):
+        if isShape(value):
+            namespace[name] = coalescer.proxy(value)
+
+    for name in CALLBACK_NAMES:
+        fn = demo.callback(name)
+        if fn is None:
+            continue
+
+        finish = coalescer.endFrame if name == 'onStep' else coalescer.flush
+
+        def flushAfter(*args, fn=fn, finish=finish):
+            try:
+                fn(*args)
+            finally:
+                finish()
+
+        namespace[name] = sameArity(fn, flushAfter)
+    demo.coalescer = coalescer
+    return coalescer
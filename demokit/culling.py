@@ -0,0 +1,479 @@
+"""
+CMU Graphics - Culling Shapes Out of View
+=========================================
+Hides the shapes that can't be seen, so cmu_graphics doesn't draw them,
+and shows them again as soon as they can.
+
+cmu_graphics draws every visible shape on every frame, even one that is
+entirely off the canvas or has opacity 0. In a scrolling scene, or a world
+bigger than the 400x400 canvas, most shapes can be out of view at any
+time. A Culler checks every shape once per frame, after the demo's
+callback:
+
+- A shape whose bounding box (rotation, border and line width included)
+  doesn't touch the viewport, or whose opacity is 0, is culled: its
+  visible is set to False. A Group with opacity 0 is culled as a whole.
+- A culled shape that is back in view (or no longer transparent) is
+  reinstated: it is shown again.
+- Shapes the demo hid itself are left alone.
+
+The bounding box is kept around the shape's center, so a shape that only
+moves costs three property reads per frame (visible, centerX and
+centerY). Its size, rotation and opacity are only looked at again when
+they may have changed: right after a write to them through a CullProxy
+(see below), and for shapes without a proxy, once every
+RECHECK_FRAMES frames, spread out over the frames. So a shape without a
+proxy that grows into view, or stops being transparent, may stay hidden
+for up to RECHECK_FRAMES frames.
+
+Culling also keeps shapes out of animation updates where it can. Every
+shape in the demo's global variables is put behind a CullProxy. While the
+shape is culled, the proxy holds on to writes of properties that don't
+change where the shape is (fill and dashes, see DEFERRED_PROPERTIES),
+and sends only the last value of each when the shape is reinstated.
+Writes that move or resize the shape go through, so it is noticed when it
+comes back. Writing `visible` through the proxy sets what the demo wants
+once the shape is in view. Shapes that aren't global variables (like the
+bouncing ball's swarm Circles) have no proxy. Hiding such a shape while it
+is culled doesn't stick: it is shown again when it comes back into view.
+
+Every frame's counts are kept in culler.lastFrame:
+
+  shapes      - shapes checked (not counting the ones the demo hid)
+  culled      - shapes culled at the end of the frame
+  offCanvas   - of those, culled for being out of the viewport
+  transparent - of those, culled for having opacity 0
+  reinstated  - shapes shown again in this frame
+  deferred    - writes held back by the proxies in this frame
+
+    demo = loadDemo('basics/simple_animation.py')
+    culler = installCuller(demo)
+    demo.call('onStep')
+    print(culler.lastFrame['culled'])
+
+Prerequisites:
+- Python 3.6+
+- Pillow installed (only for the benchmark's drawing times)
+
+Run a demo with culling in a window, with the culled count on the canvas:
+    python -m demokit.run --cull projects/bouncing_ball/main.py
+Compare drawing a scrolling world with and without culling:
+    python -m demokit.culling
+    python -m demokit.culling --shapes 5000 --world-width 8000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from demokit.geometry import children, shapeKind
+from demokit.picking import shapeGeometry
+
+# Properties that don't change where a shape is; their writes wait while the
+# shape is culled
+DEFERRED_PROPERTIES = {'fill', 'dashes'}
+
+# Writes through a CullProxy that only move a shape (or show or hide it);
+# any other write has the shape's size, rotation and opacity looked at
+# again on the next update
+MOVING_PROPERTIES = {'centerX', 'centerY', 'left', 'top', 'right', 'bottom',
+                     'visible'}
+
+# A shape without a proxy has its size, rotation and opacity looked at again
+# once in this many frames
+RECHECK_FRAMES = 10
+
+# The culled count on the canvas (with overlay=True) is updated this often
+OVERLAY_EVERY = 15
+
+
+class CullEntry:
+    """What a Culler knows about one shape."""
+
+    __slots__ = ('shape', 'kind', 'key', 'box', 'transparent', 'dirty',
+                 'recheck', 'culled', 'wantVisible', 'proxy')
+
+    def __init__(self, shape, kind, recheck):
+        self.shape = shape
+        self.kind = kind
+        self.key = None
+        self.box = None             # relative to the center
+        self.transparent = False
+        self.dirty = True           # size or opacity may have changed
+        self.recheck = recheck      # frame (mod RECHECK_FRAMES) to recheck
+        self.culled = None          # None, 'offCanvas' or 'transparent'
+        self.wantVisible = True     # visible, as the demo last set it
+        self.proxy = None
+
+
+class CullProxy:
+    """
+    Stands in for a shape in the demo's global variables. While the shape
+    is culled, writes to DEFERRED_PROPERTIES wait in _pending, and
+    `visible` reads and writes what the demo wants rather than the shape's
+    real (hidden) state.
+    """
+
+    def __init__(self, shape, entry, culler):
+        object.__setattr__(self, '_shape', shape)
+        object.__setattr__(self, '_entry', entry)
+        object.__setattr__(self, '_culler', culler)
+        object.__setattr__(self, '_pending', {})
+
+    def __getattr__(self, name):
+        pending = self._pending
+        if name in pending:
+            return pending[name]
+        entry = self._entry
+        if name == 'visible' and entry.culled:
+            return entry.wantVisible
+        shape = self._shape
+        if callable(getattr(type(shape), name, None)):
+            method = getattr(shape, name)
+
+            def callMethod(*args, **kwargs):
+                # A method (addPoint, ...) may change the shape's size
+                self._entry.dirty = True
+                args = [value._shape if isinstance(value, CullProxy) else value
+                        for value in args]
+                return method(*args, **kwargs)
+            return callMethod
+        return getattr(shape, name)
+
+    def __setattr__(self, name, value):
+        entry = self._entry
+        if name not in MOVING_PROPERTIES:
+            entry.dirty = True
+        if entry.culled:
+            if name == 'visible':
+                entry.wantVisible = value
+                return
+            if name in DEFERRED_PROPERTIES:
+                self._pending[name] = value
+                self._culler.deferred += 1
+                return
+        setattr(self._shape, name, value)
+
+    def release(self):
+        """Sends the writes that waited while the shape was culled."""
+        pending = self._pending
+        for name, value in pending.items():
+            setattr(self._shape, name, value)
+        if pending:
+            self._entry.dirty = True
+        pending.clear()
+
+    def __iter__(self):
+        return iter(self._shape)
+
+    def __len__(self):
+        return len(self._shape)
+
+    def __repr__(self):
+        return f'CullProxy({self._shape!r})'
+
+
+class Culler:
+    """
+    Culls the shapes in `root` (app.group) that are outside `viewport`
+    (left, top, right, bottom; the canvas by default) or transparent.
+    Call update() once per frame.
+    """
+
+    COUNTERS = ['shapes', 'culled', 'offCanvas', 'transparent', 'reinstated',
+                'deferred']
+
+    def __init__(self, root, viewport):
+        self.root = root
+        self.viewport = viewport
+        self.entries = {}           # id(base shape) -> CullEntry
+        self.deferred = 0
+        self.frames = 0
+        self.totals = dict.fromkeys(self.COUNTERS, 0)
+        self.lastFrame = dict.fromkeys(self.COUNTERS, 0)
+        self.mostCulled = 0
+
+    def entry(self, shape):
+        entry = self.entries.get(id(shape))
+        if entry is None:
+            entry = CullEntry(shape, shapeKind(shape),
+                              len(self.entries) % RECHECK_FRAMES)
+            self.entries[id(shape)] = entry
+        return entry
+
+    def setViewport(self, left, top, right, bottom):
+        """Culls against another part of the canvas from the next update."""
+        self.viewport = (left, top, right, bottom)
+
+    # -------------------------------------------------------------------------
+    # Culling
+    # -------------------------------------------------------------------------
+    def update(self):
+        """Culls and reinstates shapes; returns this frame's counts."""
+        frame = dict.fromkeys(self.COUNTERS, 0)
+        seen = set()
+        self.recheck = self.frames % RECHECK_FRAMES
+        self.visit(self.root, frame, seen)
+        if len(seen) != len(self.entries):
+            # Shapes were removed from the canvas
+            self.entries = {key: entry for key, entry in self.entries.items()
+                            if key in seen}
+        frame['deferred'] = self.deferred
+        self.deferred = 0
+        for name in self.COUNTERS:
+            self.totals[name] += frame[name]
+        self.frames += 1
+        self.mostCulled = max(self.mostCulled, frame['culled'])
+        self.lastFrame = frame
+        return frame
+
+    def visit(self, group, frame, seen):
+        for shape in children(group):
+            entry = self.entry(shape)
+            seen.add(id(shape))
+            if entry.culled:
+                if shape.visible:
+                    # Shown by the demo while culled: that's what it wants now
+                    entry.wantVisible = True
+                elif not entry.wantVisible:
+                    self.reinstate(entry, frame)
+                    continue
+            elif not shape.visible:
+                # Hidden by the demo
+                entry.wantVisible = False
+                continue
+            frame['shapes'] += 1
+
+            if entry.kind == 'Group':
+                reason = 'transparent' if shape.opacity == 0 else None
+                if reason is None:
+                    if entry.culled:
+                        self.reinstate(entry, frame)
+                    self.visit(shape, frame, seen)
+                    continue
+            else:
+                reason = self.reason(entry)
+
+            if reason is None:
+                if entry.culled:
+                    self.reinstate(entry, frame)
+                continue
+            if not entry.culled or shape.visible:
+                shape.visible = False
+            entry.culled = reason
+            frame['culled'] += 1
+            frame[reason] += 1
+
+    def reason(self, entry):
+        """'transparent', 'offCanvas' or None (the shape can be seen)."""
+        shape = entry.shape
+        if entry.dirty or (entry.proxy is None
+                           and entry.recheck == self.recheck):
+            entry.dirty = False
+            entry.transparent = shape.opacity == 0
+            if entry.transparent:
+                return 'transparent'
+            key = sizeKey(shape, entry.kind)
+            if key != entry.key:
+                entry.key = key
+                cx, cy = shape.centerX, shape.centerY
+                left, top, right, bottom = shapeBox(shape, entry.kind)
+                entry.box = (left - cx, top - cy, right - cx, bottom - cy)
+        elif entry.transparent:
+            return 'transparent'
+
+        cx, cy = shape.centerX, shape.centerY
+        left, top, right, bottom = entry.box
+        viewLeft, viewTop, viewRight, viewBottom = self.viewport
+        if (right + cx < viewLeft or left + cx > viewRight
+                or bottom + cy < viewTop or top + cy > viewBottom):
+            return 'offCanvas'
+        return None
+
+    def reinstate(self, entry, frame):
+        entry.culled = None
+        if entry.proxy is not None:
+            entry.proxy.release()
+        entry.shape.visible = entry.wantVisible
+        frame['reinstated'] += 1
+
+    def reinstateAll(self):
+        """Shows every culled shape again (to switch culling off)."""
+        frame = dict.fromkeys(self.COUNTERS, 0)
+        for entry in self.entries.values():
+            if entry.culled:
+                self.reinstate(entry, frame)
+
+    # -------------------------------------------------------------------------
+    # Proxies and reporting
+    # -------------------------------------------------------------------------
+    def proxy(self, shape, base):
+        """A CullProxy for `shape` (which may itself be a proxy of `base`)."""
+        entry = self.entry(base)
+        entry.proxy = CullProxy(shape, entry, self)
+        return entry.proxy
+
+    def report(self):
+        """Average counts per frame, and the most shapes culled at once."""
+        frames = max(self.frames, 1)
+        report = {name: self.totals[name] / frames for name in self.COUNTERS}
+        report['mostCulled'] = self.mostCulled
+        return report
+
+
+def sizeKey(shape, kind):
+    """
+    The properties the size of a shape's box depends on (but not where it
+    is, apart from a Polygon's points).
+    """
+    if kind == 'Line':
+        return (shape.width, shape.height, shape.lineWidth)
+    key = (shape.width, shape.height, shape.rotateAngle)
+    if kind == 'Label':
+        return key
+    if kind == 'Polygon':
+        key += (tuple(map(tuple, shape.pointList)),)
+    key += (shape.border is None, shape.borderWidth, shape.fill is None)
+    if kind in ('Star', 'RegularPolygon'):
+        return key + (shape.points,)
+    if kind == 'Arc':
+        return key + (shape.startAngle, shape.sweepAngle)
+    return key
+
+
+def shapeBox(shape, kind):
+    """The shape's bounding box as drawn, border included."""
+    geometry, (left, top, right, bottom) = shapeGeometry(shape, kind)
+    if kind not in ('Line', 'Label') and shape.border is not None:
+        half = shape.borderWidth / 2
+        return left - half, top - half, right + half, bottom + half
+    return left, top, right, bottom
+
+
+def installCuller(demo, viewport=None, overlay=False):
+    """
+    Culls the demo's shapes after every callback, and puts a CullProxy in
+    front of every shape in its global variables. The viewport is the
+    canvas unless given. With overlay=True, a Label in the top-right
+    corner shows how many shapes were culled. Returns the Culler (also set
+    as demo.culler).
+    """
+    from demokit.coalesce import isShape
+    from demokit.loader import CALLBACK_NAMES, sameArity
+    from demokit.static_layer import baseShape
+
+    app = demo.app
+    namespace = demo.namespace
+    culler = Culler(app.group, viewport or (0, 0, app.width, app.height))
+    for name, value in list(namespace.items()):
+        base = baseShape(value)
+        if isShape(base) and shapeKind(base) != 'Group':
+            namespace[name] = culler.proxy(value, base)
+
+    label = None
+    if overlay:
+        label = demo.cmu.Label('', app.width - 5, 10, size=10, fill='gray',
+                               align='right')
+
+    def afterCallback(name):
+        frame = culler.update()
+        if label is not None and name == 'onStep' and \
+                culler.frames % OVERLAY_EVERY == 0:
+            label.value = f'{frame["culled"]} of {frame["shapes"]} culled'
+            label.toFront()
+
+    for name in CALLBACK_NAMES:
+        fn = demo.callback(name)
+        if fn is None:
+            continue
+
+        def cullAfter(*args, fn=fn, name=name):
+            try:
+                return fn(*args)
+            finally:
+                afterCallback(name)
+
+        namespace[name] = sameArity(fn, cullAfter)
+    culler.update()
+    demo.culler = culler
+    return culler
+
+
+# =============================================================================
+# MEASURING
+# =============================================================================
+
+def scrollingWorld(cmu, count, worldWidth, rng):
+    """`count` shapes scattered over a world `worldWidth` pixels wide."""
+    shapes = []
+    for i in range(count):
+        x, y = rng.uniform(0, worldWidth), rng.uniform(20, 380)
+        kind = i % 4
+        if kind == 0:
+            shape = cmu.Rect(x, y, rng.uniform(10, 40), rng.uniform(10, 40),
+                             fill='steelBlue', rotateAngle=rng.uniform(0, 90))
+        elif kind == 1:
+            shape = cmu.Circle(x, y, rng.uniform(5, 20), fill='crimson',
+                               border='black')
+        elif kind == 2:
+            shape = cmu.Star(x, y, rng.uniform(8, 20), 5, fill='gold')
+        else:
+            shape = cmu.Oval(x, y, 30, 14, fill='teal',
+                             opacity=0 if i % 12 == 3 else 100)
+        shapes.append(shape)
+    return shapes
+
+
+def timeScrolling(count, worldWidth, frames, cull, speed=4):
+    """
+    Scrolls the world left `speed` pixels per frame, wrapping around, and
+    returns (ms per frame to move, ms to cull, ms to draw, culled per frame).
+    """
+    from demokit import raster, stub_cmu_graphics
+
+    cmu = stub_cmu_graphics.makeModule()
+    shapes = scrollingWorld(cmu, count, worldWidth, random.Random(count))
+    culler = Culler(cmu.app.group, (0, 0, 400, 400)) if cull else None
+    moveMs = cullMs = drawMs = 0.0
+    culled = 0
+    for frame in range(frames):
+        start = time.perf_counter()
+        for shape in shapes:
+            x = shape.centerX - speed
+            shape.centerX = x + worldWidth if x < -50 else x
+        moved = time.perf_counter()
+        if culler is not None:
+            culled += culler.update()['culled']
+        culledAt = time.perf_counter()
+        raster.render(cmu.app.group, 400, 400)
+        drawMs += (time.perf_counter() - culledAt) * 1000
+        moveMs += (moved - start) * 1000
+        cullMs += (culledAt - moved) * 1000
+    return moveMs / frames, cullMs / frames, drawMs / frames, culled / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Time drawing a scrolling world with and without culling')
+    parser.add_argument('--shapes', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--world-width', type=int, default=4000,
+                        help='width of the world the canvas scrolls over')
+    parser.add_argument('--frames', type=int, default=60)
+    args = parser.parse_args()
+
+    print(f'A {args.world_width}-pixel-wide world scrolling past a 400x400 '
+          f'canvas (ms per frame; drawing with raster.py)')
+    for count in args.shapes:
+        for cull in (False, True):
+            move, cull_, draw, culled = timeScrolling(
+                count, args.world_width, args.frames, cull)
+            name = 'culled' if cull else 'all drawn'
+            print(f'  {count:>6} shapes, {name:<9}: move {move:6.2f}   '
+                  f'cull {cull_:6.2f}   draw {draw:7.2f}   total '
+                  f'{move + cull_ + draw:7.2f}   ({culled:.0f} culled)')
+    sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
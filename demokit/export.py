@@ -0,0 +1,213 @@
+"""
+CMU Graphics - Offline Frame Export
+===================================
+Renders a demo to an animated GIF or a folder of PNG files, without a
+window, for course material and for comparing revisions frame by frame.
+
+The demo is loaded against the stand-in cmu_graphics module (see
+stub_cmu_graphics.py) and its onStep is called N times, with no other
+input. Python's random module is seeded first, as in the benchmark, so
+every run gives the same frames. After each step the scene is copied into
+a snapshot: plain objects holding just the properties raster.py needs to
+draw each shape. Snapshots can be pickled, so drawing frame k only needs
+snapshot k, and a process pool draws the frames in parallel while the
+main process keeps stepping the demo:
+
+    main process:  step, snapshot, step, snapshot, ...   (in order)
+    worker 1:      draw frame 0, draw frame 4, ...
+    worker 2:      draw frame 1, draw frame 5, ...
+
+The frames come back in order and are written as they arrive. For a
+video, turn the PNG files into one with ffmpeg:
+    ffmpeg -framerate 30 -i frames/frame_%04d.png demo.mp4
+
+Prerequisites:
+- Python 3.6+
+- Pillow installed (pip install pillow)
+
+Run from the repository root; options for the demo itself go after its
+path:
+    python -m demokit.export --gif animation.gif basics/simple_animation.py
+    python -m demokit.export --frames 300 --png-dir frames projects/bouncing_ball/main.py
+    python -m demokit.export --workers 1 --gif ball.gif projects/bouncing_ball/main.py --balls 500
+"""
+
+import argparse
+import io
+import os
+import time
+from multiprocessing import Pool
+
+from demokit.loader import loadDemo
+
+# The properties copied into a snapshot, for every shape and for each kind
+COMMON_PROPERTIES = ['visible', 'opacity', 'rotateAngle', 'fill', 'border',
+                     'borderWidth', 'left', 'top', 'right', 'bottom',
+                     'centerX', 'centerY', 'width', 'height']
+KIND_PROPERTIES = {
+    'Line': ['x1', 'y1', 'x2', 'y2', 'lineWidth'],
+    'Label': ['value', 'size'],
+    'Polygon': ['pointList'],
+    'Star': ['radius', 'points', 'roundness'],
+    'RegularPolygon': ['radius', 'points'],
+    'Arc': ['startAngle', 'sweepAngle'],
+    'Image': ['url'],
+}
+
+# Frames handed to a worker at a time
+CHUNK_FRAMES = 4
+
+
+# =============================================================================
+# SNAPSHOTS
+# =============================================================================
+
+class FrozenShape:
+    """
+    A copy of one shape's drawing properties at one moment, which raster.py
+    draws like the shape itself. A Group's copy holds copies of its shapes.
+    """
+
+    def __init__(self, kind, properties, shapes=()):
+        self.__dict__.update(properties)
+        self._kind = kind
+        self._shapes = list(shapes)
+
+    def __iter__(self):
+        return iter(self._shapes)
+
+
+def freeze(shape):
+    """A FrozenShape copy of `shape` (and of a group's shapes)."""
+    from demokit.raster import shapeKind
+
+    kind = shapeKind(shape)
+    if kind == 'Group':
+        return FrozenShape(kind, {'visible': shape.visible,
+                                  'opacity': shape.opacity},
+                           [freeze(child) for child in shape])
+    properties = {}
+    for name in COMMON_PROPERTIES + KIND_PROPERTIES.get(kind, []):
+        value = getattr(shape, name, None)
+        if isinstance(value, list):
+            value = [list(item) if isinstance(item, list) else item
+                     for item in value]
+        properties[name] = value
+    if kind == 'Image':
+        properties['url'] = imageOf(properties['url'])
+    return FrozenShape(kind, properties)
+
+
+def imageOf(url):
+    """The Pillow image of an Image shape (its url), or None."""
+    from PIL import Image
+
+    if isinstance(url, Image.Image):
+        return url
+    picture = getattr(url, 'image', None)
+    return picture if isinstance(picture, Image.Image) else None
+
+
+def takeSnapshot(app):
+    """Everything needed to draw the current frame, as a picklable tuple."""
+    return (int(app.width), int(app.height), app.background or 'white',
+            [freeze(shape) for shape in app.group])
+
+
+def replay(demo, frames):
+    """
+    Steps the demo `frames` times and yields a snapshot after each step,
+    the first one before any step (the demo as it starts).
+    """
+    app = demo.app
+    yield takeSnapshot(app)
+    for frame in range(1, frames):
+        if not app.paused:
+            demo.call('onStep')
+        yield takeSnapshot(app)
+
+
+# =============================================================================
+# DRAWING
+# =============================================================================
+
+def drawSnapshot(snapshot):
+    """
+    Draws one snapshot and returns it as PNG bytes (which pass between
+    processes much faster than the image object).
+    """
+    from demokit.raster import render
+
+    width, height, background, shapes = snapshot
+    image = render(shapes, width, height, background).convert('RGB')
+    data = io.BytesIO()
+    image.save(data, 'PNG', compress_level=1)
+    return data.getvalue()
+
+
+def renderFrames(demo, frames, workers):
+    """
+    Yields the demo's first `frames` frames, in order, as PNG bytes, drawn
+    by `workers` processes (or in this process if workers is 1).
+    """
+    snapshots = replay(demo, frames)
+    if workers <= 1:
+        for snapshot in snapshots:
+            yield drawSnapshot(snapshot)
+        return
+    with Pool(workers) as pool:
+        yield from pool.imap(drawSnapshot, snapshots, chunksize=CHUNK_FRAMES)
+
+
+def export(path, args, frames, workers, gifPath=None, pngDir=None, seed=0):
+    """
+    Renders `frames` frames of the demo at `path` and writes them to a GIF
+    and/or numbered PNG files. Returns the number of seconds it took.
+    """
+    from PIL import Image
+
+    start = time.perf_counter()
+    demo = loadDemo(path, args, seed=seed)
+    if pngDir:
+        os.makedirs(pngDir, exist_ok=True)
+
+    gifFrames = []
+    for index, png in enumerate(renderFrames(demo, frames, workers)):
+        if pngDir:
+            with open(os.path.join(pngDir, f'frame_{index:04d}.png'), 'wb') as file:
+                file.write(png)
+        if gifPath:
+            gifFrames.append(Image.open(io.BytesIO(png)))
+
+    if gifFrames:
+        delay = round(1000 / demo.app.stepsPerSecond)
+        gifFrames[0].save(gifPath, save_all=True, append_images=gifFrames[1:],
+                          duration=delay, loop=0)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Render a demo to a GIF or PNG files without a window')
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='processes drawing frames (1 draws them here)')
+    parser.add_argument('--gif', help='write an animated GIF here')
+    parser.add_argument('--png-dir', help='write frame_0000.png, ... here')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('demo', help='path to the demo script')
+    parser.add_argument('demoArgs', nargs=argparse.REMAINDER,
+                        help='options passed on to the demo')
+    args = parser.parse_args()
+    if not args.gif and not args.png_dir:
+        parser.error('give --gif and/or --png-dir')
+
+    seconds = export(args.demo, args.demoArgs, args.frames, args.workers,
+                     args.gif, args.png_dir, args.seed)
+    print(f'{args.frames} frames in {seconds:.2f} s '
+          f'({args.frames / seconds:.1f} frames per second, '
+          f'{args.workers} worker(s))')
+
+
+if __name__ == '__main__':
+    main()
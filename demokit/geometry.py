@@ -0,0 +1,97 @@
+"""
+CMU Graphics - Shape Geometry
+=============================
+The outlines of cmu_graphics shapes (real or stand-in) as points, worked
+out from their public properties (left, top, rotateAngle, pointList,
+radius, points, ...), for the demokit modules that need to know where a
+shape is: raster.py draws the outlines and picking.py tests points
+against them.
+
+Prerequisites:
+- Python 3.6+
+"""
+
+import math
+
+# Default star roundness in cmu_graphics (inner radius as a percentage of
+# the outer radius), for stars with fewer than 6 points and the rest
+STAR_ROUNDNESS = 38.196601125
+MANY_POINTED_STAR_ROUNDNESS = 57.735026919
+
+# Rotated ovals are drawn as polygons with this many corners
+OVAL_POINTS = 48
+
+
+# =============================================================================
+# PROPERTIES
+# =============================================================================
+
+def shapeKind(shape):
+    """'Rect', 'Circle', 'Group', ... for a real or stand-in shape."""
+    return shape.__dict__.get('_kind') or type(shape).__name__
+
+
+def children(group):
+    """The shapes in a group, in drawing order (back to front)."""
+    return list(group)
+
+
+# =============================================================================
+# GEOMETRY
+# =============================================================================
+
+def rotatePoints(points, angle, cx, cy):
+    """Rotates (x, y) points clockwise (on screen) by `angle` degrees."""
+    if not angle:
+        return points
+    radians = math.radians(angle)
+    cos, sin = math.cos(radians), math.sin(radians)
+    return [(cx + (x - cx) * cos - (y - cy) * sin,
+             cy + (x - cx) * sin + (y - cy) * cos) for x, y in points]
+
+
+def pointsAround(cx, cy, radii, angle):
+    """
+    Points at the given distances from (cx, cy), evenly spaced clockwise
+    starting straight up, like cmu_graphics' stars and regular polygons.
+    """
+    step = 360 / len(radii)
+    points = []
+    for i, radius in enumerate(radii):
+        direction = math.radians(i * step + angle)
+        points.append((cx + radius * math.sin(direction),
+                       cy - radius * math.cos(direction)))
+    return points
+
+
+def shapePoints(shape, kind):
+    """The outline of a polygon-like shape as (x, y) points, or None."""
+    angle = shape.rotateAngle
+    if kind == 'Rect':
+        left, top = shape.left, shape.top
+        right, bottom = left + shape.width, top + shape.height
+        return rotatePoints([(left, top), (right, top), (right, bottom),
+                             (left, bottom)], angle, shape.centerX, shape.centerY)
+    if kind == 'Polygon':
+        return rotatePoints([tuple(point) for point in shape.pointList], angle,
+                            shape.centerX, shape.centerY)
+    if kind == 'RegularPolygon':
+        return pointsAround(shape.centerX, shape.centerY,
+                            [shape.radius] * shape.points, angle)
+    if kind == 'Star':
+        roundness = shape.roundness
+        if roundness is None:
+            roundness = (STAR_ROUNDNESS if shape.points < 6
+                         else MANY_POINTED_STAR_ROUNDNESS)
+        outer = shape.radius
+        inner = outer * roundness / 100
+        return pointsAround(shape.centerX, shape.centerY,
+                            [outer, inner] * shape.points, angle)
+    if kind == 'Oval' and angle:
+        cx, cy = shape.centerX, shape.centerY
+        rx, ry = shape.width / 2, shape.height / 2
+        points = [(cx + rx * math.cos(2 * math.pi * i / OVAL_POINTS),
+                   cy + ry * math.sin(2 * math.pi * i / OVAL_POINTS))
+                  for i in range(OVAL_POINTS)]
+        return rotatePoints(points, angle, cx, cy)
+    return None
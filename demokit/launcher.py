@@ -0,0 +1,357 @@
+"""
+CMU Graphics - Demo Launcher
+============================
+Runs several demos in one program and one window, switching between them
+with the number keys, instead of starting a new program for each.
+
+Started on its own, a demo costs a Python start, the cmu_graphics import
+and a new window before its first frame, and all of that is paid again
+for the next demo. The launcher imports cmu_graphics once and keeps one
+window. Each demo is a scene:
+
+- The first time a scene is shown, its script is loaded with
+  loader.loadDemo() (with cmu_graphics.run() switched off), and the
+  shapes it made are put into a Group of their own. This is a cold switch.
+- Switching away hides that Group and puts aside the demo's app settings:
+  background, stepsPerSecond, paused, and the variables the demo stored
+  on app. Switching back shows the Group and puts them back. This is a
+  warm switch.
+- tearDown() removes a scene's shapes, stops its threads and forgets it,
+  so the next switch to it is cold again. With keep=False every scene is
+  torn down when the launcher switches away from it.
+
+While a scene is shown, the window's callbacks go to that demo's
+callbacks. Shapes the demo makes later (like a ball spawned by a click)
+are moved into its Group after the callback that made them. The number
+keys pick a scene and tab goes to the next one; the demos don't use
+those keys, and every other input goes to the demo. Each switch's time is
+printed, and a summary when the window is closed.
+
+Prerequisites:
+- Python 3.6+
+- cmu_graphics library installed (not for --measure)
+
+Run from the repository root:
+    python -m demokit.launcher
+    python -m demokit.launcher --no-keep
+Measure cold and warm switches without a window, next to starting a
+separate program per demo:
+    python -m demokit.launcher --measure
+"""
+
+import argparse
+import atexit
+import subprocess
+import sys
+import threading
+import time
+
+from demokit.loader import REPO_ROOT, loadDemo, resolvePath
+
+DEFAULT_SCENES = [
+    'basics/shapes.py',
+    'basics/simple_animation.py',
+    'projects/bouncing_ball/main.py',
+]
+
+# App settings each scene keeps for itself
+APP_SETTINGS = ['background', 'stepsPerSecond', 'paused']
+
+NEXT_SCENE_KEY = 'tab'
+
+
+class Scene:
+    """
+    One demo in the launcher. `demo` and `group` are None until the scene
+    is built; `settings` holds its app settings while it is hidden.
+    """
+
+    def __init__(self, path, args=()):
+        self.path = path
+        self.args = list(args)
+        self.demo = None
+        self.group = None
+        self.settings = {}
+
+    @property
+    def built(self):
+        return self.demo is not None
+
+    def __repr__(self):
+        return f'Scene({self.path!r})'
+
+
+class Launcher:
+    """
+    Switches the scenes at `paths` in and out of `cmu` (the cmu_graphics
+    module, or a stand-in) and forwards callbacks to the one shown. With
+    keep=False, a scene is torn down as soon as another one is shown.
+    """
+
+    def __init__(self, cmu, paths=DEFAULT_SCENES, keep=True, load=None):
+        self.cmu = cmu
+        self.app = cmu.app
+        self.scenes = [Scene(path) for path in paths]
+        self.keep = keep
+        # loadDemo(path, args, cmu) with run() switched off for a real window
+        self.load = load or (lambda path, args: loadDemo(path, args, cmu=cmu))
+        self.current = None
+        # Everything on app before any demo was loaded is the library's
+        self.libraryAttributes = set(dir(self.app))
+        self.topShapes = len(self.app.group)
+        # (scene name, 'cold' or 'warm', ms) for every switch
+        self.switches = []
+
+    # -------------------------------------------------------------------------
+    # Switching
+    # -------------------------------------------------------------------------
+    def switchTo(self, index):
+        """Shows scene `index`, building it first if needed. Returns the ms it took."""
+        scene = self.scenes[index]
+        if scene is self.current:
+            return 0.0
+        start = time.perf_counter()
+        kind = 'warm' if scene.built else 'cold'
+        previous = self.current
+        if previous is not None:
+            self.hide(previous)
+            if not self.keep:
+                self.tearDown(previous)
+        if scene.built:
+            self.show(scene)
+        else:
+            self.build(scene)
+        self.current = scene
+        ms = (time.perf_counter() - start) * 1000
+        self.switches.append((scene.path, kind, ms))
+        return ms
+
+    def build(self, scene):
+        before = set(map(id, self.app.group))
+        scene.demo = self.load(resolvePath(scene.path), scene.args)
+        made = [shape for shape in self.app.group if id(shape) not in before]
+        scene.group = self.cmu.Group(*made)
+        self.topShapes = len(self.app.group)
+
+    def hide(self, scene):
+        app = self.app
+        scene.group.visible = False
+        settings = {name: getattr(app, name) for name in APP_SETTINGS}
+        for name in set(dir(app)) - self.libraryAttributes:
+            settings[name] = getattr(app, name)
+            delattr(app, name)
+        scene.settings = settings
+
+    def show(self, scene):
+        for name, value in scene.settings.items():
+            setattr(self.app, name, value)
+        scene.settings = {}
+        scene.group.visible = True
+
+    def tearDown(self, scene):
+        """Removes the scene's shapes, stops its threads and forgets its demo."""
+        if not scene.built:
+            return
+        if scene is self.current:
+            self.hide(scene)
+            self.current = None
+        for value in list(scene.demo.namespace.values()):
+            if isinstance(value, threading.Thread) and hasattr(value, 'stop'):
+                value.stop()
+        scene.group.clear()
+        self.app.group.remove(scene.group)
+        self.topShapes = len(self.app.group)
+        scene.demo = None
+        scene.group = None
+        scene.settings = {}
+
+    def tearDownAll(self):
+        for scene in self.scenes:
+            self.tearDown(scene)
+
+    # -------------------------------------------------------------------------
+    # Callbacks
+    # -------------------------------------------------------------------------
+    def call(self, name, *args):
+        """
+        Calls the shown demo's callback `name` with as many of `args` as it
+        takes, then moves any shapes it made into the scene's Group.
+        """
+        scene = self.current
+        if scene is None:
+            return
+        fn = scene.demo.callback(name)
+        if fn is None:
+            return
+        fn(*args[:fn.__code__.co_argcount])
+        if len(self.app.group) != self.topShapes:
+            self.adoptNewShapes(scene)
+
+    def adoptNewShapes(self, scene):
+        groups = {id(other.group) for other in self.scenes if other.built}
+        for shape in list(self.app.group):
+            if id(shape) not in groups and shape not in self.ownShapes():
+                scene.group.add(shape)
+        self.topShapes = len(self.app.group)
+
+    def ownShapes(self):
+        """Shapes of the launcher's own (none here; see WindowLauncher)."""
+        return []
+
+    def onKeyPress(self, key, modifiers=()):
+        if key.isdigit() and 1 <= int(key) <= len(self.scenes):
+            self.switchTo(int(key) - 1)
+        elif key == NEXT_SCENE_KEY:
+            index = self.scenes.index(self.current) if self.current else -1
+            self.switchTo((index + 1) % len(self.scenes))
+        else:
+            self.call('onKeyPress', key, modifiers)
+
+    # -------------------------------------------------------------------------
+    # Reporting
+    # -------------------------------------------------------------------------
+    def report(self):
+        """Mean, fastest and slowest ms of the cold and the warm switches."""
+        summary = {}
+        for kind in ('cold', 'warm'):
+            times = [ms for path, switchKind, ms in self.switches
+                     if switchKind == kind]
+            if times:
+                summary[kind] = {'switches': len(times),
+                                 'meanMs': sum(times) / len(times),
+                                 'minMs': min(times), 'maxMs': max(times)}
+        return summary
+
+    def printReport(self, file=sys.stdout):
+        for kind, numbers in self.report().items():
+            print(f'{kind} switches: {numbers["switches"]}, mean '
+                  f'{numbers["meanMs"]:.1f} ms (fastest {numbers["minMs"]:.1f}, '
+                  f'slowest {numbers["maxMs"]:.1f})', file=file)
+
+
+# =============================================================================
+# RUNNING IN A WINDOW
+# =============================================================================
+
+class WindowLauncher(Launcher):
+    """A Launcher for the real cmu_graphics window, with a scene menu Label."""
+
+    def __init__(self, paths=DEFAULT_SCENES, keep=True):
+        import cmu_graphics
+
+        window = cmu_graphics.cmu_graphics
+        self.run = window.run
+
+        def load(path, args):
+            window.run = lambda **kwargs: None
+            try:
+                return loadDemo(path, args, cmu=cmu_graphics)
+            finally:
+                window.run = self.run
+
+        super().__init__(cmu_graphics, paths, keep, load)
+        self.menu = cmu_graphics.Label('', 5, 392, size=10, fill='gray',
+                                       align='left')
+        self.topShapes = len(self.app.group)
+
+    def ownShapes(self):
+        return [self.menu]
+
+    def switchTo(self, index):
+        if self.scenes[index] is self.current:
+            return 0.0
+        super().switchTo(index)
+        scene, kind, ms = self.switches[-1]
+        print(f'{scene}: {kind} switch in {ms:.1f} ms')
+        names = '  '.join(f'{i + 1} {self.scenes[i].path.split("/")[-1]}'
+                          for i in range(len(self.scenes)))
+        self.menu.value = f'{names}  ({kind} switch: {ms:.0f} ms)'
+        self.menu.toFront()
+        return ms
+
+    def start(self):
+        """Shows the first scene and opens the window."""
+        main = sys.modules['__main__'].__dict__
+        main['onKeyPress'] = lambda key, modifiers: self.onKeyPress(key, modifiers)
+        for name in ('onStep', 'onKeyRelease', 'onKeyHold', 'onMousePress',
+                     'onMouseRelease', 'onMouseMove', 'onMouseDrag'):
+            main[name] = self.forwarder(name)
+        atexit.register(self.printReport)
+        self.switchTo(0)
+        self.run()
+
+    def forwarder(self, name):
+        # cmu_graphics passes as many arguments as the function takes
+        if name == 'onStep':
+            return lambda: self.call(name)
+        if name in ('onKeyRelease', 'onKeyHold'):
+            return lambda keys, modifiers: self.call(name, keys, modifiers)
+        return lambda x, y: self.call(name, x, y)
+
+
+# =============================================================================
+# MEASURING WITHOUT A WINDOW
+# =============================================================================
+
+def timeSeparateProgram(path):
+    """
+    Milliseconds to start a new Python, import the loader and load the
+    demo, as running each demo on its own does (minus the window).
+    """
+    code = ('from demokit.loader import loadDemo; '
+            f'loadDemo({resolvePath(path)!r})')
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, check=True,
+                   stdout=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(paths, rounds):
+    from demokit import stub_cmu_graphics
+
+    print('Separate program per demo (Python start + import + load):')
+    for path in paths:
+        print(f'  {path:<34}{timeSeparateProgram(path):8.1f} ms')
+    print('  (with cmu_graphics, each one also imports it and opens a window)')
+
+    for keep in (True, False):
+        launcher = Launcher(stub_cmu_graphics.makeModule(), paths, keep=keep)
+        for round in range(rounds):
+            for index in range(len(paths)):
+                launcher.switchTo(index)
+                # A few frames, so the scene has moved before it's hidden
+                for frame in range(10):
+                    launcher.call('onStep')
+        print(f'Launcher, {"keeping" if keep else "tearing down"} scenes '
+              f'({rounds} rounds of {len(paths)} switches):')
+        for path in paths:
+            for kind in ('cold', 'warm'):
+                times = [ms for switchPath, switchKind, ms in launcher.switches
+                         if switchPath == path and switchKind == kind]
+                if times:
+                    print(f'  {path:<34}{kind}{sum(times) / len(times):8.2f} ms'
+                          f'  ({len(times)} switches)')
+        launcher.tearDownAll()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run several demos in one window, switching with 1-9')
+    parser.add_argument('--no-keep', action='store_true',
+                        help='tear each scene down when switching away from it')
+    parser.add_argument('--measure', action='store_true',
+                        help='time cold and warm switches without a window')
+    parser.add_argument('--rounds', type=int, default=5,
+                        help='with --measure, times to go through the scenes')
+    parser.add_argument('scenes', nargs='*', default=DEFAULT_SCENES,
+                        help='demo scripts to switch between')
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.scenes, args.rounds)
+    else:
+        WindowLauncher(args.scenes, keep=not args.no_keep).start()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+CMU Graphics - Demo Loader
+==========================
+Loads a demo script so its shapes and callbacks (onStep, onKeyPress, ...)
+can be used from other code.
+
+A demo normally does `from cmu_graphics import *`, builds its shapes, and
+then blocks in cmu_graphics.run() until the window is closed. loadDemo()
+runs the script with the stand-in cmu_graphics module from
+stub_cmu_graphics, whose run() returns right away, so the script finishes
+and its variables and functions can be reached through demo.namespace:
+
+    demo = loadDemo('basics/simple_animation.py')
+    demo.call('onStep')
+    print(demo.namespace['movingCircle'].centerX)
+
+The script runs with its own directory on sys.path (so the bouncing ball's
+`import physics` works) and with sys.argv set to the script path plus any
+`args`, as if it had been started from the command line.
+"""
+
+import builtins
+import os
+import random
+import sys
+
+from demokit import stub_cmu_graphics
+
+# The repository root, so demo paths can be given relative to it
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CALLBACK_NAMES = ['onStep', 'onKeyPress', 'onKeyRelease', 'onKeyHold',
+                  'onMousePress', 'onMouseRelease', 'onMouseMove',
+                  'onMouseDrag']
+
+
+class Demo:
+    """
+    A loaded demo: its global variables (namespace), the cmu_graphics
+    module it was loaded against (cmu), that module's app, and the seed
+    Python's random module was given before the script ran.
+    """
+
+    def __init__(self, path, args, namespace, cmu, seed=0):
+        self.path = path
+        self.args = list(args)
+        self.seed = seed
+        self.namespace = namespace
+        self.cmu = cmu
+        self.app = cmu.app
+
+    def callback(self, name):
+        """Returns the demo's callback function called `name`, or None."""
+        fn = self.namespace.get(name)
+        return fn if callable(fn) else None
+
+    def call(self, name, *args):
+        """Calls the demo's callback `name` if it has one."""
+        fn = self.callback(name)
+        if fn is not None:
+            fn(*args)
+
+    def __repr__(self):
+        return f'Demo({self.path!r})'
+
+
+def sameArity(fn, call):
+    """
+    Returns a function that takes the same number of positional arguments
+    as `fn` and passes them to call(). cmu_graphics looks at how many
+    arguments a callback takes (onKeyPress(key) or onKeyPress(key,
+    modifiers)), so a wrapper around a callback must take the same number.
+    """
+    count = fn.__code__.co_argcount
+    if count == 0:
+        def wrapper():
+            return call()
+    elif count == 1:
+        def wrapper(a):
+            return call(a)
+    elif count == 2:
+        def wrapper(a, b):
+            return call(a, b)
+    else:
+        def wrapper(a, b, c):
+            return call(a, b, c)
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+
+def resolvePath(path):
+    """Turns a demo path relative to the repository root into a full path."""
+    if os.path.isabs(path) or os.path.exists(path):
+        return os.path.abspath(path)
+    return os.path.join(REPO_ROOT, path)
+
+
+def loadDemo(path, args=(), cmu=None, seed=0):
+    """
+    Runs the demo script at `path` against `cmu` (a new stand-in module if
+    not given) and returns a Demo. Python's random module is seeded with
+    `seed` first, so demos that use random numbers load the same way every
+    time.
+    """
+    path = resolvePath(path)
+    if cmu is None:
+        cmu = stub_cmu_graphics.makeModule()
+    with open(path) as f:
+        code = compile(f.read(), path, 'exec')
+
+    namespace = {'__name__': '__demo__', '__file__': path,
+                 '__builtins__': builtins}
+    savedModule = sys.modules.get('cmu_graphics')
+    savedArgv = sys.argv
+    savedPath = list(sys.path)
+    sys.modules['cmu_graphics'] = cmu
+    sys.argv = [path] + list(args)
+    sys.path.insert(0, os.path.dirname(path))
+    random.seed(seed)
+    try:
+        exec(code, namespace)
+    finally:
+        sys.argv = savedArgv
+        sys.path[:] = savedPath
+        if savedModule is None:
+            del sys.modules['cmu_graphics']
+        else:
+            sys.modules['cmu_graphics'] = savedModule
+    return Demo(path, args, namespace, cmu, seed)
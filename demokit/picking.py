@@ -0,0 +1,662 @@
+"""
+CMU Graphics - Shape Picking
+============================
+Finds the shape under a point (the one a click landed on) among any number
+of shapes, without testing every shape.
+
+cmu_graphics can test one shape at a time (shape.hits(x, y)), so finding
+the clicked shape means trying every shape on the canvas, top to bottom.
+A Picker keeps, for every shape:
+- its bounding box, worked out once (and again when the shape changes),
+  including its rotateAngle
+- what the exact test needs: the corners of a rotated Rect, Label or
+  Image, the center, radii and rotation of an Oval, Circle or Arc, the
+  points of a Polygon, Star or RegularPolygon, and the ends and width of
+  a Line
+
+The bounding boxes are filed in a grid of CELL_SIZE-pixel cells. pick(x,
+y) looks only at the shapes in the point's cell, front to back. It checks
+each shape's bounding box first, then runs the exact test, and stops at
+the first hit. A shape so big that it covers more than MAX_CELLS cells
+(a background, say) is kept in a short list that every pick checks
+instead. Hidden shapes (or shapes in hidden Groups) stay filed, and are
+skipped when picking.
+
+The Picker doesn't see a shape move. After changing shapes, call
+update(shape) for each one. update() compares the properties the
+geometry depends on, and refiles the shape only in the cells it left and
+entered. Shapes brought to the front with toFront() need
+moveToFront(shape).
+
+installPicker() does this for a demo. It files every shape at the start,
+and before each mouse press it updates the shapes the demo can reach
+through its variables, as static_layer.py finds them. The others never
+change. It then reports the clicked shape.
+
+The shapes are tested against the same outlines raster.py draws (see
+geometry.py). A filled shape's border doesn't count, a shape with
+fill=None is hit only on its border, and a Label is hit anywhere in its box.
+
+Prerequisites:
+- Python 3.6+
+
+See which shape a click lands on, in a window:
+    python -m demokit.run --pick basics/shapes.py
+Time picking among tens of thousands of shapes, and check the results
+against testing every shape:
+    python -m demokit.picking
+    python -m demokit.picking --shapes 10000 50000 --check
+"""
+
+import argparse
+import bisect
+import math
+import random
+import time
+
+from demokit.geometry import OVAL_POINTS, children, shapeKind, shapePoints
+
+# Width and height of a grid cell, in pixels
+CELL_SIZE = 16
+
+# Shapes covering more cells than this are checked on every pick instead
+MAX_CELLS = 256
+
+ELLIPSE_KINDS = {'Oval', 'Circle'}
+POLYGON_KINDS = {'Polygon', 'Star', 'RegularPolygon'}
+
+
+# =============================================================================
+# GEOMETRY
+# =============================================================================
+
+def geometryKey(shape, kind):
+    """The properties a shape's geometry depends on, to notice changes."""
+    if kind == 'Line':
+        return (shape.x1, shape.y1, shape.x2, shape.y2, shape.lineWidth)
+    key = (shape.centerX, shape.centerY, shape.width, shape.height,
+           shape.rotateAngle)
+    key += (shape.fill is None, shape.borderWidth)
+    if kind == 'Polygon':
+        return key + (tuple(map(tuple, shape.pointList)),)
+    if kind in ('Star', 'RegularPolygon'):
+        return key + (shape.radius, shape.points,
+                      getattr(shape, 'roundness', None))
+    if kind == 'Arc':
+        return key + (shape.startAngle, shape.sweepAngle)
+    return key
+
+
+def shapeGeometry(shape, kind):
+    """
+    What hits() needs to test a point against the shape, and its bounding
+    box (left, top, right, bottom). A shape with fill=None is only drawn
+    as its border, so only its border is hit.
+    """
+    geometry, box = filledGeometry(shape, kind)
+    if shape.fill is not None or kind in ('Line', 'Label', 'Image'):
+        return geometry, box
+    half = max(shape.borderWidth, 1) / 2
+    left, top, right, bottom = box
+    return (('outline', outlinePoints(geometry), half),
+            (left - half, top - half, right + half, bottom + half))
+
+
+def filledGeometry(shape, kind):
+    if kind == 'Line':
+        x1, y1, x2, y2 = shape.x1, shape.y1, shape.x2, shape.y2
+        half = max(shape.lineWidth, 1) / 2
+        return (('line', x1, y1, x2, y2, half),
+                (min(x1, x2) - half, min(y1, y2) - half,
+                 max(x1, x2) + half, max(y1, y2) + half))
+    if kind in POLYGON_KINDS:
+        points = shapePoints(shape, kind)
+        xs = [x for x, y in points]
+        ys = [y for x, y in points]
+        return ('polygon', points), (min(xs), min(ys), max(xs), max(ys))
+
+    cx, cy = shape.centerX, shape.centerY
+    halfWidth, halfHeight = shape.width / 2, shape.height / 2
+    radians = math.radians(shape.rotateAngle)
+    cos, sin = math.cos(radians), math.sin(radians)
+    if kind in ELLIPSE_KINDS or kind == 'Arc':
+        spanX = math.hypot(halfWidth * cos, halfHeight * sin)
+        spanY = math.hypot(halfWidth * sin, halfHeight * cos)
+        if kind == 'Arc':
+            geometry = ('arc', cx, cy, halfWidth, halfHeight, cos, sin,
+                        shape.startAngle % 360, shape.sweepAngle)
+        else:
+            geometry = ('ellipse', cx, cy, halfWidth, halfHeight, cos, sin)
+    else:
+        spanX = halfWidth * abs(cos) + halfHeight * abs(sin)
+        spanY = halfWidth * abs(sin) + halfHeight * abs(cos)
+        geometry = ('box', cx, cy, halfWidth, halfHeight, cos, sin)
+    return geometry, (cx - spanX, cy - spanY, cx + spanX, cy + spanY)
+
+
+def hits(geometry, x, y):
+    """True if (x, y) is inside the shape described by `geometry`."""
+    kind = geometry[0]
+    if kind == 'polygon':
+        return insidePolygon(geometry[1], x, y)
+    if kind == 'line':
+        unused, x1, y1, x2, y2, half = geometry
+        return distanceToSegment(x, y, x1, y1, x2, y2) <= half
+    if kind == 'outline':
+        unused, points, half = geometry
+        x0, y0 = points[-1]
+        for x1, y1 in points:
+            if distanceToSegment(x, y, x0, y0, x1, y1) <= half:
+                return True
+            x0, y0 = x1, y1
+        return False
+
+    # Turn the point back by the shape's rotation (rotateAngle turns
+    # clockwise on screen), into the shape's own unrotated frame
+    unused, cx, cy, halfWidth, halfHeight, cos, sin = geometry[:7]
+    dx, dy = x - cx, y - cy
+    u = dx * cos + dy * sin
+    v = dy * cos - dx * sin
+    if kind == 'box':
+        return abs(u) <= halfWidth and abs(v) <= halfHeight
+    if halfWidth <= 0 or halfHeight <= 0:
+        return False
+    if (u / halfWidth) ** 2 + (v / halfHeight) ** 2 > 1:
+        return False
+    if kind == 'ellipse':
+        return True
+    # An arc is a slice of its oval: startAngle is measured clockwise from
+    # straight up, and the slice goes sweepAngle degrees clockwise from it
+    start, sweep = geometry[7], geometry[8]
+    if abs(sweep) >= 360:
+        return True
+    angle = math.degrees(math.atan2(u, -v)) % 360
+    if sweep >= 0:
+        return (angle - start) % 360 <= sweep
+    return (start - angle) % 360 <= -sweep
+
+
+def outlinePoints(geometry):
+    """The outline of a filled shape's geometry, as points."""
+    kind = geometry[0]
+    if kind == 'polygon':
+        return geometry[1]
+    unused, cx, cy, halfWidth, halfHeight, cos, sin = geometry[:7]
+    if kind == 'box':
+        frame = [(-halfWidth, -halfHeight), (halfWidth, -halfHeight),
+                 (halfWidth, halfHeight), (-halfWidth, halfHeight)]
+    elif kind == 'ellipse':
+        frame = [(halfWidth * math.cos(2 * math.pi * i / OVAL_POINTS),
+                  halfHeight * math.sin(2 * math.pi * i / OVAL_POINTS))
+                 for i in range(OVAL_POINTS)]
+    else:
+        # The arc from startAngle, then back to the center
+        start, sweep = geometry[7], max(-360, min(360, geometry[8]))
+        count = max(2, round(OVAL_POINTS * abs(sweep) / 360))
+        angles = [math.radians(start + sweep * i / (count - 1))
+                  for i in range(count)]
+        frame = [(halfWidth * math.sin(a), -halfHeight * math.cos(a))
+                 for a in angles]
+        if abs(sweep) < 360:
+            frame.append((0, 0))
+    return [(cx + u * cos - v * sin, cy + u * sin + v * cos) for u, v in frame]
+
+
+def insidePolygon(points, x, y):
+    """
+    Even-odd test: (x, y) is inside if a ray from it to the right crosses
+    the outline an odd number of times.
+    """
+    inside = False
+    x0, y0 = points[-1]
+    for x1, y1 in points:
+        if (y1 > y) != (y0 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+        x0, y0 = x1, y1
+    return inside
+
+
+def distanceToSegment(x, y, x1, y1, x2, y2):
+    dx, dy = x2 - x1, y2 - y1
+    lengthSquared = dx * dx + dy * dy
+    t = 0.0
+    if lengthSquared > 0:
+        t = min(1.0, max(0.0, ((x - x1) * dx + (y - y1) * dy) / lengthSquared))
+    return math.hypot(x - x1 - t * dx, y - y1 - t * dy)
+
+
+# =============================================================================
+# THE PICKER
+# =============================================================================
+
+class Entry:
+    """One shape in a Picker, with its cached geometry."""
+
+    __slots__ = ('shape', 'kind', 'groups', 'order', 'key', 'geometry', 'box',
+                 'cells')
+
+    def __init__(self, shape, kind, groups, order):
+        self.shape = shape
+        self.kind = kind
+        self.groups = groups        # the Groups the shape is in, outermost first
+        self.order = order          # higher is drawn later (in front)
+        self.key = None
+        self.geometry = None
+        self.box = None
+        self.cells = None           # (first column, first row, last column, last row)
+
+    def visible(self):
+        if not self.shape.visible:
+            return False
+        return all(group.visible for group in self.groups)
+
+
+def cellCount(cells):
+    first, top, last, bottom = cells
+    return (last - first + 1) * (bottom - top + 1)
+
+
+def cellsOf(cells):
+    """Every (column, row) in a (first, top, last, bottom) range of cells."""
+    first, top, last, bottom = cells
+    return [(column, row) for column in range(first, last + 1)
+            for row in range(top, bottom + 1)]
+
+
+def inCells(column, row, cells):
+    first, top, last, bottom = cells
+    return first <= column <= last and top <= row <= bottom
+
+
+class Cell:
+    """The entries filed in one grid cell (or the big ones), in drawing order."""
+
+    __slots__ = ('orders', 'entries')
+
+    def __init__(self):
+        self.orders = []
+        self.entries = []
+
+    def add(self, entry):
+        # Orders only grow, so new and refiled shapes usually go at the end
+        orders = self.orders
+        if not orders or orders[-1] < entry.order:
+            orders.append(entry.order)
+            self.entries.append(entry)
+        else:
+            index = bisect.bisect(orders, entry.order)
+            orders.insert(index, entry.order)
+            self.entries.insert(index, entry)
+
+    def remove(self, entry):
+        index = bisect.bisect_left(self.orders, entry.order)
+        del self.orders[index]
+        del self.entries[index]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class Picker:
+    """
+    Shapes filed by bounding box in a grid of `cellSize`-pixel cells. Add
+    shapes (or Groups, or app.group) in drawing order, back to front.
+    """
+
+    def __init__(self, cellSize=CELL_SIZE):
+        self.cellSize = cellSize
+        self.entries = {}           # id(shape) -> Entry
+        # (column, row) -> Cell
+        self.cells = {}
+        # Entries too big for the grid
+        self.large = Cell()
+        self.nextOrder = 0
+        self.refiled = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # -------------------------------------------------------------------------
+    # Adding, removing and updating shapes
+    # -------------------------------------------------------------------------
+    def add(self, shape, groups=()):
+        """Files a shape (a Group's shapes, for a Group) in front of the others."""
+        kind = shapeKind(shape)
+        if kind == 'Group':
+            inner = groups + (shape,)
+            for child in children(shape):
+                self.add(child, inner)
+            return
+        entry = Entry(shape, kind, groups, self.nextOrder)
+        self.nextOrder += 1
+        self.entries[id(shape)] = entry
+        self.refresh(entry)
+
+    def addAll(self, shapes):
+        """add() for each shape in `shapes` (app.group, say), in order."""
+        for shape in shapes:
+            self.add(shape)
+
+    def remove(self, shape):
+        if shapeKind(shape) == 'Group':
+            for child in children(shape):
+                self.remove(child)
+            return
+        entry = self.entries.pop(id(shape), None)
+        if entry is not None:
+            self.unfile(entry)
+
+    def update(self, shape):
+        """
+        Refiles a shape (or a Group's shapes) if it moved or changed size,
+        rotation or outline. Returns how many shapes were refiled.
+        """
+        if shapeKind(shape) == 'Group':
+            return sum(self.update(child) for child in children(shape))
+        entry = self.entries.get(id(shape))
+        if entry is None:
+            return 0
+        return 1 if self.refresh(entry) else 0
+
+    def moveToFront(self, shape):
+        """Call after shape.toFront(), so picks find it before the others."""
+        if shapeKind(shape) == 'Group':
+            for child in children(shape):
+                self.moveToFront(child)
+            return
+        entry = self.entries.get(id(shape))
+        if entry is not None:
+            self.unfile(entry)
+            entry.order = self.nextOrder
+            self.nextOrder += 1
+            self.file(entry)
+
+    def clear(self):
+        self.entries.clear()
+        self.cells.clear()
+        self.large = Cell()
+
+    def refresh(self, entry):
+        """Works out the entry's geometry again if its shape changed."""
+        key = geometryKey(entry.shape, entry.kind)
+        if key == entry.key:
+            return False
+        filed = entry.key is not None
+        entry.key = key
+        entry.geometry, entry.box = shapeGeometry(entry.shape, entry.kind)
+        if filed:
+            self.refile(entry)
+        else:
+            self.file(entry)
+        self.refiled += 1
+        return True
+
+    # -------------------------------------------------------------------------
+    # The grid
+    # -------------------------------------------------------------------------
+    def cellRange(self, box):
+        size = self.cellSize
+        left, top, right, bottom = box
+        return (math.floor(left / size), math.floor(top / size),
+                math.floor(right / size), math.floor(bottom / size))
+
+    def file(self, entry):
+        first, top, last, bottom = cells = self.cellRange(entry.box)
+        if cellCount(cells) > MAX_CELLS:
+            entry.cells = None
+            self.large.add(entry)
+            return
+        entry.cells = cells
+        for column in range(first, last + 1):
+            for row in range(top, bottom + 1):
+                cell = self.cells.get((column, row))
+                if cell is None:
+                    cell = self.cells[(column, row)] = Cell()
+                cell.add(entry)
+
+    def unfile(self, entry):
+        if entry.cells is None:
+            self.large.remove(entry)
+            return
+        first, top, last, bottom = entry.cells
+        for column in range(first, last + 1):
+            for row in range(top, bottom + 1):
+                cell = self.cells[(column, row)]
+                cell.remove(entry)
+                if not cell:
+                    del self.cells[(column, row)]
+
+    def refile(self, entry):
+        """
+        Files an entry whose box changed: it is taken out of only the cells
+        it left and added to only the cells it entered. A shape that moves
+        a little stays in most of its cells, and those aren't touched.
+        """
+        old = entry.cells
+        new = self.cellRange(entry.box)
+        if old is None or cellCount(new) > MAX_CELLS:
+            self.unfile(entry)
+            self.file(entry)
+            return
+        if new == old:
+            return
+        cells = self.cells
+        for column, row in cellsOf(old):
+            if not inCells(column, row, new):
+                cell = cells[(column, row)]
+                cell.remove(entry)
+                if not cell:
+                    del cells[(column, row)]
+        for column, row in cellsOf(new):
+            if not inCells(column, row, old):
+                cell = cells.get((column, row))
+                if cell is None:
+                    cell = cells[(column, row)] = Cell()
+                cell.add(entry)
+        entry.cells = new
+
+    # -------------------------------------------------------------------------
+    # Picking
+    # -------------------------------------------------------------------------
+    def pick(self, x, y):
+        """The frontmost visible shape at (x, y), or None."""
+        size = self.cellSize
+        cell = self.cells.get((math.floor(x / size), math.floor(y / size)))
+        found = firstHit(reversed(cell.entries), x, y) if cell else None
+        if self.large:
+            # A big shape in front of the one found in the cell wins
+            after = found.order if found is not None else -1
+            big = firstHit(reversed(self.large.entries), x, y, after)
+            if big is not None:
+                found = big
+        return found.shape if found is not None else None
+
+    def pickAll(self, x, y):
+        """Every visible shape at (x, y), front to back."""
+        size = self.cellSize
+        cell = self.cells.get((math.floor(x / size), math.floor(y / size)))
+        entries = (cell.entries if cell else []) + self.large.entries
+        entries.sort(key=lambda entry: -entry.order)
+        return [entry.shape for entry in entries if entryHits(entry, x, y)]
+
+    def pickLinear(self, x, y):
+        """pick() by testing every shape, front to back (for checking pick())."""
+        entries = sorted(self.entries.values(), key=lambda entry: -entry.order)
+        found = firstHit(entries, x, y)
+        return found.shape if found is not None else None
+
+
+def entryHits(entry, x, y):
+    left, top, right, bottom = entry.box
+    return (left <= x <= right and top <= y <= bottom and
+            hits(entry.geometry, x, y) and entry.visible())
+
+
+def firstHit(entries, x, y, after=-1):
+    """The first entry hit at (x, y), stopping at orders <= `after`."""
+    for entry in entries:
+        if entry.order <= after:
+            return None
+        left, top, right, bottom = entry.box
+        if x < left or x > right or y < top or y > bottom:
+            continue
+        if hits(entry.geometry, x, y) and entry.visible():
+            return entry
+    return None
+
+
+# =============================================================================
+# PICKING IN A DEMO
+# =============================================================================
+
+def installPicker(demo, report=True):
+    """
+    Files every shape of the demo in a Picker and returns it (also set as
+    demo.picker). Before each onMousePress the shapes the demo can change
+    are updated, and demo.picked is set to the shape under the mouse. With
+    report=True the picked shape is also printed. Demos without an
+    onMousePress get one.
+    """
+    from demokit.coalesce import isShape
+    from demokit.loader import sameArity
+    from demokit.static_layer import baseShape, reachableShapes
+
+    app = demo.app
+    namespace = demo.namespace
+    picker = Picker()
+    picker.addAll(app.group)
+    topLevel = [len(app.group)]
+    demo.picked = None
+
+    def changeableShapes():
+        shapes = reachableShapes(namespace, app)
+        shapes += [baseShape(value) for value in namespace.values()
+                   if isShape(value) or isShape(baseShape(value))]
+        return shapes
+
+    def pickAt(x, y):
+        if len(app.group) != topLevel[0]:
+            # Shapes were added or removed: file everything again
+            picker.clear()
+            picker.addAll(app.group)
+            topLevel[0] = len(app.group)
+        else:
+            for shape in changeableShapes():
+                picker.update(shape)
+        demo.picked = shape = picker.pick(x, y)
+        if report:
+            if shape is None:
+                print(f'({x}, {y}): no shape')
+            else:
+                print(f'({x}, {y}): {shapeKind(shape)} at '
+                      f'({shape.centerX:.0f}, {shape.centerY:.0f})')
+
+    fn = demo.callback('onMousePress')
+    if fn is None:
+        def onMousePress(x, y):
+            pickAt(x, y)
+        namespace['onMousePress'] = onMousePress
+    else:
+        def picking(*args, fn=fn):
+            pickAt(*args[:2])
+            return fn(*args)
+        namespace['onMousePress'] = sameArity(fn, picking)
+    demo.picker = picker
+    return picker
+
+
+# =============================================================================
+# MEASURING
+# =============================================================================
+
+def randomShapes(cmu, count, rng, width=400, height=400):
+    """`count` random shapes of every kind, about 5 to 30 pixels across, some rotated."""
+    shapes = []
+    for i in range(count):
+        x, y = rng.uniform(0, width), rng.uniform(0, height)
+        size = rng.uniform(5, 30)
+        angle = rng.choice([0, 0, rng.uniform(0, 360)])
+        kind = i % 8
+        if kind == 0:
+            shape = cmu.Rect(x, y, size, size * 0.6, align='center',
+                             rotateAngle=angle)
+        elif kind == 1:
+            shape = cmu.Circle(x, y, size / 2)
+        elif kind == 2:
+            shape = cmu.Oval(x, y, size, size / 2, rotateAngle=angle)
+        elif kind == 3:
+            shape = cmu.Polygon(x, y, x + size, y + size / 3, x + size / 3, y + size)
+        elif kind == 4:
+            shape = cmu.Star(x, y, size / 2, 5, rotateAngle=angle)
+        elif kind == 5:
+            shape = cmu.RegularPolygon(x, y, size / 2, 6, rotateAngle=angle)
+        elif kind == 6:
+            shape = cmu.Line(x, y, x + size, y + size / 2, lineWidth=3)
+        else:
+            shape = cmu.Arc(x, y, size, size, 30, 200, rotateAngle=angle)
+        shapes.append(shape)
+    return shapes
+
+
+def timeCalls(fn, points):
+    """Microseconds per call of fn(x, y), the mean and the 99th percentile."""
+    times = []
+    for x, y in points:
+        start = time.perf_counter()
+        fn(x, y)
+        times.append((time.perf_counter() - start) * 1e6)
+    times.sort()
+    return sum(times) / len(times), times[int(len(times) * 0.99)]
+
+
+def main():
+    from demokit import stub_cmu_graphics
+
+    parser = argparse.ArgumentParser(
+        description='Time picking shapes with the grid against testing them all')
+    parser.add_argument('--shapes', type=int, nargs='+',
+                        default=[1000, 10000, 50000])
+    parser.add_argument('--picks', type=int, default=2000)
+    parser.add_argument('--moves', type=int, default=1000,
+                        help='shapes moved, then updated, for the update time')
+    parser.add_argument('--cell-size', type=int, default=CELL_SIZE)
+    parser.add_argument('--check', action='store_true',
+                        help='check every pick against testing every shape')
+    args = parser.parse_args()
+
+    for count in args.shapes:
+        rng = random.Random(count)
+        cmu = stub_cmu_graphics.makeModule()
+        shapes = randomShapes(cmu, count, rng)
+        points = [(rng.uniform(0, 400), rng.uniform(0, 400))
+                  for i in range(args.picks)]
+
+        start = time.perf_counter()
+        picker = Picker(args.cell_size)
+        picker.addAll(cmu.app.group)
+        buildMs = (time.perf_counter() - start) * 1000
+        pickMean, pickP99 = timeCalls(picker.pick, points)
+        linearPoints = points[:max(1, args.picks * 1000 // count)]
+        linearMean, unused = timeCalls(picker.pickLinear, linearPoints)
+
+        moved = rng.sample(shapes, min(args.moves, count))
+        for shape in moved:
+            shape.centerX += rng.uniform(-20, 20)
+            shape.centerY += rng.uniform(-20, 20)
+        start = time.perf_counter()
+        for shape in moved:
+            picker.update(shape)
+        updateUs = (time.perf_counter() - start) * 1e6 / len(moved)
+
+        print(f'{count} shapes: filed in {buildMs:.0f} ms, pick {pickMean:.1f} us '
+              f'(p99 {pickP99:.1f} us), testing every shape {linearMean:.0f} us, '
+              f'update after a move {updateUs:.1f} us')
+        if args.check:
+            wrong = sum(picker.pick(x, y) is not picker.pickLinear(x, y)
+                        for x, y in points)
+            print(f'  {args.picks - wrong} of {args.picks} picks match '
+                  f'testing every shape')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+"""
+CMU Graphics - Callback Profiler
+================================
+Shows where a demo's frame time goes: how long each call to onStep,
+onKeyPress, onKeyHold, onKeyRelease, onMousePress (and the other
+callbacks) takes, and how long the demo's own functions take inside them.
+
+installProfiler() wraps each callback, and each top-level function the
+demo defines, with a timer. That includes functions a callback reaches
+through a global variable, like the `original_onStep` that the bouncing
+ball's onStep calls. For every one it keeps:
+- a latency histogram (how many calls took 0-0.05 ms, 0.05-0.1 ms, ...)
+- the number of calls, total, mean, 95th-percentile and longest time
+
+A frame is the input callbacks cmu_graphics handles before an onStep, plus
+the onStep. Frames whose callbacks took longer than one step at
+app.stepsPerSecond (33.3 ms at 30 steps per second) are counted as missed.
+When the program exits, the profile is printed, or written as JSON.
+
+With overlay=True a Label in the top-left corner shows the frames per
+second and the 95th-percentile onStep time over the last RECENT_STEPS
+steps.
+
+Nothing is wrapped unless installProfiler() is called, so a demo run
+without the profiler pays nothing for it. To profile a demo:
+    python -m demokit.profiler projects/bouncing_ball/main.py
+    python -m demokit.profiler --out profile.json basics/simple_animation.py
+    python -m demokit.run --profile --profile-overlay projects/bouncing_ball/main.py
+
+Prerequisites:
+- Python 3.6+
+"""
+
+import argparse
+import atexit
+import bisect
+import collections
+import functools
+import json
+import random
+import sys
+import time
+import types
+
+from demokit.loader import CALLBACK_NAMES, loadDemo, sameArity
+
+# Upper bounds of the histogram buckets, in ms; the last bucket has no bound
+HISTOGRAM_BOUNDS_MS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100]
+
+# The overlay shows the last RECENT_STEPS steps and is updated every
+# OVERLAY_EVERY steps
+RECENT_STEPS = 90
+OVERLAY_EVERY = 15
+
+
+# =============================================================================
+# HISTOGRAMS
+# =============================================================================
+
+class LatencyHistogram:
+    """
+    Call times of one function: counts per bucket of HISTOGRAM_BOUNDS_MS,
+    plus the number of calls and the total and longest time.
+    """
+
+    def __init__(self):
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+
+    def add(self, ms):
+        self.buckets[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.longest:
+            self.longest = ms
+
+    def percentile(self, fraction):
+        """
+        The upper bound of the bucket holding the given fraction of calls
+        (0.95 for the 95th percentile), or the longest time for the last one.
+        """
+        if self.count == 0:
+            return 0.0
+        wanted = fraction * self.count
+        seen = 0
+        for bound, count in zip(HISTOGRAM_BOUNDS_MS, self.buckets):
+            seen += count
+            if seen >= wanted:
+                return min(bound, self.longest)
+        return self.longest
+
+    def summary(self):
+        labels = [f'<{bound}' for bound in HISTOGRAM_BOUNDS_MS]
+        labels.append(f'>={HISTOGRAM_BOUNDS_MS[-1]}')
+        return {
+            'calls': self.count,
+            'totalMs': round(self.total, 3),
+            'meanMs': round(self.total / self.count, 4) if self.count else 0.0,
+            'p95Ms': self.percentile(0.95),
+            'maxMs': round(self.longest, 3),
+            'histogramMs': dict(zip(labels, self.buckets)),
+        }
+
+
+# =============================================================================
+# PROFILER
+# =============================================================================
+
+class Profiler:
+    """
+    The timings of one demo. `histograms` maps each wrapped callback and
+    function name to its LatencyHistogram; `frames` and `missedFrames`
+    count frames and the ones over `budgetMs`.
+    """
+
+    def __init__(self, demo, budgetMs=None):
+        self.demo = demo
+        self.budgetMs = budgetMs or 1000 / demo.app.stepsPerSecond
+        self.histograms = {}
+        self.frames = 0
+        self.missedFrames = 0
+        self.frameMs = 0.0          # callback time so far in this frame
+        self.recentSteps = collections.deque(maxlen=RECENT_STEPS)
+        self.stepStarts = collections.deque(maxlen=RECENT_STEPS)
+        self.overlay = None
+
+    def timeCallback(self, name, fn):
+        """A callback that times `fn` and counts the frame after onStep."""
+        histogram = self.histograms.setdefault(name, LatencyHistogram())
+        perfCounter = time.perf_counter
+
+        def timed(*args):
+            start = perfCounter()
+            try:
+                return fn(*args)
+            finally:
+                ms = (perfCounter() - start) * 1000
+                histogram.add(ms)
+                self.frameMs += ms
+                if name == 'onStep':
+                    self.endFrame(start, ms)
+
+        return sameArity(fn, timed)
+
+    def timeFunction(self, name, fn):
+        """A function that times `fn` (called by the demo itself)."""
+        histogram = self.histograms.setdefault(name, LatencyHistogram())
+        perfCounter = time.perf_counter
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = perfCounter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.add((perfCounter() - start) * 1000)
+
+        return timed
+
+    def endFrame(self, stepStart, stepMs):
+        self.frames += 1
+        if self.frameMs > self.budgetMs:
+            self.missedFrames += 1
+        self.frameMs = 0.0
+        self.recentSteps.append(stepMs)
+        self.stepStarts.append(stepStart)
+        if self.overlay is not None and self.frames % OVERLAY_EVERY == 0:
+            self.updateOverlay()
+
+    def recentFps(self):
+        """Steps per second over the last RECENT_STEPS steps."""
+        starts = self.stepStarts
+        if len(starts) < 2 or starts[-1] == starts[0]:
+            return 0.0
+        return (len(starts) - 1) / (starts[-1] - starts[0])
+
+    def recentP95(self):
+        times = sorted(self.recentSteps)
+        return times[int(0.95 * (len(times) - 1))] if times else 0.0
+
+    def updateOverlay(self):
+        self.overlay.value = (f'{self.recentFps():.0f} fps, '
+                              f'p95 step {self.recentP95():.2f} ms')
+        self.overlay.left = 5
+
+    def report(self):
+        return {
+            'demo': self.demo.path,
+            'budgetMs': round(self.budgetMs, 2),
+            'frames': self.frames,
+            'missedFrames': self.missedFrames,
+            'functions': {name: histogram.summary() for name, histogram
+                          in self.histograms.items() if histogram.count},
+        }
+
+    def printReport(self, file=sys.stderr):
+        report = self.report()
+        print(f'Profile of {report["demo"]}: {report["frames"]} frames, '
+              f'{report["missedFrames"]} over the '
+              f'{report["budgetMs"]:.1f} ms budget', file=file)
+        print(f'  {"function":<22}{"calls":>8}{"mean ms":>10}{"p95 ms":>9}'
+              f'{"max ms":>9}', file=file)
+        for name, summary in sorted(report['functions'].items(),
+                                    key=lambda item: -item[1]['totalMs']):
+            print(f'  {name:<22}{summary["calls"]:>8}{summary["meanMs"]:>10.3f}'
+                  f'{summary["p95Ms"]:>9.2f}{summary["maxMs"]:>9.2f}',
+                  file=file)
+
+    def dump(self, path=None):
+        """Prints the profile, or writes it to `path` as JSON."""
+        if path is None:
+            self.printReport()
+        else:
+            with open(path, 'w') as file:
+                json.dump(self.report(), file, indent=2)
+
+
+def installProfiler(demo, overlay=False, out=None, atExit=True):
+    """
+    Wraps the demo's callbacks and top-level functions with timers and
+    returns the Profiler (also set as demo.profiler). With overlay=True a
+    Label shows the live frame rate and p95 step time. With atExit=True the
+    profile is printed (or written to `out` as JSON) when the program exits.
+    """
+    profiler = Profiler(demo)
+    namespace = demo.namespace
+    for name, value in list(namespace.items()):
+        if name in CALLBACK_NAMES:
+            if callable(value):
+                namespace[name] = profiler.timeCallback(name, value)
+        elif (isinstance(value, types.FunctionType) and
+              value.__globals__ is namespace):
+            namespace[name] = profiler.timeFunction(name, value)
+
+    if overlay:
+        profiler.overlay = demo.cmu.Label('', 5, 10, size=10, fill='gray',
+                                          align='left')
+    if atExit:
+        atexit.register(profiler.dump, out)
+    demo.profiler = profiler
+    return profiler
+
+
+# =============================================================================
+# PROFILING WITHOUT A WINDOW
+# =============================================================================
+
+def main():
+    from demokit.bench import inputsForFrame
+
+    parser = argparse.ArgumentParser(
+        description="Profile a demo's callbacks without a window")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='write the profile here as JSON')
+    parser.add_argument('demo', help='path to the demo script')
+    parser.add_argument('demoArgs', nargs=argparse.REMAINDER,
+                        help='options passed on to the demo')
+    args = parser.parse_args()
+
+    demo = loadDemo(args.demo, args.demoArgs, seed=args.seed)
+    profiler = installProfiler(demo, atExit=False)
+    rng = random.Random(args.seed)
+    for frame in range(args.frames):
+        events = inputsForFrame(frame, rng)
+        if not demo.app.paused:
+            events.append(('onStep', ()))
+        for name, eventArgs in events:
+            demo.call(name, *eventArgs)
+    if args.out:
+        profiler.dump(args.out)
+    else:
+        profiler.printReport(sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+CMU Graphics - Shape Rasterizer
+===============================
+Draws cmu_graphics shapes (real or stand-in) into a Pillow image, without
+a window.
+
+cmu_graphics only draws shapes on screen. To cache part of a scene as a
+picture, or to save frames to image files, demokit needs to draw shapes
+itself. render() draws a list of shapes, in order, into a new image:
+
+    from demokit.raster import render
+    image = render(demo.app.group, 400, 400, background='white')
+    image.save('frame.png')
+
+Everything is drawn from the shapes' public properties (left, top, fill,
+rotateAngle, pointList, ...), so it works the same for the real library
+and the stand-in. The drawing is close to cmu_graphics, not identical:
+labels use Pillow's default font, gradients are drawn in their first
+color, and dashed borders and line arrows are drawn solid and plain.
+
+Prerequisites:
+- Python 3.6+
+- Pillow installed (pip install pillow)
+"""
+
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+from demokit.geometry import children, shapeKind, shapePoints
+
+colorCache = {}
+fontCache = {}
+
+
+# =============================================================================
+# PROPERTIES
+# =============================================================================
+
+def toRGBA(color, opacity):
+    """
+    A Pillow (r, g, b, a) color for a cmu_graphics color: a name like
+    'steelBlue', an rgb() value, or a gradient (drawn in its first color).
+    Returns None for no color (fill=None).
+    """
+    if color is None:
+        return None
+    if isinstance(color, str):
+        rgb = colorCache.get(color)
+        if rgb is None:
+            try:
+                rgb = ImageColor.getrgb(color.lower())[:3]
+            except ValueError:
+                rgb = (128, 128, 128)
+            colorCache[color] = rgb
+    elif isinstance(color, (tuple, list)):
+        rgb = tuple(color[:3])
+    elif hasattr(color, 'red'):
+        rgb = (color.red, color.green, color.blue)
+    elif getattr(color, 'colors', None):
+        return toRGBA(color.colors[0], opacity)
+    else:
+        rgb = (128, 128, 128)
+    return rgb + (round(255 * opacity / 100),)
+
+
+def getFont(size):
+    font = fontCache.get(size)
+    if font is None:
+        try:
+            font = ImageFont.load_default(size=max(1, round(size)))
+        except TypeError:
+            # Pillow before 10.1 has a single fixed-size default font
+            font = ImageFont.load_default()
+        fontCache[size] = font
+    return font
+
+
+# =============================================================================
+# DRAWING
+# =============================================================================
+
+def drawShape(image, shape, opacity=100, ignoreVisible=False):
+    """
+    Draws one shape (and a group's shapes) onto `image`. `opacity` is the
+    opacity of the groups the shape is in. With ignoreVisible=True the
+    shape is drawn even if it is hidden (its own shapes still need to be
+    visible).
+    """
+    if not shape.visible and not ignoreVisible:
+        return
+    opacity = opacity * shape.opacity / 100
+    if opacity <= 0:
+        return
+    kind = shapeKind(shape)
+    if kind == 'Group':
+        for child in children(shape):
+            drawShape(image, child, opacity)
+        return
+    if kind == 'Image':
+        drawImage(image, shape, opacity)
+        return
+
+    # See-through shapes are drawn on a layer of their own, then blended in
+    if opacity < 100:
+        target = Image.new('RGBA', image.size, (0, 0, 0, 0))
+    else:
+        target = image
+    draw = ImageDraw.Draw(target)
+
+    if kind == 'Line':
+        color = toRGBA(shape.fill, 100)
+        if color is not None:
+            draw.line([(shape.x1, shape.y1), (shape.x2, shape.y2)], fill=color,
+                      width=max(1, round(shape.lineWidth)))
+    elif kind == 'Label':
+        color = toRGBA(shape.fill, 100)
+        if color is not None:
+            draw.text((shape.centerX, shape.centerY), str(shape.value),
+                      fill=color, font=getFont(shape.size), anchor='mm')
+    else:
+        fill = toRGBA(shape.fill, 100)
+        border = toRGBA(shape.border, 100)
+        width = max(1, round(shape.borderWidth)) if border is not None else 0
+        points = shapePoints(shape, kind)
+        box = [shape.left, shape.top, shape.right, shape.bottom]
+        if points is not None:
+            draw.polygon(points, fill=fill, outline=border, width=width)
+        elif kind == 'Arc':
+            start = shape.startAngle - 90
+            draw.pieslice(box, start, start + shape.sweepAngle, fill=fill,
+                          outline=border, width=width)
+        else:
+            draw.ellipse(box, fill=fill, outline=border, width=width)
+
+    if target is not image:
+        if opacity < 100:
+            alpha = target.getchannel('A').point(lambda a: a * opacity // 100)
+            target.putalpha(alpha)
+        image.alpha_composite(target)
+
+
+def drawImage(image, shape, opacity):
+    """Draws an Image shape whose url is a Pillow image."""
+    picture = shape.url
+    if not isinstance(picture, Image.Image):
+        picture = getattr(picture, 'image', None)
+        if not isinstance(picture, Image.Image):
+            return
+    picture = picture.convert('RGBA')
+    size = (max(1, round(shape.width)), max(1, round(shape.height)))
+    if picture.size != size:
+        picture = picture.resize(size)
+    if opacity < 100:
+        alpha = picture.getchannel('A').point(lambda a: a * opacity // 100)
+        picture.putalpha(alpha)
+    image.alpha_composite(picture, (round(shape.left), round(shape.top)))
+
+
+def render(shapes, width, height, background=None):
+    """
+    Draws `shapes` (any list of shapes, or a Group such as app.group) in
+    order into a new width x height RGBA image and returns it. The image
+    is filled with `background` first, or left transparent.
+    """
+    fill = toRGBA(background, 100) or (0, 0, 0, 0)
+    image = Image.new('RGBA', (width, height), fill)
+    for shape in shapes:
+        drawShape(image, shape)
+    return image
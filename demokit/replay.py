@@ -0,0 +1,707 @@
+"""
+CMU Graphics - Input Recording and Replay
+=========================================
+Records every input a demo gets (key presses, held keys, mouse clicks,
+...) together with the frame it arrived on, and plays the recording back
+without a window, so a session that showed a bug can be played again
+exactly, as many times as needed.
+
+Bugs often depend on when things happen. In basics/simple_animation.py,
+holding the left arrow moves the circle 40 pixels per frame but holding
+the right arrow only 4, so where the circle ends up depends on how many
+frames each key was held for. In the bouncing ball project, an arrow-key
+push just before a bounce sends the ball somewhere else than the same
+push just after it. A recording keeps the exact order of the callbacks
+and of the onSteps between them.
+
+Recording: installRecorder() wraps the demo's callbacks. Every onStep is
+one frame. A run of onSteps with no input between them is stored as one
+count. Every input callback is stored as one byte saying which callback
+it was, then its arguments. A string, such as a key name, is stored the
+first time it is used and referred to by number after that. A key press
+takes 4 bytes, a click about 8, and a frame with no input almost nothing.
+
+    MAGIC, header length, header (JSON: demo path, arguments, random seed)
+    then records, each starting with an op byte:
+      OP_STEPS n          n onSteps in a row
+      OP_STRING text      the next string number is `text`
+      OP_CALLBACK + i     a call to INPUT_CALLBACKS[i], then its arguments
+      OP_END fingerprint  the scene at the end (headless recordings only)
+
+Replaying: a Replayer loads the demo against the stand-in cmu_graphics
+module, with the random seed it was recorded with, and makes the recorded
+calls in the same order. Every `snapshotEvery` frames it saves a snapshot
+of the demo's state: its global variables, the app's variables, every
+shape, and the random module's state. seek(n) restores the last snapshot
+at or before frame n and plays on from there, instead of from frame 0.
+Snapshots can be written to a file and loaded by later replays of the
+same recording, so a regression test can seek straight to the frame it
+checks.
+
+A replay is exact when the demo's only randomness is Python's random
+module. The bouncing ball's --balls mode (an unseeded NumPy generator),
+--physics-rate mode (a thread that follows the real clock) and
+--governor mode (which lowers the quality by measured step times) don't
+replay exactly, and a demo running a thread can't be snapshotted. Labels
+that only show timings are left out of the comparison of the final scene
+(see sceneFingerprint). Demos
+recorded in a window are replayed against the stand-in module, which
+estimates Label sizes and ignores rotateAngle in shape bounds (see
+stub_cmu_graphics.py).
+
+Prerequisites:
+- Python 3.6+
+- Pillow installed (only for --png)
+
+Record a session in a window, then replay it:
+    python -m demokit.run --record session.rec basics/simple_animation.py
+    python -m demokit.replay play session.rec
+    python -m demokit.replay play session.rec --seek 900 --png frame900.png
+Record the benchmark's input script without a window, and check that
+seeking gives the same state as playing from the start:
+    python -m demokit.replay record --frames 3000 --out session.rec projects/bouncing_ball/main.py
+    python -m demokit.replay play session.rec --seek 2500 1200 --check
+Keep the snapshots in a file, so the next replay can seek straight away:
+    python -m demokit.replay play session.rec --snapshot-file session.snap
+    python -m demokit.replay play session.rec --snapshot-file session.snap --seek 2500
+"""
+
+import argparse
+import atexit
+import glob
+import hashlib
+import io
+import json
+import os
+import pickle
+import random
+import struct
+import sys
+import time
+import types
+
+from demokit.loader import (CALLBACK_NAMES, REPO_ROOT, loadDemo, resolvePath,
+                            sameArity)
+
+MAGIC = b'CMUREC1\n'
+SNAPSHOT_MAGIC = b'CMUSNAP1'
+
+# Frames between snapshots (10 seconds at 30 steps per second)
+SNAPSHOT_EVERY = 300
+
+# The first byte of each record
+OP_STEPS = 0
+OP_STRING = 1
+OP_END = 2
+OP_CALLBACK = 8                 # + the callback's index in INPUT_CALLBACKS
+INPUT_CALLBACKS = [name for name in CALLBACK_NAMES if name != 'onStep']
+
+# The first byte of each argument
+ARG_INT, ARG_FLOAT, ARG_STRING, ARG_LIST, ARG_NONE, ARG_TRUE, ARG_FALSE = range(7)
+
+# What pickle raises for objects it can't copy
+PICKLE_ERRORS = (TypeError, AttributeError, pickle.PicklingError)
+
+# Bytes in a scene fingerprint
+FINGERPRINT_SIZE = 16
+
+# The recorder writes to its file whenever this many bytes are waiting
+FLUSH_BYTES = 1 << 16
+
+# Global variables a snapshot refers to instead of copying
+SHARED_TYPES = (types.FunctionType, types.BuiltinFunctionType,
+                types.MethodType, types.ModuleType, type)
+
+
+# =============================================================================
+# ENCODING
+# =============================================================================
+
+def writeVarint(out, n):
+    """Appends the non-negative integer n to `out`, 7 bits per byte."""
+    while n >= 0x80:
+        out.append(n & 0x7f | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def readVarint(data, pos):
+    """Reads an integer written by writeVarint(); returns it and the next position."""
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def readValue(data, pos, strings):
+    """Reads one argument written by Recorder.writeValue()."""
+    tag = data[pos]
+    pos += 1
+    if tag == ARG_INT:
+        n, pos = readVarint(data, pos)
+        return (n >> 1) if n & 1 == 0 else -((n + 1) >> 1), pos
+    if tag == ARG_FLOAT:
+        return struct.unpack_from('<d', data, pos)[0], pos + 8
+    if tag == ARG_STRING:
+        index, pos = readVarint(data, pos)
+        return strings[index], pos
+    if tag == ARG_LIST:
+        count, pos = readVarint(data, pos)
+        items = []
+        for i in range(count):
+            item, pos = readValue(data, pos, strings)
+            items.append(item)
+        return items, pos
+    if tag == ARG_NONE:
+        return None, pos
+    if tag in (ARG_TRUE, ARG_FALSE):
+        return tag == ARG_TRUE, pos
+    raise ValueError(f'unknown argument type {tag} at byte {pos - 1}')
+
+
+# =============================================================================
+# RECORDING
+# =============================================================================
+
+class Recorder:
+    """
+    Writes a recording to `file` (a path or a binary file) as the demo's
+    callbacks are called: step() for every onStep, input() for every
+    other callback. close() writes what's left.
+    """
+
+    def __init__(self, file, demoPath, args=(), seed=0):
+        self.file = open(file, 'wb') if isinstance(file, str) else file
+        self.buffer = bytearray(MAGIC)
+        path = os.path.abspath(demoPath)
+        if path.startswith(REPO_ROOT + os.sep):
+            path = os.path.relpath(path, REPO_ROOT)
+        header = json.dumps({'demo': path, 'args': list(args),
+                             'seed': seed}).encode()
+        writeVarint(self.buffer, len(header))
+        self.buffer += header
+        self.strings = {}
+        self.pendingSteps = 0
+        self.frames = 0
+        self.inputs = 0
+        self.closed = False
+
+    def step(self):
+        self.pendingSteps += 1
+        self.frames += 1
+
+    def input(self, name, args):
+        self.writeSteps()
+        event = bytearray([OP_CALLBACK + INPUT_CALLBACKS.index(name)])
+        writeVarint(event, len(args))
+        for value in args:
+            self.writeValue(event, value)
+        self.buffer += event
+        self.inputs += 1
+        if len(self.buffer) >= FLUSH_BYTES:
+            self.flush()
+
+    def writeSteps(self):
+        if self.pendingSteps:
+            self.buffer.append(OP_STEPS)
+            writeVarint(self.buffer, self.pendingSteps)
+            self.pendingSteps = 0
+
+    def writeValue(self, out, value):
+        # bool before int: True and False are ints too
+        if value is None:
+            out.append(ARG_NONE)
+        elif isinstance(value, bool):
+            out.append(ARG_TRUE if value else ARG_FALSE)
+        elif isinstance(value, int):
+            out.append(ARG_INT)
+            writeVarint(out, value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            out.append(ARG_FLOAT)
+            out += struct.pack('<d', value)
+        elif isinstance(value, str):
+            out.append(ARG_STRING)
+            writeVarint(out, self.stringNumber(value))
+        elif isinstance(value, (list, tuple)):
+            out.append(ARG_LIST)
+            writeVarint(out, len(value))
+            for item in value:
+                self.writeValue(out, item)
+        else:
+            raise TypeError(f"can't record a callback argument of type "
+                            f'{type(value).__name__}')
+
+    def stringNumber(self, text):
+        """The number of `text`, storing it first if it's new."""
+        number = self.strings.get(text)
+        if number is None:
+            number = self.strings[text] = len(self.strings)
+            encoded = text.encode()
+            self.buffer.append(OP_STRING)
+            writeVarint(self.buffer, len(encoded))
+            self.buffer += encoded
+        return number
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self, fingerprint=None):
+        """
+        Writes the rest of the recording and closes the file. A
+        `fingerprint` (see sceneFingerprint) is stored so that replays can
+        check they ended with the same scene.
+        """
+        if self.closed:
+            return
+        self.writeSteps()
+        if fingerprint is not None:
+            self.buffer.append(OP_END)
+            self.buffer += fingerprint
+        self.flush()
+        self.file.close()
+        self.closed = True
+
+
+def installRecorder(demo, path, atExit=True):
+    """
+    Wraps the demo's callbacks so that every call is recorded to `path`,
+    and returns the Recorder (also set as demo.recorder). With
+    atExit=True the recording is closed when the program exits.
+    """
+    recorder = Recorder(path, demo.path, demo.args, demo.seed)
+    namespace = demo.namespace
+    for name in CALLBACK_NAMES:
+        fn = demo.callback(name)
+        if fn is None:
+            continue
+        # Recorded before the call, so a callback that raises is recorded too
+        if name == 'onStep':
+            def recorded(*args, fn=fn):
+                recorder.step()
+                return fn(*args)
+        else:
+            def recorded(*args, fn=fn, name=name):
+                recorder.input(name, args)
+                return fn(*args)
+        namespace[name] = sameArity(fn, recorded)
+    if atExit:
+        atexit.register(recorder.close)
+    demo.recorder = recorder
+    return recorder
+
+
+# =============================================================================
+# READING A RECORDING
+# =============================================================================
+
+class Recording:
+    """
+    A recording read from a file: its header, and `ops`, the recorded
+    calls in order. An op is (name, args) for an input callback, or
+    (None, n) for n onSteps in a row.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            data = file.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(f'{path} is not a demokit recording')
+        self.path = path
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.size = len(data)
+
+        length, pos = readVarint(data, len(MAGIC))
+        self.header = json.loads(data[pos:pos + length].decode())
+        pos += length
+
+        strings = []
+        self.ops = []
+        self.frames = 0
+        self.inputs = 0
+        self.fingerprint = None
+        while pos < len(data):
+            op = data[pos]
+            pos += 1
+            if op == OP_STEPS:
+                count, pos = readVarint(data, pos)
+                self.ops.append((None, count))
+                self.frames += count
+            elif op == OP_STRING:
+                length, pos = readVarint(data, pos)
+                strings.append(data[pos:pos + length].decode())
+                pos += length
+            elif op == OP_END:
+                self.fingerprint = bytes(data[pos:pos + FINGERPRINT_SIZE])
+                pos += FINGERPRINT_SIZE
+            elif OP_CALLBACK <= op < OP_CALLBACK + len(INPUT_CALLBACKS):
+                count, pos = readVarint(data, pos)
+                args = []
+                for i in range(count):
+                    value, pos = readValue(data, pos, strings)
+                    args.append(value)
+                self.ops.append((INPUT_CALLBACKS[op - OP_CALLBACK], tuple(args)))
+                self.inputs += 1
+            else:
+                raise ValueError(f'{path}: unknown record {op} at byte {pos - 1}')
+
+
+def sceneFingerprint(app):
+    """
+    A hash of everything on the canvas (every shape's kind and properties,
+    in drawing order) and of the app's own variables, to check that two
+    runs ended in the same state. Works with the stand-in module's app.
+
+    Labels and app variables that show the real clock (like a
+    milliseconds-per-step label) differ on every run. A demo lists them in
+    app.clockDependent (the Labels themselves, and the names of the app
+    variables), and they are left out.
+    """
+    digest = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+    skipped = vars(app).get('clockDependent', ())
+    skippedShapes = {id(value) for value in skipped
+                     if not isinstance(value, str)}
+    skippedNames = {value for value in skipped if isinstance(value, str)}
+    skippedNames.update(('group', '_backend', 'clockDependent'))
+
+    def visit(shape):
+        digest.update(shape._kind.encode())
+        if id(shape) in skippedShapes:
+            return
+        digest.update(describe(shape._props).encode())
+        for child in getattr(shape, '_children', ()):
+            visit(child)
+
+    for shape in app.group:
+        visit(shape)
+    variables = {name: value for name, value in vars(app).items()
+                 if name not in skippedNames}
+    digest.update(describe(variables).encode())
+    return digest.digest()
+
+
+def describe(value):
+    """repr() of plain values; the type's name for anything else."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(describe(item) for item in value) + ']'
+    if isinstance(value, dict):
+        return '{' + ','.join(f'{key}:{describe(value[key])}'
+                              for key in sorted(value, key=str)) + '}'
+    kind = getattr(value, '_kind', None)
+    return kind if isinstance(kind, str) else type(value).__name__
+
+
+# =============================================================================
+# REPLAYING
+# =============================================================================
+
+class SnapshotPickler(pickle.Pickler):
+    """Pickles a demo's state, referring to `shared` objects by name."""
+
+    def __init__(self, file, shared):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.names = {}
+        for name, obj in shared.items():
+            self.names.setdefault(id(obj), name)
+
+    def persistent_id(self, obj):
+        return self.names.get(id(obj))
+
+
+def pickleSnapshot(state, shared):
+    file = io.BytesIO()
+    SnapshotPickler(file, shared).dump(state)
+    return file.getvalue()
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, shared):
+        super().__init__(file)
+        self.shared = shared
+
+    def persistent_load(self, name):
+        return self.shared[name]
+
+
+class Replayer:
+    """
+    Plays the recording at `path` on a freshly loaded demo. `frame` is the
+    number of onSteps played so far. A snapshot is kept every
+    `snapshotEvery` frames (0 for none); with a `snapshotFile`, snapshots
+    saved there by an earlier replay of the same recording are loaded
+    first.
+    """
+
+    def __init__(self, path, snapshotEvery=SNAPSHOT_EVERY, snapshotFile=None):
+        self.recording = Recording(path)
+        header = self.recording.header
+        self.demo = loadDemo(header['demo'], header['args'], seed=header['seed'])
+        self.snapshotEvery = snapshotEvery
+        self.frame = 0
+        self.position = 0           # index of the next op
+        self.stepsDone = 0          # onSteps already played of that op
+        self.inputsSinceStep = 0
+        self.restores = 0
+        # Globals that snapshots leave as they are (see takeSnapshot)
+        self.keptGlobals = set()
+        # frame -> (position, stepsDone, pickled state)
+        self.snapshots = {}
+        self.takeSnapshot()
+        if snapshotFile is not None and os.path.exists(snapshotFile):
+            self.loadSnapshots(snapshotFile)
+
+    # -------------------------------------------------------------------------
+    # Playing
+    # -------------------------------------------------------------------------
+    def play(self, frame=None):
+        """
+        Plays on until `frame` onSteps have been played (stopping before
+        any inputs that came after that onStep), or to the end of the
+        recording.
+        """
+        ops = self.recording.ops
+        demo = self.demo
+        every = self.snapshotEvery
+        while self.position < len(ops):
+            if frame is not None and self.frame >= frame:
+                break
+            name, args = ops[self.position]
+            if name is not None:
+                demo.call(name, *args)
+                self.position += 1
+                self.inputsSinceStep += 1
+                continue
+            demo.call('onStep')
+            self.frame += 1
+            self.stepsDone += 1
+            self.inputsSinceStep = 0
+            if self.stepsDone == args:
+                self.position += 1
+                self.stepsDone = 0
+            if every and self.frame % every == 0 and self.frame not in self.snapshots:
+                self.takeSnapshot()
+
+    def seek(self, frame):
+        """
+        Puts the demo in its state right after onStep number `frame`,
+        starting from the last snapshot at or before it if that is closer
+        than where the replay is now.
+        """
+        if not 0 <= frame <= self.recording.frames:
+            raise ValueError(f'frame {frame} is outside the recording '
+                             f'(0 to {self.recording.frames})')
+        nearest = max(saved for saved in self.snapshots if saved <= frame)
+        behind = frame < self.frame or (frame == self.frame and
+                                        self.inputsSinceStep > 0)
+        if behind or nearest > self.frame:
+            self.restoreSnapshot(nearest)
+        self.play(frame)
+
+    # -------------------------------------------------------------------------
+    # Snapshots
+    # -------------------------------------------------------------------------
+    def sharedObjects(self):
+        """
+        The objects a snapshot refers to instead of copying: the app and
+        the stand-in module's bookkeeping (whose variables are restored in
+        place, because the demo and the module hold on to them), and the
+        demo's functions, classes and modules and what it got from
+        cmu_graphics, which don't change.
+        """
+        demo = self.demo
+        shared = {'namespace': demo.namespace, 'app': demo.app,
+                  'backend': demo.cmu.backend}
+        for name in demo.cmu.__all__:
+            shared['cmu.' + name] = getattr(demo.cmu, name)
+        for name, value in demo.namespace.items():
+            if isinstance(value, SHARED_TYPES) or name in self.keptGlobals:
+                shared['global.' + name] = value
+        return shared
+
+    def takeSnapshot(self):
+        demo = self.demo
+        state = (dict(demo.namespace), vars(demo.cmu.backend),
+                 vars(demo.app), random.getstate())
+        try:
+            data = pickleSnapshot(state, self.sharedObjects())
+        except PICKLE_ERRORS:
+            # Some globals can't be copied, like the argparse parser that
+            # reads the demo's options. Keep those as they are, then try again
+            shared = self.sharedObjects()
+            for name, value in demo.namespace.items():
+                try:
+                    pickleSnapshot(value, shared)
+                except PICKLE_ERRORS:
+                    self.keptGlobals.add(name)
+            try:
+                data = pickleSnapshot(state, self.sharedObjects())
+            except PICKLE_ERRORS as error:
+                raise RuntimeError(f"can't snapshot {demo.path} at frame "
+                                   f'{self.frame}: {error}') from error
+        self.snapshots[self.frame] = (self.position, self.stepsDone, data)
+
+    def restoreSnapshot(self, frame):
+        position, stepsDone, data = self.snapshots[frame]
+        demo = self.demo
+        namespace, backend, app, randomState = SnapshotUnpickler(
+            io.BytesIO(data), self.sharedObjects()).load()
+        demo.namespace.clear()
+        demo.namespace.update(namespace)
+        for obj, variables in ((demo.cmu.backend, backend), (demo.app, app)):
+            vars(obj).clear()
+            vars(obj).update(variables)
+        random.setstate(randomState)
+        self.frame = frame
+        self.position = position
+        self.stepsDone = stepsDone
+        self.inputsSinceStep = 0
+        self.restores += 1
+
+    def snapshotKey(self):
+        """
+        Identifies the recording and the demo code, so that snapshots are
+        only reused when both are unchanged: a hash of the recording and
+        of the .py files in the demo's folder.
+        """
+        digest = hashlib.sha256(self.recording.digest.encode())
+        folder = os.path.dirname(resolvePath(self.recording.header['demo']))
+        for path in sorted(glob.glob(os.path.join(folder, '*.py'))):
+            with open(path, 'rb') as file:
+                digest.update(file.read())
+        return digest.hexdigest()
+
+    def saveSnapshots(self, path):
+        with open(path, 'wb') as file:
+            file.write(SNAPSHOT_MAGIC)
+            pickle.dump({'key': self.snapshotKey(), 'snapshots': self.snapshots},
+                        file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loadSnapshots(self, path):
+        """
+        Adds the snapshots saved in `path`. Returns False (and loads
+        nothing) if they were saved for another recording or for other
+        demo code.
+        """
+        with open(path, 'rb') as file:
+            if file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                return False
+            saved = pickle.load(file)
+        if saved['key'] != self.snapshotKey():
+            return False
+        for frame, snapshot in saved['snapshots'].items():
+            self.snapshots.setdefault(frame, snapshot)
+        return True
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def recordScript(args):
+    """Records the benchmark's input script (see bench.py) without a window."""
+    from demokit.bench import inputsForFrame
+
+    demo = loadDemo(args.demo, args.demoArgs, seed=args.seed)
+    recorder = installRecorder(demo, args.out, atExit=False)
+    rng = random.Random(args.seed)
+    for frame in range(args.frames):
+        events = inputsForFrame(frame, rng)
+        if not demo.app.paused:
+            events.append(('onStep', ()))
+        for name, eventArgs in events:
+            demo.call(name, *eventArgs)
+    recorder.close(sceneFingerprint(demo.app))
+    print(f'Recorded {recorder.frames} frames and {recorder.inputs} inputs '
+          f'to {args.out} ({os.path.getsize(args.out)} bytes)')
+
+
+def playRecording(args):
+    start = time.perf_counter()
+    replayer = Replayer(args.recording, args.snapshot_every, args.snapshot_file)
+    recording = replayer.recording
+    loaded = len(replayer.snapshots) - 1
+    print(f'{recording.header["demo"]}: {recording.frames} frames, '
+          f'{recording.inputs} inputs, {recording.size} bytes'
+          + (f', {loaded} snapshots loaded' if loaded else ''))
+
+    failed = False
+    if not args.seek:
+        replayer.play()
+        seconds = time.perf_counter() - start
+        print(f'Played to the end in {seconds:.2f} s '
+              f'({recording.frames / max(seconds, 1e-9):,.0f} frames per second)')
+        if recording.fingerprint is not None:
+            same = sceneFingerprint(replayer.demo.app) == recording.fingerprint
+            print('Final scene ' + ('matches the recorded session' if same
+                                    else 'DIFFERS from the recorded session'))
+            failed = not same
+
+    for frame in args.seek:
+        start = time.perf_counter()
+        replayer.seek(frame)
+        ms = (time.perf_counter() - start) * 1000
+        fingerprint = sceneFingerprint(replayer.demo.app)
+        line = f'Seek to frame {frame}: {ms:.1f} ms, scene {fingerprint.hex()}'
+        if args.check:
+            linear = Replayer(args.recording, snapshotEvery=0)
+            linear.play(frame)
+            same = sceneFingerprint(linear.demo.app) == fingerprint
+            line += ', same as playing from frame 0' if same else ', DIFFERS from playing from frame 0'
+            failed = failed or not same
+        print(line)
+
+    if args.png:
+        from demokit import raster
+
+        app = replayer.demo.app
+        raster.render(app.group, app.width, app.height,
+                      app.background).save(args.png)
+        print(f'Frame {replayer.frame} drawn to {args.png}')
+    if args.snapshot_file:
+        replayer.saveSnapshots(args.snapshot_file)
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Record and replay the inputs of a demo')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser(
+        'record', help="record the benchmark's input script without a window")
+    record.add_argument('--frames', type=int, default=1800)
+    record.add_argument('--seed', type=int, default=0)
+    record.add_argument('--out', required=True, help='the recording to write')
+    record.add_argument('demo', help='path to the demo script')
+    record.add_argument('demoArgs', nargs=argparse.REMAINDER,
+                        help='options passed on to the demo')
+
+    play = commands.add_parser('play', help='replay a recording')
+    play.add_argument('recording')
+    play.add_argument('--seek', type=int, nargs='*', default=[],
+                      help='frames to seek to, in order (without --seek the '
+                           'whole recording is played)')
+    play.add_argument('--check', action='store_true',
+                      help='check each seek against playing from frame 0')
+    play.add_argument('--snapshot-every', type=int, default=SNAPSHOT_EVERY)
+    play.add_argument('--snapshot-file',
+                      help='load snapshots from this file if it has some for '
+                           'this recording, and save them there afterwards')
+    play.add_argument('--png', help='draw the last frame seeked to (or the '
+                                    'end) to this PNG file (needs Pillow)')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        recordScript(args)
+    else:
+        sys.exit(playRecording(args))
+
+
+if __name__ == '__main__':
+    main()
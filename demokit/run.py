@@ -0,0 +1,135 @@
+"""
+CMU Graphics - Demo Runner
+==========================
+Runs a demo in a real cmu_graphics window, with demokit features switched
+on from the command line.
+
+The demo is loaded with loader.loadDemo() against the real cmu_graphics
+library, with cmu_graphics.run() switched off while the script runs. The
+features are then installed on the loaded demo, and the window is opened
+with callbacks that forward to the demo's (wrapped) callbacks.
+
+Prerequisites:
+- Python 3.6+
+- cmu_graphics library installed
+
+Run from the repository root; options for the demo itself go after its
+path:
+    python -m demokit.run basics/simple_animation.py
+    python -m demokit.run --coalesce projects/bouncing_ball/main.py
+    python -m demokit.run --coalesce projects/bouncing_ball/main.py --balls 500
+    python -m demokit.run --static-layer basics/shapes.py
+    python -m demokit.run --profile-overlay projects/bouncing_ball/main.py
+    python -m demokit.run --record session.rec basics/simple_animation.py
+    python -m demokit.run --pick basics/shapes.py
+    python -m demokit.run --cull projects/bouncing_ball/main.py --balls 500
+"""
+
+import argparse
+import sys
+
+from demokit.coalesce import installCoalescer
+from demokit.culling import installCuller
+from demokit.loader import CALLBACK_NAMES, loadDemo, sameArity
+from demokit.picking import installPicker
+from demokit.profiler import installProfiler
+from demokit.replay import installRecorder
+from demokit.static_layer import installStaticLayer
+
+
+def loadWithWindow(path, args):
+    """
+    Loads the demo against the real cmu_graphics library without opening
+    the window. Returns the Demo and the library's real run() function.
+    """
+    import cmu_graphics
+
+    # `from cmu_graphics import *` gives the demo the cmu_graphics.cmu_graphics
+    # module, so that is where the demo's cmu_graphics.run() is looked up
+    window = cmu_graphics.cmu_graphics
+    realRun = window.run
+    window.run = lambda **kwargs: None
+    try:
+        demo = loadDemo(path, args, cmu=cmu_graphics)
+    finally:
+        window.run = realRun
+    return demo, realRun
+
+
+def forwardCallbacks(demo, userGlobals):
+    """
+    cmu_graphics calls the onStep, onKeyPress, ... functions it finds in the
+    __main__ module, which here is this runner, not the demo. Put a function
+    in `userGlobals` for each of the demo's callbacks that calls the demo's
+    current version of it (after any features have wrapped it).
+    """
+    for name in CALLBACK_NAMES:
+        fn = demo.callback(name)
+        if fn is None:
+            continue
+
+        def forward(*args, name=name):
+            return demo.namespace[name](*args)
+
+        userGlobals[name] = sameArity(fn, forward)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run a demo with demokit features switched on')
+    parser.add_argument('--coalesce', action='store_true',
+                        help='buffer shape property writes until the end of '
+                             'each frame (see coalesce.py)')
+    parser.add_argument('--static-layer', action='store_true',
+                        help='draw the shapes that never change from cached '
+                             'images (see static_layer.py, needs Pillow)')
+    parser.add_argument('--cull', action='store_true',
+                        help='hide the shapes out of view or transparent, '
+                             'and show how many on the canvas (see '
+                             'culling.py)')
+    parser.add_argument('--profile', action='store_true',
+                        help='time every callback and print a profile on '
+                             'exit (see profiler.py)')
+    parser.add_argument('--profile-overlay', action='store_true',
+                        help='--profile, and show the frame rate and p95 '
+                             'step time on the canvas')
+    parser.add_argument('--profile-out',
+                        help='with --profile, write the profile here as JSON')
+    parser.add_argument('--pick', action='store_true',
+                        help='print the shape under every mouse press '
+                             '(see picking.py)')
+    parser.add_argument('--record', metavar='FILE',
+                        help='record every input to FILE, for replaying with '
+                             'python -m demokit.replay play FILE')
+    parser.add_argument('demo', help='path to the demo script')
+    parser.add_argument('demoArgs', nargs=argparse.REMAINDER,
+                        help='options passed on to the demo')
+    args = parser.parse_args()
+
+    demo, run = loadWithWindow(args.demo, args.demoArgs)
+    if args.pick:
+        installPicker(demo)
+    if args.coalesce:
+        installCoalescer(demo)
+    # After the coalescer, so the static layer sees its writes as they
+    # reach the shapes at the end of each callback
+    if args.static_layer:
+        installStaticLayer(demo)
+    # After the static layer, so the shapes it draws from images stay hidden
+    if args.cull:
+        installCuller(demo, overlay=True)
+    # Last, so the timings include the other features' work
+    if args.profile or args.profile_overlay:
+        installProfiler(demo, overlay=args.profile_overlay,
+                        out=args.profile_out)
+    # Outermost, so the recording has the callbacks exactly as cmu_graphics
+    # made them
+    if args.record:
+        installRecorder(demo, args.record)
+
+    forwardCallbacks(demo, sys.modules['__main__'].__dict__)
+    run()
+
+
+if __name__ == '__main__':
+    main()
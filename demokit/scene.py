@@ -0,0 +1,643 @@
+"""
+CMU Graphics - Scene Files
+==========================
+Describes a scene's shapes in a JSON or TOML file instead of a list of
+constructor calls, and loads it quickly on every run after the first.
+
+basics/shapes.py builds its scene with one constructor call per shape.
+Moving a shape means editing code, and the script runs every call again on
+each start. A scene file lists the same shapes as data
+(basics/shapes_scene.json is basics/shapes.py's scene):
+
+    {
+      "background": "white",
+      "shapes": [
+        {"type": "Rect", "left": 10, "top": 20, "width": 80, "height": 60,
+         "fill": "steelBlue", "rotateAngle": 30},
+        {"type": "Label", "value": "Hi!", "centerX": 200, "centerY": 200,
+         "size": 20, "bold": true, "name": "greeting"},
+        {"type": "Group", "shapes": [...]}
+      ]
+    }
+
+Each shape has a "type" (a cmu_graphics shape), the arguments its
+constructor takes in order (SHAPE_ARGUMENTS), and any of the properties in
+SHAPE_PROPERTIES for its type. Colors are names ("steelBlue", any case;
+an rgb() or gradient() can't be written in a scene file), or null (in
+TOML, which has no null, "none") for no fill. A Polygon's "points" is a list of
+[x, y] pairs. A Group has a "shapes" list of its own. A "name" makes the
+shape easy to find after loading: scene.named['greeting'].
+
+Loading a scene file has three parts:
+
+1. Validation: every shape is checked (known type, all its arguments,
+   known properties of the right kind), and a mistake is reported with
+   where it is: "shapes[3].opacity: must be at most 100".
+2. Compiling: the checked scene becomes a flat list of constructor calls,
+   children before their Group, and is saved with marshal in a
+   __scenecache__ folder next to the file. The cache is keyed by a hash of
+   the file's bytes, so editing the file compiles it again.
+3. Instantiating: the calls are made one after another in a tight loop,
+   with no checking of our own left to do. It is still one constructor
+   call per shape, with its properties as keyword arguments, and each
+   call does what cmu_graphics does for any shape it makes.
+
+On a run after the first, only the hash and the cache are read: there is
+no parsing or validation. That is all a repeat load saves. Making the
+shapes costs as much as the same constructor calls in a script (the
+bench command shows both), so a cached scene loads about as fast as a
+script that draws it, not faster.
+
+Prerequisites:
+- Python 3.6+ (JSON scenes)
+- Python 3.11+, or tomli installed, for TOML scenes
+- cmu_graphics library installed (only for show)
+
+Run from the repository root:
+    python -m demokit.scene show basics/shapes_scene.json
+    python -m demokit.scene check basics/shapes_scene.json
+Write the scene a demo starts with to a scene file:
+    python -m demokit.scene dump --out basics/shapes_scene.json basics/shapes.py
+Time loading a large scene, first and cached, against constructor calls:
+    python -m demokit.scene bench --shapes 20000
+"""
+
+import argparse
+import hashlib
+import json
+import marshal
+import os
+import random
+import sys
+import tempfile
+import time
+
+from demokit import stub_cmu_graphics
+from demokit.loader import loadDemo, resolvePath
+
+CACHE_DIR = '__scenecache__'
+CACHE_MAGIC = b'CMUSCENE2\n'
+
+# The arguments of each shape's constructor, in order
+SHAPE_ARGUMENTS = {
+    'Rect': ['left', 'top', 'width', 'height'],
+    'Oval': ['centerX', 'centerY', 'width', 'height'],
+    'Circle': ['centerX', 'centerY', 'radius'],
+    'Arc': ['centerX', 'centerY', 'width', 'height', 'startAngle',
+            'sweepAngle'],
+    'Star': ['centerX', 'centerY', 'radius', 'points'],
+    'RegularPolygon': ['centerX', 'centerY', 'radius', 'points'],
+    'Line': ['x1', 'y1', 'x2', 'y2'],
+    'Polygon': ['points'],
+    'Label': ['value', 'centerX', 'centerY'],
+    'Group': ['shapes'],
+}
+
+# The properties each shape can be given
+COMMON_PROPERTIES = ['fill', 'border', 'borderWidth', 'opacity', 'rotateAngle',
+                     'visible', 'dashes', 'align']
+SHAPE_PROPERTIES = {
+    'Rect': COMMON_PROPERTIES,
+    'Oval': COMMON_PROPERTIES,
+    'Circle': COMMON_PROPERTIES,
+    'Arc': COMMON_PROPERTIES,
+    'Star': COMMON_PROPERTIES + ['roundness'],
+    'RegularPolygon': COMMON_PROPERTIES,
+    'Line': ['fill', 'lineWidth', 'opacity', 'rotateAngle', 'visible',
+             'dashes', 'arrowStart', 'arrowEnd'],
+    'Polygon': COMMON_PROPERTIES,
+    'Label': COMMON_PROPERTIES + ['size', 'font', 'bold', 'italic'],
+    'Group': ['opacity', 'rotateAngle', 'visible'],
+}
+
+# Property values the stand-in module starts shapes with, left out of
+# dumped scenes
+DEFAULT_PROPERTIES = {
+    'fill': 'black', 'border': None, 'borderWidth': 2, 'opacity': 100,
+    'rotateAngle': 0, 'visible': True, 'dashes': False, 'lineWidth': 2,
+    'size': 12, 'font': 'arial', 'bold': False, 'italic': False,
+    'roundness': None, 'arrowStart': False, 'arrowEnd': False,
+}
+
+ALIGNMENTS = sorted(stub_cmu_graphics.ALIGNMENTS)
+COLOR_NAMES = stub_cmu_graphics.COLOR_NAMES
+
+
+class SceneError(ValueError):
+    """A scene file that isn't valid; the message says where and why."""
+
+
+# =============================================================================
+# VALIDATION
+# =============================================================================
+
+def checkNumber(value, where, minimum=None, maximum=None):
+    # True and False are ints in Python, but not numbers in a scene
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise SceneError(f'{where}: must be a number, not {value!r}')
+    if minimum is not None and value < minimum:
+        raise SceneError(f'{where}: must be at least {minimum}')
+    if maximum is not None and value > maximum:
+        raise SceneError(f'{where}: must be at most {maximum}')
+    return value
+
+
+def checkBool(value, where):
+    if not isinstance(value, bool):
+        raise SceneError(f'{where}: must be true or false, not {value!r}')
+    return value
+
+
+def checkColor(value, where):
+    if value is None or value == 'none':
+        return None
+    if not isinstance(value, str):
+        raise SceneError(f'{where}: must be a color name or null, not {value!r}')
+    if value.lower() not in COLOR_NAMES:
+        raise SceneError(f'{where}: {value!r} isn\'t a color name')
+    return value
+
+
+def checkText(value, where):
+    if not isinstance(value, str):
+        raise SceneError(f'{where}: must be a string, not {value!r}')
+    return value
+
+
+def checkAlign(value, where):
+    if value not in ALIGNMENTS:
+        raise SceneError(f'{where}: must be one of {", ".join(ALIGNMENTS)}')
+    return value
+
+
+PROPERTY_CHECKS = {
+    'fill': checkColor,
+    'border': checkColor,
+    'borderWidth': lambda value, where: checkNumber(value, where, 0),
+    'opacity': lambda value, where: checkNumber(value, where, 0, 100),
+    'rotateAngle': checkNumber,
+    'visible': checkBool,
+    'dashes': checkBool,
+    'align': checkAlign,
+    'roundness': lambda value, where: checkNumber(value, where, 0, 100),
+    'lineWidth': lambda value, where: checkNumber(value, where, 0),
+    'arrowStart': checkBool,
+    'arrowEnd': checkBool,
+    'size': lambda value, where: checkNumber(value, where, 1),
+    'font': checkText,
+    'bold': checkBool,
+    'italic': checkBool,
+}
+
+
+def checkArgument(kind, name, value, where):
+    """Checks one constructor argument; returns it as the constructor wants it."""
+    if name == 'points' and kind == 'Polygon':
+        if (not isinstance(value, list) or len(value) < 3
+                or not all(isinstance(point, list) and len(point) == 2
+                           for point in value)):
+            raise SceneError(f'{where}: must be a list of at least 3 [x, y] '
+                             f'points')
+        coords = []
+        for i, point in enumerate(value):
+            coords.append(checkNumber(point[0], f'{where}[{i}]'))
+            coords.append(checkNumber(point[1], f'{where}[{i}]'))
+        return coords
+    if name == 'points':
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise SceneError(f'{where}: must be a whole number, not {value!r}')
+        return checkNumber(value, where, 3 if kind == 'RegularPolygon' else 2)
+    if name == 'value':
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise SceneError(f'{where}: must be text or a number, not {value!r}')
+        return value
+    if name in ('width', 'height', 'radius'):
+        return checkNumber(value, where, 0)
+    return checkNumber(value, where)
+
+
+def compileShapes(shapes, where, ops):
+    """
+    Checks the list `shapes` and appends one op per shape to `ops`, each
+    Group after its children. An op is (type, arguments, properties, name,
+    number of children).
+    """
+    if not isinstance(shapes, list):
+        raise SceneError(f'{where}: must be a list of shapes')
+    for index, shape in enumerate(shapes):
+        at = f'{where}[{index}]'
+        if not isinstance(shape, dict):
+            raise SceneError(f'{at}: must be a table of properties')
+        kind = shape.get('type')
+        if kind not in SHAPE_ARGUMENTS:
+            raise SceneError(f'{at}.type: must be one of '
+                             f'{", ".join(SHAPE_ARGUMENTS)}, not {kind!r}')
+        argumentNames = SHAPE_ARGUMENTS[kind]
+        allowed = SHAPE_PROPERTIES[kind]
+        for key in shape:
+            if key not in argumentNames and key not in allowed and key not in (
+                    'type', 'name'):
+                raise SceneError(f'{at}.{key}: not a property of a {kind}')
+        for name in argumentNames:
+            if name not in shape:
+                raise SceneError(f'{at}: a {kind} needs {name!r}')
+        name = shape.get('name')
+        if name is not None:
+            checkText(name, f'{at}.name')
+        properties = {key: PROPERTY_CHECKS[key](shape[key], f'{at}.{key}')
+                      for key in allowed if key in shape}
+
+        if kind == 'Group':
+            before = len(ops)
+            compileShapes(shape['shapes'], f'{at}.shapes', ops)
+            children = countTopLevel(ops, before)
+            ops.append((kind, (), properties, name, children))
+            continue
+        arguments = []
+        for argumentName in argumentNames:
+            value = checkArgument(kind, argumentName, shape[argumentName],
+                                  f'{at}.{argumentName}')
+            if isinstance(value, list):
+                arguments.extend(value)
+            else:
+                arguments.append(value)
+        ops.append((kind, tuple(arguments), properties, name, 0))
+
+
+def countTopLevel(ops, start):
+    """The number of shapes ops[start:] leave behind (Groups take their children)."""
+    count = 0
+    for kind, arguments, properties, name, children in ops[start:]:
+        count += 1 - children
+    return count
+
+
+def parseScene(data, path):
+    """The scene table in the bytes `data`, read as JSON or TOML by `path`'s extension."""
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise SceneError(f'{path}: TOML scene files need Python 3.11+ '
+                                 f'or tomli (pip install tomli)')
+        try:
+            return tomllib.loads(data.decode('utf-8'))
+        except (UnicodeDecodeError, tomllib.TOMLDecodeError) as error:
+            raise SceneError(f'{path}: {error}')
+    try:
+        return json.loads(data)
+    except ValueError as error:
+        raise SceneError(f'{path}: {error}')
+
+
+def compileScene(data, path):
+    """Validates the scene file's bytes and returns (background, shape count, ops)."""
+    scene = parseScene(data, path)
+    if not isinstance(scene, dict):
+        raise SceneError(f'{path}: must be a table with a "shapes" list')
+    for key in scene:
+        if key not in ('background', 'shapes'):
+            raise SceneError(f'{path}: {key}: not part of a scene')
+    background = checkColor(scene.get('background'), f'{path}: background')
+    ops = []
+    compileShapes(scene.get('shapes', []), f'{path}: shapes', ops)
+    return background, len(ops), tuple(ops)
+
+
+# =============================================================================
+# THE CACHE
+# =============================================================================
+
+def cachePath(path):
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, CACHE_DIR, name + '.bin')
+
+
+def readCache(path, digest):
+    """The compiled scene cached for a file with this digest, or None."""
+    try:
+        with open(cachePath(path), 'rb') as file:
+            blob = file.read()
+    except OSError:
+        return None
+    header = CACHE_MAGIC + digest
+    if not blob.startswith(header):
+        return None
+    try:
+        return marshal.loads(blob[len(header):])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def writeCache(path, digest, compiled):
+    """Saves the compiled scene; a folder that can't be written to is skipped."""
+    target = cachePath(path)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temporary = f'{target}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(CACHE_MAGIC + digest + marshal.dumps(compiled))
+        os.replace(temporary, target)
+    except OSError:
+        pass
+
+
+def compiledScene(path, cache=True):
+    """
+    The compiled form of the scene file at `path`: from the cache if the file
+    hasn't changed since it was compiled, otherwise validated and compiled
+    (and cached). Returns (compiled, True if it came from the cache).
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    if cache:
+        compiled = readCache(path, digest)
+        if compiled is not None:
+            return compiled, True
+    compiled = compileScene(data, path)
+    if cache:
+        writeCache(path, digest, compiled)
+    return compiled, False
+
+
+# =============================================================================
+# INSTANTIATING
+# =============================================================================
+
+class Scene:
+    """
+    A loaded scene: its top-level `shapes`, the shapes that have a name in
+    `named`, and whether the compiled scene came from the cache.
+    """
+
+    def __init__(self, path, shapes, named, cached):
+        self.path = path
+        self.shapes = shapes
+        self.named = named
+        self.cached = cached
+
+    def __repr__(self):
+        return f'Scene({self.path!r}, {len(self.shapes)} shapes)'
+
+
+def instantiate(compiled, cmu):
+    """Makes the compiled scene's shapes in `cmu`; returns (top-level shapes, named)."""
+    background, count, ops = compiled
+    app = cmu.app
+    if background is not None:
+        app.background = background
+    # The real library stops making shapes past app.maxShapeCount
+    app.maxShapeCount = max(app.maxShapeCount, len(app.group) + count + 100)
+
+    makers = {kind: getattr(cmu, kind) for kind in SHAPE_ARGUMENTS}
+    stack = []
+    named = {}
+    for kind, arguments, properties, name, children in ops:
+        if kind == 'Group':
+            members = stack[len(stack) - children:]
+            del stack[len(stack) - children:]
+            shape = makers['Group'](*members)
+            for key, value in properties.items():
+                setattr(shape, key, value)
+        else:
+            shape = makers[kind](*arguments, **properties)
+        stack.append(shape)
+        if name is not None:
+            named[name] = shape
+    return stack, named
+
+
+def loadScene(path, cmu=None, cache=True):
+    """
+    Makes the shapes of the scene file at `path` in `cmu` (the cmu_graphics
+    module by default) and returns a Scene. Raises SceneError if the file
+    isn't a valid scene.
+    """
+    if cmu is None:
+        import cmu_graphics as cmu
+    compiled, cached = compiledScene(path, cache)
+    shapes, named = instantiate(compiled, cmu)
+    return Scene(path, shapes, named, cached)
+
+
+# =============================================================================
+# WRITING A SCENE FROM A DEMO
+# =============================================================================
+
+def plainNumber(value):
+    """150.0 as 150, so a dumped scene reads like the script it came from."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def describeShape(shape):
+    """A stand-in shape as a scene file entry (see stub_cmu_graphics)."""
+    kind = shape._kind
+    if kind not in SHAPE_ARGUMENTS:
+        raise SceneError(f'a {kind} can\'t be written to a scene file')
+    props = shape._props
+    entry = {'type': kind}
+    if kind == 'Group':
+        entry['shapes'] = [describeShape(child) for child in shape]
+    elif kind == 'Polygon':
+        entry['points'] = [[plainNumber(x), plainNumber(y)]
+                           for x, y in props['pointList']]
+    else:
+        for name in SHAPE_ARGUMENTS[kind]:
+            value = props[name] if name in props else getattr(shape, name)
+            entry[name] = plainNumber(value)
+    for name in SHAPE_PROPERTIES[kind]:
+        if name in props and props[name] != DEFAULT_PROPERTIES.get(name):
+            entry[name] = plainNumber(props[name])
+    return entry
+
+
+def dumpDemo(path, args=()):
+    """The scene a demo has built once its script has run, as a table."""
+    demo = loadDemo(resolvePath(path), args)
+    scene = {'shapes': [describeShape(shape) for shape in demo.app.group]}
+    if demo.app.background is not None:
+        scene = {'background': demo.app.background, **scene}
+    return scene
+
+
+def writeScene(scene, file):
+    """Writes a scene table as JSON, one shape per line at the top level."""
+    lines = [json.dumps(shape) for shape in scene['shapes']]
+    file.write('{\n')
+    if 'background' in scene:
+        file.write(f'  "background": {json.dumps(scene["background"])},\n')
+    file.write('  "shapes": [\n    ' + ',\n    '.join(lines) + '\n  ]\n}\n')
+
+
+# =============================================================================
+# MEASURING
+# =============================================================================
+
+def randomScene(count, rng):
+    """A scene table of `count` shapes of every type, some of them grouped."""
+    colors = ['steelBlue', 'crimson', 'gold', 'teal', 'salmon', None]
+    shapes = []
+    for i in range(count):
+        x, y = rng.uniform(0, 400), rng.uniform(0, 400)
+        kind = rng.choice(['Rect', 'Circle', 'Oval', 'Star', 'Polygon',
+                           'Line', 'Label'])
+        if kind == 'Rect':
+            shape = {'left': x, 'top': y, 'width': 20, 'height': 10}
+        elif kind in ('Circle', 'Star'):
+            shape = {'centerX': x, 'centerY': y, 'radius': rng.uniform(2, 20)}
+            if kind == 'Star':
+                shape['points'] = rng.randrange(3, 9)
+        elif kind == 'Oval':
+            shape = {'centerX': x, 'centerY': y, 'width': 30, 'height': 12}
+        elif kind == 'Polygon':
+            shape = {'points': [[x, y], [x + 20, y + 5], [x + 5, y + 25]]}
+        elif kind == 'Line':
+            shape = {'x1': x, 'y1': y, 'x2': x + 30, 'y2': y + 10,
+                     'lineWidth': 3}
+        else:
+            shape = {'value': f'label {i}', 'centerX': x, 'centerY': y,
+                     'size': 10, 'bold': i % 2 == 0}
+        shape['type'] = kind
+        if kind != 'Line':
+            shape['fill'] = rng.choice(colors)
+            shape['border'] = rng.choice(colors)
+        shape['opacity'] = rng.randrange(20, 101)
+        shape['rotateAngle'] = rng.uniform(0, 360)
+        shapes.append(shape)
+    # Every tenth run of 5 shapes goes in a Group
+    grouped = []
+    for start in range(0, len(shapes), 5):
+        run = shapes[start:start + 5]
+        grouped.extend([{'type': 'Group', 'shapes': run}]
+                       if start % 50 == 0 else run)
+    return {'background': 'white', 'shapes': grouped}
+
+
+def constructorCalls(scene, cmu):
+    """Makes the scene with plain constructor calls, as a demo script does."""
+    def make(shape):
+        shape = dict(shape)
+        kind = shape.pop('type')
+        if kind == 'Group':
+            return cmu.Group(*[make(child) for child in shape['shapes']])
+        if kind == 'Polygon':
+            coords = [value for point in shape.pop('points') for value in point]
+        else:
+            coords = [shape.pop(name) for name in SHAPE_ARGUMENTS[kind]]
+        return getattr(cmu, kind)(*coords, **shape)
+
+    return [make(shape) for shape in scene['shapes']]
+
+
+def timeMs(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def bench(counts, rounds):
+    print('ms to make a scene in the stand-in module (best of '
+          f'{rounds}), and its file size')
+    for count in counts:
+        scene = randomScene(count, random.Random(count))
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'scene.json')
+            with open(path, 'w') as file:
+                writeScene(scene, file)
+            size = os.path.getsize(path)
+
+            def best(fn):
+                return min(timeMs(fn)[0] for i in range(rounds))
+
+            calls = best(lambda: constructorCalls(
+                scene, stub_cmu_graphics.makeModule()))
+
+            def firstLoad():
+                cached = cachePath(path)
+                if os.path.exists(cached):
+                    os.remove(cached)
+                return loadScene(path, stub_cmu_graphics.makeModule())
+
+            first = best(firstLoad)
+            with open(path, 'rb') as file:
+                data = file.read()
+            compileOnly = best(lambda: compileScene(data, path))
+            loadScene(path, stub_cmu_graphics.makeModule())
+            cachedOnly = best(lambda: compiledScene(path))
+            cachedLoad = best(lambda: loadScene(path,
+                                                stub_cmu_graphics.makeModule()))
+            cacheSize = os.path.getsize(cachePath(path))
+        print(f'{count} shapes ({size / 1024:.0f} KB file, '
+              f'{cacheSize / 1024:.0f} KB cache):')
+        print(f'  constructor calls            {calls:9.1f}')
+        print(f'  first load                   {first:9.1f}   '
+              f'(parse + validate + compile: {compileOnly:.1f})')
+        print(f'  cached load                  {cachedLoad:9.1f}   '
+              f'(hash + read cache: {cachedOnly:.1f})')
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Load and check scene files')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    show = commands.add_parser('show', help='show a scene in a window')
+    show.add_argument('scene')
+    show.add_argument('--no-cache', action='store_true')
+
+    check = commands.add_parser('check',
+                                help='validate and compile scene files')
+    check.add_argument('scenes', nargs='+')
+
+    dump = commands.add_parser(
+        'dump', help='write the shapes a demo starts with to a scene file')
+    dump.add_argument('--out', help='the scene file (default: print it)')
+    dump.add_argument('demo', help='path to the demo script')
+    dump.add_argument('demoArgs', nargs=argparse.REMAINDER,
+                      help='options passed on to the demo')
+
+    timing = commands.add_parser(
+        'bench', help='time loading large scenes, first and cached')
+    timing.add_argument('--shapes', type=int, nargs='+',
+                        default=[1000, 10000, 50000])
+    timing.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'show':
+            import cmu_graphics
+
+            scene = loadScene(args.scene, cmu_graphics,
+                              cache=not args.no_cache)
+            print(f'{len(scene.shapes)} shapes'
+                  f'{" (from the cache)" if scene.cached else ""}')
+            cmu_graphics.cmu_graphics.run()
+        elif args.command == 'check':
+            for path in args.scenes:
+                (background, count, ops), cached = compiledScene(path)
+                print(f'{path}: {count} shapes, ok'
+                      f'{" (cached)" if cached else ""}')
+        elif args.command == 'dump':
+            scene = dumpDemo(args.demo, args.demoArgs)
+            if args.out:
+                with open(args.out, 'w') as file:
+                    writeScene(scene, file)
+            else:
+                writeScene(scene, sys.stdout)
+        else:
+            bench(args.shapes, args.rounds)
+    except SceneError as error:
+        sys.exit(f'scene error: {error}')
+
+
+if __name__ == '__main__':
+    main()
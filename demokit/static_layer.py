@@ -0,0 +1,410 @@
+"""
+CMU Graphics - Static Layer Cache
+=================================
+Draws the parts of a demo that never change into a picture once, so each
+frame only has to draw the shapes that move.
+
+Most of a demo's shapes are static: titles and instruction Labels, the
+bouncing ball's ground Line and controls panel, the orbit guide Oval in
+simple_animation.py. cmu_graphics still draws every one of them on every
+frame. installStaticLayer() instead:
+
+1. Sorts the shapes on the canvas (app.group) into "moving" and "static".
+   A shape is static unless the demo can change it without going through
+   a global variable: shapes kept in lists, dictionaries, on `app` or
+   inside other objects (the swarm's Circles, the timeline's squares) are
+   treated as moving. Shapes in a Group are sorted with their Group.
+2. Draws each run of static shapes (the ones between two moving shapes in
+   the drawing order) into a see-through image with raster.py, puts the
+   image in the run's place and hides the originals. There are at most
+   MAX_IMAGES images; shorter runs beyond that are drawn live.
+3. Watches the global variables that point at static shapes. When the
+   demo changes one (statusLabel.value = ...), the images are redrawn at
+   the end of the callback. A shape that changes again within
+   PROMOTE_FRAMES steps is taken out of the cache and drawn live again,
+   so a label updated every half second doesn't redraw the cache each time.
+
+The cost of drawing a frame then depends on the number of moving shapes,
+not the total. To measure it, render frames both ways with Pillow:
+    python -m demokit.static_layer
+    python -m demokit.static_layer basics/shapes.py --frames 100
+
+Prerequisites:
+- Python 3.6+
+- Pillow installed (pip install pillow)
+"""
+
+import argparse
+import random
+import shlex
+import time
+import types
+
+from demokit.coalesce import ShapeProxy, isShape
+from demokit.culling import CullProxy
+from demokit.loader import CALLBACK_NAMES, loadDemo, sameArity
+
+# A cached shape that changes twice within this many steps is drawn live
+PROMOTE_FRAMES = 30
+
+# At most this many cached images; further runs of static shapes are drawn
+# live
+MAX_IMAGES = 4
+
+# Shape methods that only look at a shape and don't change it
+READ_ONLY_METHODS = {'contains', 'hits', 'containsShape', 'hitsShape',
+                     'hitTest'}
+
+DEFAULT_DEMOS = [
+    'basics/shapes.py',
+    'basics/simple_animation.py',
+    'projects/bouncing_ball/main.py',
+    'projects/timeline/main.py',
+]
+
+
+def baseShape(value):
+    """The real shape behind any proxies (coalescer, static layer, culler)."""
+    while isinstance(value, (ShapeProxy, WatchedShape, CullProxy)):
+        value = value.__dict__['_shape']
+    return value
+
+
+class WatchedShape:
+    """
+    Stands in for a shape in a static part of the scene. Everything is
+    passed on to the shape, but writes and method calls that change it
+    tell the StaticLayer first. While the shape's top-level item (`root`)
+    is cached its real `visible` is False, so reading and writing
+    `visible`, and hits(), use the value the demo last set.
+    """
+
+    def __init__(self, shape, layer, root):
+        object.__setattr__(self, '_shape', shape)
+        object.__setattr__(self, '_layer', layer)
+        object.__setattr__(self, '_root', root)
+
+    def _isCachedRoot(self):
+        return baseShape(self._shape) is self._root and \
+            self._layer.isCached(self._root)
+
+    def __getattr__(self, name):
+        layer = self._layer
+        if name == 'visible' and self._isCachedRoot():
+            return layer.visible[self._root]
+        value = getattr(self._shape, name)
+        if not callable(value):
+            return value
+        if name == 'hits' and self._isCachedRoot():
+            return lambda x, y: (layer.visible[self._root] and
+                                 self._shape.contains(x, y))
+
+        def callMethod(*args, **kwargs):
+            if name not in READ_ONLY_METHODS:
+                layer.touch(self._root)
+            args = [arg.__dict__['_shape'] if isinstance(arg, WatchedShape)
+                    else arg for arg in args]
+            return value(*args, **kwargs)
+        return callMethod
+
+    def __setattr__(self, name, value):
+        layer = self._layer
+        layer.touch(self._root)
+        if name == 'visible' and self._isCachedRoot():
+            layer.visible[self._root] = value
+        else:
+            setattr(self._shape, name, value)
+
+    def __iter__(self):
+        return iter(self._shape)
+
+    def __len__(self):
+        return len(self._shape)
+
+    def __repr__(self):
+        return f'WatchedShape({self._shape!r})'
+
+
+def reachableShapes(namespace, app):
+    """
+    Every shape the demo can reach other than through a global variable or
+    a Group: shapes in lists, tuples, sets and dictionaries, in the
+    attributes of other objects, and in `app`'s attributes.
+    """
+    found = []
+    seen = set()
+    skip = (types.ModuleType, type, types.BuiltinFunctionType)
+
+    def visit(value):
+        if id(value) in seen or isinstance(value, skip):
+            return
+        seen.add(id(value))
+        if (isinstance(value, (ShapeProxy, WatchedShape, CullProxy))
+                or isShape(value)):
+            found.append(baseShape(value))
+        elif isinstance(value, dict):
+            for item in list(value.values()):
+                visit(item)
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            for item in list(value):
+                visit(item)
+        elif isinstance(value, types.FunctionType):
+            # Only the demo's own functions; cmu_graphics' keep every shape
+            if value.__globals__ is not namespace:
+                return
+            for cell in value.__closure__ or ():
+                visit(cell.cell_contents)
+        elif hasattr(value, '__dict__'):
+            visit(vars(value))
+
+    for name, value in list(namespace.items()):
+        if name.startswith('__') or value is app:
+            continue
+        if isShape(value) or isinstance(value, (ShapeProxy, CullProxy)):
+            continue
+        visit(value)
+    for name, value in list(getattr(app, '__dict__', {}).items()):
+        if not name.startswith('_') and name != 'group':
+            visit(value)
+    return found
+
+
+class StaticLayer:
+    """
+    The cached images of a demo's static shapes, and the bookkeeping to
+    keep them up to date. `static` holds the top-level items (shapes or
+    Groups on app.group) currently drawn from the cache, `images` the
+    Image shapes they are drawn into, and `rebuilds` counts how many times
+    the images were redrawn.
+    """
+
+    def __init__(self, demo):
+        self.demo = demo
+        self.cmu = demo.cmu
+        self.app = demo.app
+        self.static = {}        # id(root) -> root
+        self.visible = {}       # root -> the visible value the demo set
+        self.lastTouched = {}   # root -> step it was last changed on
+        self.touched = []
+        self.frame = 0
+        self.rebuilds = 0
+        self.images = []
+
+    def isCached(self, root):
+        return id(root) in self.static
+
+    def touch(self, root):
+        if self.isCached(root):
+            self.touched.append(root)
+
+    # -------------------------------------------------------------------------
+    # Setting up
+    # -------------------------------------------------------------------------
+    def install(self):
+        namespace = self.demo.namespace
+        roots = list(self.app.group)
+        rootOf = {}
+        for root in roots:
+            self.markDescendants(root, root, rootOf)
+
+        moving = {id(rootOf[id(shape)]) for shape in
+                  reachableShapes(namespace, self.app) if id(shape) in rootOf}
+        for root in roots:
+            if id(root) not in moving:
+                self.static[id(root)] = root
+                self.visible[root] = root.visible
+
+        for name, value in list(namespace.items()):
+            if name.startswith('__'):
+                continue
+            if isShape(value) or isinstance(value, ShapeProxy):
+                root = rootOf.get(id(baseShape(value)))
+                if root is not None and self.isCached(root):
+                    namespace[name] = WatchedShape(value, self, root)
+
+        for name in CALLBACK_NAMES:
+            fn = self.demo.callback(name)
+            if fn is None:
+                continue
+
+            def updateAfter(*args, fn=fn, name=name):
+                try:
+                    fn(*args)
+                finally:
+                    if name == 'onStep':
+                        self.frame += 1
+                    self.update()
+
+            namespace[name] = sameArity(fn, updateAfter)
+
+        for root in self.static.values():
+            root.visible = False
+        self.rebuild()
+
+    def markDescendants(self, shape, root, rootOf):
+        rootOf[id(shape)] = root
+        if self.isGroup(shape):
+            for child in shape:
+                self.markDescendants(child, root, rootOf)
+
+    def isGroup(self, shape):
+        from demokit.raster import shapeKind
+        return shapeKind(shape) == 'Group'
+
+    # -------------------------------------------------------------------------
+    # Keeping the cache up to date
+    # -------------------------------------------------------------------------
+    def update(self):
+        """
+        Called after every callback: redraws the cache if a static shape
+        changed, first taking shapes that change often out of the cache.
+        """
+        touched, self.touched = self.touched, []
+        changed = False
+        for root in touched:
+            if not self.isCached(root):
+                continue
+            changed = True
+            last = self.lastTouched.get(root)
+            if last is not None and self.frame - last <= PROMOTE_FRAMES:
+                self.uncache(root)
+            else:
+                self.lastTouched[root] = self.frame
+        if changed:
+            self.rebuild()
+
+    def uncache(self, root):
+        """Takes a top-level item out of the cache; it is drawn live again."""
+        del self.static[id(root)]
+        root.visible = self.visible.pop(root)
+
+    def rebuild(self):
+        """
+        Redraws the cached images: one for each run of static items
+        between two live ones, in the run's place in the drawing order.
+        """
+        from demokit.raster import drawShape, render
+
+        app = self.app
+        cmu = self.cmu
+        for image in self.images:
+            image.remove()
+        self.images = []
+
+        runs = [[]]
+        for shape in app.group:
+            if self.isCached(shape):
+                runs[-1].append(shape)
+            elif runs[-1]:
+                runs.append([])
+        runs = [run for run in runs if run]
+        if len(runs) > MAX_IMAGES:
+            # Draw the shortest runs live rather than add more images
+            keep = sorted(runs, key=len, reverse=True)[:MAX_IMAGES]
+            for run in runs:
+                if not any(run is kept for kept in keep):
+                    for root in run:
+                        self.uncache(root)
+            runs = [run for run in runs if any(run is kept for kept in keep)]
+
+        # The drawing order with each image just before its run (the cached
+        # shapes stay in the order too, hidden, so runs keep their places)
+        first = {id(run[0]): run for run in runs}
+        wanted = []
+        width, height = int(app.width), int(app.height)
+        for shape in app.group:
+            run = first.get(id(shape))
+            if run is not None:
+                picture = render([], width, height)
+                for root in run:
+                    if self.visible[root]:
+                        drawShape(picture, root, ignoreVisible=True)
+                image = cmu.Image(cmu.CMUImage(picture), 0, 0)
+                self.images.append(image)
+                wanted.append(image)
+            wanted.append(shape)
+
+        # New images start in front of everything. An image that belongs at
+        # the very back goes there with toBack(); then, from the first item
+        # out of place on, everything is brought to the front in turn.
+        current = list(app.group)
+        if self.images and wanted[0] is self.images[0]:
+            wanted[0].toBack()
+            current = [wanted[0]] + current[:-1]
+        for i, shape in enumerate(wanted):
+            if shape is not current[i]:
+                for later in wanted[i:]:
+                    later.toFront()
+                break
+        self.rebuilds += 1
+
+    def report(self):
+        cached = len(self.static)
+        total = len(list(self.app.group)) - len(self.images)
+        return {'cached': cached, 'live': total - cached,
+                'rebuilds': self.rebuilds}
+
+
+def installStaticLayer(demo):
+    """
+    Caches the demo's static shapes in background and foreground images
+    (see the top of this file) and returns the StaticLayer.
+    """
+    layer = StaticLayer(demo)
+    layer.install()
+    demo.staticLayer = layer
+    return layer
+
+
+# =============================================================================
+# MEASURING
+# =============================================================================
+
+def timeRendering(spec, frames, seed, cached):
+    """
+    Drives a demo with the benchmark's inputs and draws every frame with
+    raster.render(). Returns the per-frame drawing times in ms and the
+    demo's StaticLayer (or None).
+    """
+    from demokit.bench import inputsForFrame
+    from demokit.raster import render
+
+    path, *args = shlex.split(spec)
+    demo = loadDemo(path, args, seed=seed)
+    layer = installStaticLayer(demo) if cached else None
+    rng = random.Random(seed)
+    app = demo.app
+    times = []
+    for frame in range(frames):
+        events = inputsForFrame(frame, rng)
+        if not app.paused:
+            events.append(('onStep', ()))
+        for name, eventArgs in events:
+            demo.call(name, *eventArgs)
+        start = time.perf_counter()
+        render(app.group, int(app.width), int(app.height), app.background)
+        times.append((time.perf_counter() - start) * 1000)
+    return times, layer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare drawing every shape with a cached static layer')
+    parser.add_argument('demos', nargs='*', default=DEFAULT_DEMOS)
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for spec in args.demos:
+        full, unused = timeRendering(spec, args.frames, args.seed, cached=False)
+        layered, layer = timeRendering(spec, args.frames, args.seed, cached=True)
+        report = layer.report()
+        print(spec)
+        print(f'  {report["cached"]} cached, {report["live"]} drawn live, '
+              f'{report["rebuilds"]} cache rebuilds')
+        print(f'  every shape:  {sum(full) / len(full):7.2f} ms per frame')
+        print(f'  static layer: {sum(layered) / len(layered):7.2f} ms per frame')
+
+
+if __name__ == '__main__':
+    main()
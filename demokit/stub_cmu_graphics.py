@@ -0,0 +1,564 @@
+"""
+CMU Graphics - Stand-in cmu_graphics Module
+===========================================
+A pretend cmu_graphics library for running the demos without a display.
+
+It has the same shapes (Rect, Circle, Oval, Line, Polygon, Star,
+RegularPolygon, Label, Arc, Image, Group) and the same `app` object as the
+real library, and shapes keep their positions, sizes and colors up to date
+when you change them. But nothing is ever drawn, and cmu_graphics.run()
+returns right away instead of opening a window.
+
+Every time a demo changes a shape property (ball.centerX = 100,
+shadow.opacity = 30, ...), the change is counted, so the benchmark can
+report how many property writes each frame makes.
+
+Each call to makeModule() returns a fresh module with its own app, shapes
+and counters, so several demos can be loaded one after another without
+seeing each other's shapes:
+
+    from demokit import stub_cmu_graphics
+    cmu = stub_cmu_graphics.makeModule()
+    sys.modules['cmu_graphics'] = cmu   # demos now import the stand-in
+
+Shapes are simplified in a few ways: bounds (left, top, right, bottom)
+ignore rotateAngle, and a Label's size is estimated from its font size and
+number of characters.
+"""
+
+import math
+import random
+import types
+
+# Names a demo gets from `from cmu_graphics import *`
+API_NAMES = [
+    'app', 'cmu_graphics', 'Rect', 'Circle', 'Oval', 'Line', 'Polygon',
+    'Star', 'RegularPolygon', 'Label', 'Arc', 'Image', 'Group', 'CMUImage',
+    'rgb', 'gradient', 'almostEqual', 'rounded', 'distance', 'angleTo',
+    'getPointInDir', 'random', 'randrange', 'choice', 'seed',
+]
+
+# Where the (x, y) given to a shape sits on its bounding box, as fractions
+# of (width, height) from the top-left corner.
+ALIGNMENTS = {
+    'center': (0.5, 0.5),
+    'left': (0, 0.5), 'right': (1, 0.5),
+    'top': (0.5, 0), 'bottom': (0.5, 1),
+    'left-top': (0, 0), 'top-left': (0, 0),
+    'right-top': (1, 0), 'top-right': (1, 0),
+    'left-bottom': (0, 1), 'bottom-left': (0, 1),
+    'right-bottom': (1, 1), 'bottom-right': (1, 1),
+}
+
+# The color names cmu_graphics knows (the CSS colors), in lowercase; a
+# name matches whatever its case, so 'steelBlue' is 'steelblue'.
+COLOR_NAMES = frozenset({
+    'aliceblue', 'antiquewhite', 'aqua', 'aquamarine', 'azure', 'beige',
+    'bisque', 'black', 'blanchedalmond', 'blue', 'blueviolet', 'brown',
+    'burlywood', 'cadetblue', 'chartreuse', 'chocolate', 'coral',
+    'cornflowerblue', 'cornsilk', 'crimson', 'cyan', 'darkblue', 'darkcyan',
+    'darkgoldenrod', 'darkgray', 'darkgreen', 'darkgrey', 'darkkhaki',
+    'darkmagenta', 'darkolivegreen', 'darkorange', 'darkorchid', 'darkred',
+    'darksalmon', 'darkseagreen', 'darkslateblue', 'darkslategray',
+    'darkslategrey', 'darkturquoise', 'darkviolet', 'deeppink', 'deepskyblue',
+    'dimgray', 'dimgrey', 'dodgerblue', 'firebrick', 'floralwhite',
+    'forestgreen', 'fuchsia', 'gainsboro', 'ghostwhite', 'gold', 'goldenrod',
+    'gray', 'green', 'greenyellow', 'grey', 'honeydew', 'hotpink', 'indianred',
+    'indigo', 'ivory', 'khaki', 'lavender', 'lavenderblush', 'lawngreen',
+    'lemonchiffon', 'lightblue', 'lightcoral', 'lightcyan',
+    'lightgoldenrodyellow', 'lightgray', 'lightgreen', 'lightgrey',
+    'lightpink', 'lightsalmon', 'lightseagreen', 'lightskyblue',
+    'lightslategray', 'lightslategrey', 'lightsteelblue', 'lightyellow',
+    'lime', 'limegreen', 'linen', 'magenta', 'maroon', 'mediumaquamarine',
+    'mediumblue', 'mediumorchid', 'mediumpurple', 'mediumseagreen',
+    'mediumslateblue', 'mediumspringgreen', 'mediumturquoise',
+    'mediumvioletred', 'midnightblue', 'mintcream', 'mistyrose', 'moccasin',
+    'navajowhite', 'navy', 'oldlace', 'olive', 'olivedrab', 'orange',
+    'orangered', 'orchid', 'palegoldenrod', 'palegreen', 'paleturquoise',
+    'palevioletred', 'papayawhip', 'peachpuff', 'peru', 'pink', 'plum',
+    'powderblue', 'purple', 'rebeccapurple', 'red', 'rosybrown', 'royalblue',
+    'saddlebrown', 'salmon', 'sandybrown', 'seagreen', 'seashell', 'sienna',
+    'silver', 'skyblue', 'slateblue', 'slategray', 'slategrey', 'snow',
+    'springgreen', 'steelblue', 'tan', 'teal', 'thistle', 'tomato',
+    'turquoise', 'violet', 'wheat', 'white', 'whitesmoke', 'yellow',
+    'yellowgreen',
+})
+
+# Properties that move or resize a shape; everything else is just stored.
+POSITION_PROPERTIES = {'centerX', 'centerY', 'left', 'right', 'top', 'bottom'}
+SIZE_PROPERTIES = {'width', 'height'}
+
+
+class StubBackend:
+    """
+    The bookkeeping behind one stand-in module: every shape created so far
+    and how many property writes were made in total and since the last
+    call to startFrame().
+    """
+
+    def __init__(self):
+        self.shapes = []
+        self.rootGroup = None
+        self.writes = 0
+        self.frameWrites = 0
+        self.writeLog = None
+
+    def recordWrite(self, shape, name, value):
+        self.writes += 1
+        self.frameWrites += 1
+        if self.writeLog is not None:
+            self.writeLog.append((shape, name, value))
+
+    def startFrame(self):
+        """Starts counting writes for a new frame; returns the last frame's count."""
+        count = self.frameWrites
+        self.frameWrites = 0
+        return count
+
+
+# =============================================================================
+# SHAPES
+# =============================================================================
+
+class Shape:
+    """
+    Base class for the stand-in shapes. Property values live in the _props
+    dictionary; assigning to a property goes through __setattr__, which
+    counts the write and keeps related properties in sync (moving
+    centerX also moves left and right, for example).
+    """
+
+    def __init__(self, backend, kind, props, kwargs):
+        object.__setattr__(self, '_backend', backend)
+        object.__setattr__(self, '_kind', kind)
+        object.__setattr__(self, '_parent', None)
+        values = {'fill': 'black', 'border': None, 'borderWidth': 2,
+                  'opacity': 100, 'rotateAngle': 0, 'visible': True,
+                  'dashes': False}
+        values.update(props)
+        values.update(kwargs)
+        values.pop('align', None)
+        object.__setattr__(self, '_props', values)
+        backend.shapes.append(self)
+        if backend.rootGroup is not None:
+            backend.rootGroup._adopt(self)
+
+    def __getattr__(self, name):
+        props = self.__dict__.get('_props')
+        if props is None or name.startswith('_'):
+            raise AttributeError(name)
+        if name in props:
+            return props[name]
+        left, top, right, bottom = self._bounds()
+        if name == 'left':
+            return left
+        if name == 'top':
+            return top
+        if name == 'right':
+            return right
+        if name == 'bottom':
+            return bottom
+        if name == 'centerX':
+            return (left + right) / 2
+        if name == 'centerY':
+            return (top + bottom) / 2
+        if name == 'width':
+            return right - left
+        if name == 'height':
+            return bottom - top
+        raise AttributeError(f'{self._kind} has no property {name!r}')
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+            return
+        self._backend.recordWrite(self, name, value)
+        self._setProperty(name, value)
+
+    def _setProperty(self, name, value):
+        if name in POSITION_PROPERTIES:
+            current = getattr(self, name)
+            if name in ('centerX', 'left', 'right'):
+                self._translate(value - current, 0)
+            else:
+                self._translate(0, value - current)
+        elif name in SIZE_PROPERTIES and name not in self._props:
+            current = getattr(self, name)
+            factor = value / current if current else 1
+            if name == 'width':
+                self._scale(factor, 1)
+            else:
+                self._scale(1, factor)
+        else:
+            self._props[name] = value
+
+    # Geometry. Subclasses override _bounds, _translate and _scale.
+    def _bounds(self):
+        raise NotImplementedError
+
+    def _translate(self, dx, dy):
+        raise NotImplementedError
+
+    def _scale(self, sx, sy):
+        raise NotImplementedError
+
+    # Methods the real shapes have
+    def contains(self, x, y):
+        """True if (x, y) is inside the shape's bounding box."""
+        left, top, right, bottom = self._bounds()
+        return left <= x <= right and top <= y <= bottom
+
+    def hits(self, x, y):
+        return self.visible and self.contains(x, y)
+
+    def remove(self):
+        if self._parent is not None:
+            self._parent.remove(self)
+
+    def toFront(self):
+        if self._parent is not None:
+            siblings = self._parent._children
+            siblings.remove(self)
+            siblings.append(self)
+
+    def toBack(self):
+        if self._parent is not None:
+            siblings = self._parent._children
+            siblings.remove(self)
+            siblings.insert(0, self)
+
+    def __repr__(self):
+        return f'{self._kind}({self._props})'
+
+
+def alignedTopLeft(x, y, width, height, align):
+    """The top-left corner of a box whose `align` point is at (x, y)."""
+    fx, fy = ALIGNMENTS.get(align, ALIGNMENTS['center'])
+    return x - fx * width, y - fy * height
+
+
+class BoxShape(Shape):
+    """A shape described by its left, top, width and height (Rect, Image)."""
+
+    def _bounds(self):
+        p = self._props
+        return p['left'], p['top'], p['left'] + p['width'], p['top'] + p['height']
+
+    def _translate(self, dx, dy):
+        self._props['left'] += dx
+        self._props['top'] += dy
+
+    def _scale(self, sx, sy):
+        p = self._props
+        centerX = p['left'] + p['width'] / 2
+        centerY = p['top'] + p['height'] / 2
+        p['width'] *= sx
+        p['height'] *= sy
+        p['left'] = centerX - p['width'] / 2
+        p['top'] = centerY - p['height'] / 2
+
+    def _setProperty(self, name, value):
+        # Resizing keeps the shape centered where it was, like the real library
+        p = self._props
+        if name == 'width':
+            p['left'] += (p['width'] - value) / 2
+            p['width'] = value
+        elif name == 'height':
+            p['top'] += (p['height'] - value) / 2
+            p['height'] = value
+        else:
+            super()._setProperty(name, value)
+
+
+class CenteredShape(Shape):
+    """A shape described by its center and a width and height."""
+
+    def _size(self):
+        return self._props['width'], self._props['height']
+
+    def _bounds(self):
+        p = self._props
+        width, height = self._size()
+        return (p['centerX'] - width / 2, p['centerY'] - height / 2,
+                p['centerX'] + width / 2, p['centerY'] + height / 2)
+
+    def _translate(self, dx, dy):
+        self._props['centerX'] += dx
+        self._props['centerY'] += dy
+
+    def _scale(self, sx, sy):
+        self._props['width'] *= sx
+        self._props['height'] *= sy
+
+    def _setProperty(self, name, value):
+        if name in SIZE_PROPERTIES and name in self._props:
+            self._props[name] = value
+        else:
+            super()._setProperty(name, value)
+
+
+def centeredProps(x, y, width, height, kwargs, extra):
+    """Center-based properties for a shape placed with an `align` keyword."""
+    left, top = alignedTopLeft(x, y, width, height, kwargs.get('align', 'center'))
+    props = {'centerX': left + width / 2, 'centerY': top + height / 2}
+    props.update(extra)
+    return props
+
+
+class RadiusShape(CenteredShape):
+    """A shape whose size comes from a radius (Circle, Star, RegularPolygon)."""
+
+    def _size(self):
+        diameter = 2 * self._props['radius']
+        return diameter, diameter
+
+    def _scale(self, sx, sy):
+        self._props['radius'] *= sx if sx != 1 else sy
+
+    def _setProperty(self, name, value):
+        if name in SIZE_PROPERTIES:
+            self._props['radius'] = value / 2
+        else:
+            super()._setProperty(name, value)
+
+
+class PointsShape(Shape):
+    """A shape described by a list of points (Line, Polygon)."""
+
+    def _points(self):
+        return self._props['pointList']
+
+    def _bounds(self):
+        xs = [x for x, y in self._points()]
+        ys = [y for x, y in self._points()]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def _translate(self, dx, dy):
+        self._props['pointList'] = [[x + dx, y + dy] for x, y in self._points()]
+
+    def _scale(self, sx, sy):
+        left, top, right, bottom = self._bounds()
+        cx, cy = (left + right) / 2, (top + bottom) / 2
+        self._props['pointList'] = [[cx + (x - cx) * sx, cy + (y - cy) * sy]
+                                    for x, y in self._points()]
+
+
+class LineShape(PointsShape):
+    def _points(self):
+        p = self._props
+        return [[p['x1'], p['y1']], [p['x2'], p['y2']]]
+
+    def _translate(self, dx, dy):
+        p = self._props
+        p['x1'] += dx
+        p['x2'] += dx
+        p['y1'] += dy
+        p['y2'] += dy
+
+    def _scale(self, sx, sy):
+        PointsShape._scale(self, sx, sy)
+        (x1, y1), (x2, y2) = self._props.pop('pointList')
+        self._props.update(x1=x1, y1=y1, x2=x2, y2=y2)
+
+
+class LabelShape(CenteredShape):
+    def _size(self):
+        p = self._props
+        return 0.6 * p['size'] * len(str(p['value'])), p['size']
+
+    def _scale(self, sx, sy):
+        self._props['size'] *= sy if sy != 1 else sx
+
+
+class GroupShape(Shape):
+    """A group of shapes that move, hide and fade together."""
+
+    def __init__(self, backend, shapes, kwargs):
+        object.__setattr__(self, '_children', [])
+        super().__init__(backend, 'Group', {}, kwargs)
+        for shape in shapes:
+            self._adopt(shape)
+
+    def _adopt(self, shape):
+        if shape._parent is not None:
+            shape._parent._children.remove(shape)
+        shape._parent = self
+        self._children.append(shape)
+
+    def add(self, *shapes):
+        for shape in shapes:
+            self._adopt(shape)
+
+    def remove(self, shape=None):
+        if shape is None:
+            return Shape.remove(self)
+        self._children.remove(shape)
+        shape._parent = None
+
+    def clear(self):
+        for shape in list(self._children):
+            self.remove(shape)
+
+    @property
+    def children(self):
+        return list(self._children)
+
+    def __iter__(self):
+        return iter(list(self._children))
+
+    def __len__(self):
+        return len(self._children)
+
+    def _bounds(self):
+        if not self._children:
+            return 0, 0, 0, 0
+        bounds = [child._bounds() for child in self._children]
+        return (min(b[0] for b in bounds), min(b[1] for b in bounds),
+                max(b[2] for b in bounds), max(b[3] for b in bounds))
+
+    def _translate(self, dx, dy):
+        for child in self._children:
+            child._translate(dx, dy)
+
+    def _scale(self, sx, sy):
+        for child in self._children:
+            child._scale(sx, sy)
+
+
+# =============================================================================
+# THE APP OBJECT
+# =============================================================================
+
+class StubApp:
+    """
+    Stands in for cmu_graphics' `app`. Demos may store their own variables
+    on it (app.velocityX = 3), just like on the real one.
+    """
+
+    def __init__(self, backend, group):
+        self.width = 400
+        self.height = 400
+        self.stepsPerSecond = 30
+        self.paused = False
+        self.stopped = False
+        self.background = None
+        self.maxShapeCount = 2000
+        self.title = 'CMU Graphics'
+        self.group = group
+        self._backend = backend
+
+    def stop(self):
+        self.stopped = True
+
+    def quit(self):
+        self.stopped = True
+
+
+# =============================================================================
+# BUILDING A MODULE
+# =============================================================================
+
+def makeModule():
+    """Returns a new stand-in cmu_graphics module with its own app and shapes."""
+    backend = StubBackend()
+    rootGroup = GroupShape(backend, [], {})
+    backend.shapes.remove(rootGroup)
+    backend.rootGroup = rootGroup
+
+    def Rect(left, top, width, height, **kwargs):
+        left, top = alignedTopLeft(left, top, width, height,
+                                   kwargs.get('align', 'left-top'))
+        return BoxShape(backend, 'Rect', {'left': left, 'top': top,
+                                          'width': width, 'height': height},
+                        kwargs)
+
+    def Image(url, left, top, **kwargs):
+        width = kwargs.pop('width', getattr(url, 'width', 0))
+        height = kwargs.pop('height', getattr(url, 'height', 0))
+        left, top = alignedTopLeft(left, top, width, height,
+                                   kwargs.get('align', 'left-top'))
+        return BoxShape(backend, 'Image', {'url': url, 'left': left,
+                                           'top': top, 'width': width,
+                                           'height': height}, kwargs)
+
+    def Oval(centerX, centerY, width, height, **kwargs):
+        return CenteredShape(backend, 'Oval', centeredProps(
+            centerX, centerY, width, height, kwargs,
+            {'width': width, 'height': height}), kwargs)
+
+    def Arc(centerX, centerY, width, height, startAngle, sweepAngle, **kwargs):
+        return CenteredShape(backend, 'Arc', centeredProps(
+            centerX, centerY, width, height, kwargs,
+            {'width': width, 'height': height, 'startAngle': startAngle,
+             'sweepAngle': sweepAngle}), kwargs)
+
+    def Circle(centerX, centerY, radius, **kwargs):
+        return RadiusShape(backend, 'Circle', centeredProps(
+            centerX, centerY, 2 * radius, 2 * radius, kwargs,
+            {'radius': radius}), kwargs)
+
+    def Star(centerX, centerY, radius, points, **kwargs):
+        return RadiusShape(backend, 'Star', centeredProps(
+            centerX, centerY, 2 * radius, 2 * radius, kwargs,
+            {'radius': radius, 'points': points,
+             'roundness': kwargs.pop('roundness', None)}), kwargs)
+
+    def RegularPolygon(centerX, centerY, radius, points, **kwargs):
+        return RadiusShape(backend, 'RegularPolygon', centeredProps(
+            centerX, centerY, 2 * radius, 2 * radius, kwargs,
+            {'radius': radius, 'points': points}), kwargs)
+
+    def Line(x1, y1, x2, y2, **kwargs):
+        kwargs.setdefault('lineWidth', 2)
+        return LineShape(backend, 'Line',
+                         {'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2}, kwargs)
+
+    def Polygon(*coords, **kwargs):
+        points = [[coords[i], coords[i + 1]] for i in range(0, len(coords), 2)]
+        return PointsShape(backend, 'Polygon', {'pointList': points}, kwargs)
+
+    def Label(value, centerX, centerY, **kwargs):
+        size = kwargs.get('size', 12)
+        width = 0.6 * size * len(str(value))
+        props = centeredProps(centerX, centerY, width, size, kwargs,
+                              {'value': value, 'size': size, 'font': 'arial',
+                               'bold': False, 'italic': False})
+        return LabelShape(backend, 'Label', props, kwargs)
+
+    def Group(*shapes, **kwargs):
+        return GroupShape(backend, shapes, kwargs)
+
+    def CMUImage(image):
+        return image
+
+    def rgb(red, green, blue):
+        return (red, green, blue)
+
+    def gradient(*colors, start='center'):
+        return colors[0] if colors else None
+
+    def run(*args, **kwargs):
+        pass
+
+    module = types.ModuleType('cmu_graphics')
+    module.__all__ = list(API_NAMES)
+    module.backend = backend
+    module.app = StubApp(backend, rootGroup)
+    module.cmu_graphics = types.SimpleNamespace(run=run)
+    for fn in (Rect, Image, Oval, Arc, Circle, Star, RegularPolygon, Line,
+               Polygon, Label, Group, CMUImage, rgb, gradient):
+        setattr(module, fn.__name__, fn)
+
+    module.almostEqual = lambda x, y, epsilon=1e-9: abs(x - y) <= epsilon
+    module.rounded = lambda d: int(math.floor(d + 0.5))
+    module.distance = lambda x1, y1, x2, y2: math.hypot(x2 - x1, y2 - y1)
+    module.angleTo = lambda x1, y1, x2, y2: (
+        90 - math.degrees(math.atan2(y1 - y2, x2 - x1))) % 360
+    module.getPointInDir = lambda x, y, degrees, d: [
+        x + d * math.sin(math.radians(degrees)),
+        y - d * math.cos(math.radians(degrees))]
+    module.random = random.random
+    module.randrange = random.randrange
+    module.choice = random.choice
+    module.seed = random.seed
+    return module
@@ -0,0 +1,136 @@
+"""
+CMU Graphics - Bouncing Ball Project: Body Benchmark
+====================================================
+Measures the cost of one physics step, and the memory per ball, for four
+ways of keeping the state of many separate balls:
+
+- attributes: velocity, position and atRest as ordinary attributes of one
+              object per ball, like the original demo's app.velocityX and
+              ball.centerX (bench_swarm.LoopBall)
+- BallState:  one physics.BallState per ball (fixed __slots__ fields),
+              stepped with physics.step() and copied onto a shape
+- no slots:   the same, with BallState's fields in an ordinary attribute
+              dictionary (DictState), to show what __slots__ itself costs
+- BodyArray:  one bodies.BodyArray for all the balls (NumPy arrays), with
+              one array step and one copy onto the shapes of the balls
+              that moved
+
+Each step includes copying the new positions onto one object per ball
+(standing in for the Circles), once per step. Memory counts the ball's
+state only (the object, its attribute dictionary if it has one, and its
+float values), not the shapes.
+
+No window is opened. Run this benchmark:
+    python bench_bodies.py
+    python bench_bodies.py --balls 10 100 10000 --steps 100
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import physics
+from bench_swarm import LoopBall, stepLoop
+from bodies import BodyArray
+
+
+class DictState:
+    """physics.BallState without __slots__: its fields live in a dictionary."""
+
+    __init__ = physics.BallState.__init__
+
+
+class Shape:
+    """Stands in for a Circle: just a center."""
+
+    def __init__(self):
+        self.centerX = 0.0
+        self.centerY = 0.0
+
+
+def stateBytes(obj):
+    """The memory of one ball's state object, its dictionary and floats."""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+        values = obj.__dict__.values()
+    else:
+        values = [getattr(obj, name) for name in type(obj).__slots__]
+    return size + sum(sys.getsizeof(value) for value in values
+                      if isinstance(value, float))
+
+
+def timeSteps(stepFn, steps):
+    start = time.perf_counter()
+    for i in range(steps):
+        stepFn()
+    return (time.perf_counter() - start) * 1000 / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare ways of keeping many balls\' state')
+    parser.add_argument('--balls', type=int, nargs='+',
+                        default=[1, 32, 1000, 10000])
+    parser.add_argument('--steps', type=int, default=100)
+    args = parser.parse_args()
+
+    for count in args.balls:
+        rng = random.Random(1)
+        starts = [(rng.uniform(30, 370), rng.uniform(30, 200))
+                  for i in range(count)]
+        shapes = [Shape() for i in range(count)]
+
+        loopBalls = [LoopBall(x, y, physics.BALL_RADIUS, (x - 200) / 30)
+                     for x, y in starts]
+
+        def makeStates(cls):
+            states = []
+            for x, y in starts:
+                state = cls()
+                physics.moveTo(state, x, y)
+                states.append(state)
+            return states
+
+        def stepStates(states):
+            for state, shape in zip(states, shapes):
+                physics.step(state)
+                shape.centerX = state.x
+                shape.centerY = state.y
+
+        slotted = makeStates(physics.BallState)
+        unslotted = makeStates(DictState)
+
+        bodies = BodyArray(count)
+        for slot, (x, y) in enumerate(starts):
+            bodies.moveTo(slot, x, y)
+
+        def stepBodies():
+            bodies.step()
+            moved = bodies.moved
+            for slot, x, y in zip(moved.tolist(), bodies.x[moved].tolist(),
+                                  bodies.y[moved].tolist()):
+                shape = shapes[slot]
+                shape.centerX = x
+                shape.centerY = y
+
+        # Memory first: a ball that came to rest holds ints, not floats
+        sizes = [stateBytes(loopBalls[0]), stateBytes(slotted[0]),
+                 stateBytes(unslotted[0]), bodies.nbytes() / count]
+        times = [
+            timeSteps(lambda: stepLoop(loopBalls), args.steps),
+            timeSteps(lambda: stepStates(slotted), args.steps),
+            timeSteps(lambda: stepStates(unslotted), args.steps),
+            timeSteps(stepBodies, args.steps),
+        ]
+        rows = zip(['attributes', 'BallState', 'no slots', 'BodyArray'],
+                   times, sizes)
+        print(f'{count} balls')
+        for name, ms, size in rows:
+            print(f'  {name:>10}: {ms * 1000 / count:8.3f} us per ball per step'
+                  f'   {ms:8.3f} ms per step   {size:6.0f} bytes per ball')
+
+
+if __name__ == '__main__':
+    main()
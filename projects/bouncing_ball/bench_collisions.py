@@ -0,0 +1,79 @@
+"""
+CMU Graphics - Bouncing Ball Project: Collision Benchmark
+=========================================================
+Compares two ways of finding which balls overlap:
+
+- brute force:   check every pair of balls (grows like n squared)
+- spatial hash:  only check balls in the same or neighboring grid cells
+                 (grows like n)
+
+The canvas grows with the number of balls so that the crowding (balls per
+cell) stays the same, the way a bigger scene would. Both methods must find
+exactly the same pairs; the benchmark checks that before timing them.
+
+No window is opened. Run this benchmark:
+    python bench_collisions.py
+    python bench_collisions.py --balls 100 1000 10000 --repeat 5
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from collisions import SpatialHash, bruteForcePairs
+
+BALL_RADIUS = 4         # Balls per cell stays about the same at every size
+BALLS_PER_CANVAS = 1000 # How many balls share one 400x400 canvas
+
+
+def makeBalls(count, seed=1):
+    """Random balls on a square canvas sized for `count` balls."""
+    size = 400 * math.sqrt(count / BALLS_PER_CANVAS)
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0, size, count)
+    y = rng.uniform(0, size, count)
+    radius = rng.uniform(BALL_RADIUS / 2, BALL_RADIUS, count)
+    return size, x, y, radius
+
+
+def bestTime(fn, repeat):
+    """Runs fn `repeat` times and returns the fastest time in ms."""
+    best = float('inf')
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def pairSet(i, j):
+    return set(zip(i.tolist(), j.tolist()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare collision broad phases')
+    parser.add_argument('--balls', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'{"balls":>7} {"pairs":>7} {"brute force":>13} {"spatial hash":>13} {"speedup":>8}')
+    for count in args.balls:
+        size, x, y, radius = makeBalls(count)
+        grid = SpatialHash(cellSize=2 * radius.max(), width=size, height=size)
+
+        brutePairs = pairSet(*bruteForcePairs(x, y, radius))
+        gridPairs = {(min(a, b), max(a, b))
+                     for a, b in pairSet(*grid.touchingPairs(x, y, radius))}
+        if brutePairs != gridPairs:
+            raise AssertionError(f'{count} balls: spatial hash found different pairs')
+
+        bruteMs = bestTime(lambda: bruteForcePairs(x, y, radius), args.repeat)
+        gridMs = bestTime(lambda: grid.touchingPairs(x, y, radius), args.repeat)
+        print(f'{count:>7} {len(brutePairs):>7} {bruteMs:>10.3f} ms '
+              f'{gridMs:>10.3f} ms {bruteMs / gridMs:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
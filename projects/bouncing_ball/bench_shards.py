@@ -0,0 +1,105 @@
+"""
+CMU Graphics - Bouncing Ball Project: Sharded Swarm Benchmark
+=============================================================
+Measures how long one physics step takes for a very large swarm, in one
+process (BallSwarm) and split between 1, 2, 4... worker processes
+(ShardedSwarm), with and without ball-to-ball collisions.
+
+The balls are pushed up every 30 steps, so they keep moving and none of
+BallSwarm's balls fall asleep: both kinds of swarm step every ball.
+
+Before timing, a sharded swarm of each size is checked against BallSwarm
+(without collisions, and with minVelocity=0 so no ball stops): every
+ball must end up in the same place, however many workers step it. A
+ball handed from one worker to another must be stepped exactly once. The
+speedup from more workers is capped by the number of CPU cores (printed at
+the start); on one core, the workers only add the cost of waiting for each
+other.
+
+No window is opened. Run this benchmark:
+    python bench_shards.py
+    python bench_shards.py --balls 100000 --workers 1 2 4 8 --collide
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from bench_swarm import FRAME_BUDGET_MS, summarize, timeSteps
+from physics import World
+from shards import ShardedSwarm
+from swarm import BallSwarm
+
+# Most a ball may be off from BallSwarm's, in pixels
+MAX_ERROR = 1e-9
+
+
+def keepMoving(swarm):
+    """A step function that pushes every ball up now and then."""
+    steps = [0]
+
+    def step():
+        if steps[0] % 30 == 0:
+            swarm.push(0, -10)
+        steps[0] += 1
+        swarm.step()
+
+    return step
+
+
+def check(count, workers, steps=200):
+    """
+    Steps a BallSwarm and a ShardedSwarm with the same balls, and returns
+    the largest distance between the same ball in the two.
+    """
+    world = World(minVelocity=0)
+    swarm = BallSwarm(count, radius=1, maxRadius=2, seed=1, world=world)
+    sharded = ShardedSwarm(count, workers, radius=1, maxRadius=2, seed=1,
+                           world=world)
+    try:
+        step, stepSharded = keepMoving(swarm), keepMoving(sharded)
+        for n in range(steps):
+            step()
+            stepSharded()
+        return float(max(np.abs(swarm.x - sharded.x).max(),
+                         np.abs(swarm.y - sharded.y).max()))
+    finally:
+        sharded.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Time the swarm physics split between processes')
+    parser.add_argument('--balls', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--steps', type=int, default=100)
+    parser.add_argument('--collide', action='store_true',
+                        help='with ball-to-ball collisions')
+    args = parser.parse_args()
+
+    print(f'{os.cpu_count()} CPU cores; frame budget at 30 steps per second: '
+          f'{FRAME_BUDGET_MS:.1f} ms')
+    for count in args.balls:
+        for workers in args.workers:
+            error = check(count, workers)
+            result = 'ok' if error <= MAX_ERROR else 'FAILED'
+            print(f'check {workers} workers, {count} balls: {result} '
+                  f'(largest difference from BallSwarm {error:.3g} px)')
+            if error > MAX_ERROR:
+                raise SystemExit(1)
+        swarm = BallSwarm(count, radius=1, maxRadius=2, seed=1,
+                          collide=args.collide)
+        summarize('1 process', count, timeSteps(keepMoving(swarm), args.steps))
+        for workers in args.workers:
+            swarm = ShardedSwarm(count, workers, radius=1, maxRadius=2, seed=1,
+                                 collide=args.collide)
+            try:
+                summarize(f'{workers} workers', count,
+                          timeSteps(keepMoving(swarm), args.steps))
+            finally:
+                swarm.close()
+
+
+if __name__ == '__main__':
+    main()
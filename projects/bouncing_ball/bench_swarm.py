@@ -0,0 +1,171 @@
+"""
+CMU Graphics - Bouncing Ball Project: Swarm Benchmark
+=====================================================
+Measures how long one physics step takes for thousands of balls, comparing:
+
+- loop:   a Python loop that runs main.py's onStep physics once per ball,
+          reading and writing centerX/centerY and velocityX/velocityY
+          attributes on one object per ball (like one Circle per ball)
+- swarm:  the NumPy BallSwarm from swarm.py
+- swarm+sync: the NumPy step plus copying every position back to one
+          object per ball (the work main.py --balls does to move its Circles)
+
+A frame fits the budget if it takes less than 1/30 of a second (~33.3 ms),
+the default cmu_graphics step rate.
+
+With --sleep, it instead measures sleeping balls: a swarm with collisions
+is left to settle into a pile, and the step time is compared while the
+balls are still moving, once the pile has fallen asleep, and while a
+single dropped ball lands on it.
+
+No window is opened. Run this benchmark:
+    python bench_swarm.py
+    python bench_swarm.py --balls 1000 5000 20000 --steps 200
+    python bench_swarm.py --sleep --balls 1000 2000
+"""
+
+import argparse
+import time
+
+from physics import FLOOR_Y, CANVAS_WIDTH
+from physics import GRAVITY, BOUNCE_FACTOR, FRICTION, MIN_VELOCITY
+from swarm import BallSwarm
+
+FRAME_BUDGET_MS = 1000 / 30
+
+
+class LoopBall:
+    """One ball for the Python loop: a stand-in for a Circle plus its velocity."""
+
+    def __init__(self, centerX, centerY, radius, velocityX):
+        self.centerX = centerX
+        self.centerY = centerY
+        self.radius = radius
+        self.velocityX = velocityX
+        self.velocityY = 0
+        self.atRest = False
+
+
+def stepLoop(balls):
+    """main.py's onStep physics, run once for every ball in the list."""
+    for ball in balls:
+        if ball.atRest:
+            continue
+        ball.velocityY += GRAVITY
+        ball.velocityX *= FRICTION
+        ball.centerX += ball.velocityX
+        ball.centerY += ball.velocityY
+        if ball.centerY + ball.radius >= FLOOR_Y:
+            ball.centerY = FLOOR_Y - ball.radius
+            ball.velocityY = -ball.velocityY * BOUNCE_FACTOR
+            if abs(ball.velocityY) < MIN_VELOCITY:
+                ball.velocityY = 0
+                if abs(ball.velocityX) < MIN_VELOCITY:
+                    ball.velocityX = 0
+                    ball.atRest = True
+        if ball.centerY - ball.radius <= 0:
+            ball.centerY = ball.radius
+            ball.velocityY = -ball.velocityY * BOUNCE_FACTOR
+        if ball.centerX - ball.radius <= 0:
+            ball.centerX = ball.radius
+            ball.velocityX = -ball.velocityX * BOUNCE_FACTOR
+        if ball.centerX + ball.radius >= CANVAS_WIDTH:
+            ball.centerX = CANVAS_WIDTH - ball.radius
+            ball.velocityX = -ball.velocityX * BOUNCE_FACTOR
+
+
+def syncShapes(swarm, shapes):
+    """Copies the swarm's positions onto one object per ball."""
+    for shape, x, y in zip(shapes, swarm.x.tolist(), swarm.y.tolist()):
+        shape.centerX = x
+        shape.centerY = y
+
+
+def timeSteps(stepFn, steps):
+    """Runs stepFn `steps` times and returns the per-step times in ms."""
+    times = []
+    for i in range(steps):
+        start = time.perf_counter()
+        stepFn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def summarize(name, count, times):
+    times = sorted(times)
+    mean = sum(times) / len(times)
+    p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+    verdict = 'ok' if p99 < FRAME_BUDGET_MS else 'OVER BUDGET'
+    print(f'{name:>11} {count:>7} balls: mean {mean:8.3f} ms   '
+          f'p99 {p99:8.3f} ms   {verdict}')
+
+
+def benchSleeping(count, steps, maxSteps=3000):
+    """
+    Times a colliding swarm while it settles, after it has fallen asleep,
+    and while one ball dropped from the top wakes the pile and it settles
+    again.
+    """
+    swarm = BallSwarm(count, radius=2, maxRadius=5, seed=1, collide=True)
+    summarize('moving', count, timeSteps(swarm.step, steps))
+
+    settleSteps = steps
+    while not swarm.allAtRest() and settleSteps < maxSteps:
+        swarm.step()
+        settleSteps += 1
+    print(f'{"":>11} {swarm.atRest.sum():>7} balls asleep after '
+          f'{settleSteps} steps')
+    summarize('asleep', count, timeSteps(swarm.step, steps))
+
+    # Drop one ball from the top onto the sleeping pile
+    swarm.x[0] = swarm.world.width / 2
+    swarm.y[0] = 40
+    swarm.atRest[0] = False     # just this ball, not the rest of its island
+    swarm.sleepersChanged()
+    awake = []
+
+    def stepAndCount():
+        swarm.step()
+        awake.append(len(swarm.awake))
+
+    summarize('dropped', count, timeSteps(stepAndCount, steps))
+    print(f'{"":>11} at most {max(awake)} balls awake, '
+          f'{awake[-1]} awake at the end')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the ball swarm physics')
+    parser.add_argument('--balls', type=int, nargs='+',
+                        default=[1000, 5000, 10000])
+    parser.add_argument('--steps', type=int, default=100)
+    parser.add_argument('--sleep', action='store_true',
+                        help='time settled piles of sleeping balls instead')
+    args = parser.parse_args()
+
+    print(f'Frame budget at 30 steps per second: {FRAME_BUDGET_MS:.1f} ms')
+    if args.sleep:
+        for count in args.balls:
+            benchSleeping(count, args.steps)
+        return
+    for count in args.balls:
+        swarm = BallSwarm(count, radius=2, maxRadius=6, seed=1)
+        loopBalls = [LoopBall(x, y, r, vx) for x, y, r, vx in
+                     zip(swarm.x.tolist(), swarm.y.tolist(),
+                         swarm.radius.tolist(), swarm.vx.tolist())]
+        shapes = [LoopBall(x, y, r, 0) for x, y, r in
+                  zip(swarm.x.tolist(), swarm.y.tolist(),
+                      swarm.radius.tolist())]
+
+        def stepAndSync():
+            swarm.step()
+            syncShapes(swarm, shapes)
+
+        summarize('loop', count, timeSteps(lambda: stepLoop(loopBalls), args.steps))
+        swarm.reset()
+        summarize('swarm', count, timeSteps(swarm.step, args.steps))
+        swarm.reset()
+        summarize('swarm+sync', count, timeSteps(stepAndSync, args.steps))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+CMU Graphics - Bouncing Ball Project: Body Array
+================================================
+The state of many separate balls in a few NumPy arrays, one entry per
+ball, stepped with exactly the arithmetic of physics.step() (swarm.py's
+moveBalls, which BallSwarm uses too).
+
+A BallState (physics.py) is one object per ball with its own fields. For
+a handful of balls that is fine. With many, each step does the same
+attribute reads and writes on every object, one ball at a time, and each
+object costs its own memory. BodyArray instead keeps every ball's x, y,
+velocityX, velocityY and atRest in one array per field (a "structure of
+arrays"), so a step is a few array operations for all the balls together,
+and a ball costs 42 bytes.
+
+Unlike swarm.py's BallSwarm, which moves one swarm of balls together,
+a BodyArray has a fixed number of slots that are used one by one: each
+slot is either in use (`active`) or free, and each ball is placed on its
+own, like main.py's spawned balls.
+
+The shapes are not touched by step(). After a step, movedPositions()
+gives the slots whose balls moved and where they are now, and the demo
+copies those positions onto the shapes once per frame (see
+stepSpawnedBalls in main.py).
+
+The arrays only pay off with enough balls: below about a hundred, the
+fixed cost of each NumPy call is more than a Python loop over slotted
+BallStates (see bench_bodies.py). BallStateSlots has the same slots and
+methods with one physics.BallState per slot, and can step them with
+physics.stepContinuous() as well. makeBodies() picks one of the two.
+
+Prerequisites:
+- Python 3.6+
+- numpy installed (pip install numpy)
+
+Compare the cost per step and memory per ball with BallState objects:
+    python bench_bodies.py
+"""
+
+import numpy as np
+
+import physics
+from physics import BALL_RADIUS, DEFAULT_WORLD
+from swarm import moveBalls
+
+# From this many slots on, makeBodies() keeps the balls in a BodyArray
+BODY_ARRAY_MIN_BALLS = 100
+
+
+class BodyArray:
+    """
+    `capacity` balls of the same radius, stored as parallel arrays:
+
+      x, y      - ball centers
+      vx, vy    - velocities (pixels per step)
+      atRest    - True for balls that have stopped
+      restSteps - how many steps each ball has been at rest
+      active    - True for the slots in use
+
+    Free slots are never moved. After step(), `moved` holds the slots
+    whose balls may have moved.
+    """
+
+    def __init__(self, capacity, radius=BALL_RADIUS, world=DEFAULT_WORLD):
+        self.capacity = capacity
+        self.radius = radius
+        self.world = world
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.atRest = np.zeros(capacity, dtype=bool)
+        self.restSteps = np.zeros(capacity, dtype=np.int64)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.moved = np.zeros(0, dtype=np.int64)
+
+    def nbytes(self):
+        """Memory used by the arrays, in bytes."""
+        return sum(array.nbytes for array in (self.x, self.y, self.vx, self.vy,
+                                              self.atRest, self.restSteps,
+                                              self.active))
+
+    # -------------------------------------------------------------------------
+    # Using the slots
+    # -------------------------------------------------------------------------
+    def moveTo(self, slot, x, y):
+        """
+        Puts the ball in `slot` at (x, y), moving like the ball does after a
+        click (physics.moveTo), and marks the slot as in use.
+        """
+        self.x[slot] = x
+        self.y[slot] = y
+        self.vx[slot] = (x - self.world.width // 2) / 30
+        self.vy[slot] = 0
+        self.atRest[slot] = False
+        self.restSteps[slot] = 0
+        self.active[slot] = True
+
+    def free(self, slot):
+        """Marks `slot` as no longer in use."""
+        self.active[slot] = False
+
+    def freeAll(self):
+        """Marks every slot as no longer in use."""
+        self.active[:] = False
+
+    def movedPositions(self):
+        """(slot, x, y) for every ball that moved in the last step."""
+        moved = self.moved
+        return zip(moved.tolist(), self.x[moved].tolist(),
+                   self.y[moved].tolist())
+
+    def restedFor(self, steps):
+        """The slots in use whose balls have rested at least `steps` steps."""
+        return np.flatnonzero(self.active
+                              & (self.restSteps >= steps)).tolist()
+
+    # -------------------------------------------------------------------------
+    # Physics
+    # -------------------------------------------------------------------------
+    def step(self):
+        """
+        Advances every ball in use by one step, exactly like physics.step()
+        on a BallState, and counts the steps that stopped balls have rested.
+        """
+        self.restSteps[self.active & self.atRest] += 1
+        moving = np.flatnonzero(self.active & ~self.atRest)
+        self.moved = moving
+        if len(moving) == 0:
+            return
+
+        x, y = self.x[moving], self.y[moving]
+        vx, vy = self.vx[moving], self.vy[moving]
+        stopped = moveBalls(x, y, vx, vy, self.radius, self.world)
+        self.atRest[moving[stopped]] = True
+
+        self.x[moving], self.y[moving] = x, y
+        self.vx[moving], self.vy[moving] = vx, vy
+
+
+class BallStateSlots:
+    """
+    The slots of a BodyArray, each with its own physics.BallState, stepped
+    one at a time with `stepFn` (physics.step or physics.stepContinuous).
+    Faster than a BodyArray for a few dozen balls.
+    """
+
+    def __init__(self, capacity, radius=BALL_RADIUS, world=DEFAULT_WORLD,
+                 stepFn=physics.step):
+        self.capacity = capacity
+        self.stepFn = stepFn
+        self.states = [physics.BallState(radius=radius, world=world)
+                       for i in range(capacity)]
+        self.restSteps = [0] * capacity
+        self.active = [False] * capacity
+        self.moved = []
+
+    def moveTo(self, slot, x, y):
+        """Like BodyArray.moveTo: places the ball with physics.moveTo."""
+        physics.moveTo(self.states[slot], x, y)
+        self.restSteps[slot] = 0
+        self.active[slot] = True
+
+    def free(self, slot):
+        self.active[slot] = False
+
+    def freeAll(self):
+        self.active = [False] * self.capacity
+
+    def step(self):
+        """Advances every ball in use by one step, like BodyArray.step()."""
+        stepFn = self.stepFn
+        restSteps = self.restSteps
+        moved = []
+        for slot, state in enumerate(self.states):
+            if not self.active[slot]:
+                continue
+            if state.atRest:
+                restSteps[slot] += 1
+                continue
+            stepFn(state)
+            moved.append(slot)
+        self.moved = moved
+
+    def movedPositions(self):
+        states = self.states
+        return [(slot, states[slot].x, states[slot].y) for slot in self.moved]
+
+    def restedFor(self, steps):
+        return [slot for slot in range(self.capacity)
+                if self.active[slot] and self.restSteps[slot] >= steps]
+
+
+def makeBodies(capacity, radius=BALL_RADIUS, world=DEFAULT_WORLD,
+               continuous=False):
+    """
+    Slots for `capacity` balls: a BodyArray for BODY_ARRAY_MIN_BALLS or
+    more, BallStateSlots below that or with continuous collisions (which
+    only physics.stepContinuous() has).
+    """
+    if continuous:
+        return BallStateSlots(capacity, radius, world,
+                              physics.stepContinuous)
+    if capacity < BODY_ARRAY_MIN_BALLS:
+        return BallStateSlots(capacity, radius, world)
+    return BodyArray(capacity, radius, world)
@@ -0,0 +1,285 @@
+"""
+CMU Graphics - Bouncing Ball Project: Ball-to-Ball Collisions
+=============================================================
+Collision detection and response between balls, in two phases:
+
+1. Broad phase - a spatial hash. The canvas is divided into square cells
+   that are as wide as the largest ball, and every ball is filed under the
+   cell that holds its center. Two balls can only touch if their cells are
+   the same or neighbors, so instead of checking every pair of balls
+   (n * (n - 1) / 2 checks, which grows like n squared) we only check balls
+   in nearby cells. With a steady number of balls per cell, the work grows
+   like n.
+
+2. Narrow phase - for each nearby pair, check whether the two circles
+   really overlap. Overlapping balls are given an impulse along the line
+   between their centers, so they bounce off each other like billiard balls
+   (losing some energy, just like BOUNCE_FACTOR for the walls), and are
+   pushed apart so they no longer overlap.
+
+Everything is written with NumPy array operations so it works for
+thousands of balls at once (see swarm.py and bench_collisions.py).
+
+Prerequisites:
+- Python 3.6+
+- numpy installed (pip install numpy)
+"""
+
+import numpy as np
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+BALL_RADIUS = 20                # Matches main.py
+CELL_SIZE = 2 * BALL_RADIUS     # A cell is as wide as the biggest ball
+CANVAS_WIDTH = 400
+CANVAS_HEIGHT = 400
+BOUNCE_FACTOR = 0.8             # Energy kept in a ball-to-ball bounce
+
+# Balls that meet slower than this (pixels per step) don't bounce; they just
+# stop moving towards each other. Without this, balls resting in a pile
+# would keep bouncing off each other a tiny bit every step.
+RESTING_SPEED = 1.0
+
+# How much of an overlap separate() removes in one pass. Removing all of it
+# at once overshoots in a crowded pile; half of it per pass settles smoothly.
+SEPARATION_STRENGTH = 0.5
+
+# The cell itself plus four of its eight neighbors. Looking in only half of
+# the neighbors means each pair of neighboring cells is visited once, so
+# every pair of balls is found once.
+NEIGHBOR_OFFSETS = [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]
+
+# The cell itself and all eight neighbors, for looking up balls near points
+# that are not in the grid (see SpatialHash.nearbyPairs)
+ALL_NEIGHBOR_OFFSETS = [(dc, dr) for dc in (-1, 0, 1) for dr in (-1, 0, 1)]
+
+
+class SpatialHash:
+    """
+    A uniform grid over the canvas. build() files every ball under its cell;
+    candidatePairs() then lists the pairs of balls in the same or
+    neighboring cells, and nearbyPairs() finds the balls near other points.
+    """
+
+    def __init__(self, cellSize=CELL_SIZE, width=CANVAS_WIDTH,
+                 height=CANVAS_HEIGHT):
+        self.cellSize = cellSize
+        self.columns = int(width // cellSize) + 1
+        self.rows = int(height // cellSize) + 1
+        self.count = 0
+
+    def build(self, x, y):
+        """
+        Files each ball under the cell that contains its center. Balls
+        outside the canvas are filed under the nearest edge cell.
+        """
+        self.count = len(x)
+        self.column, self.row = self.cellOf(x, y)
+        keys = self.column * self.rows + self.row
+
+        # Sorting by cell puts the balls of each cell next to each other, so
+        # a cell's balls are the slice order[start:end] where start/end are
+        # found by binary search in sortedKeys.
+        self.order = np.argsort(keys, kind='stable')
+        self.sortedKeys = keys[self.order]
+
+    def cellOf(self, x, y):
+        """The (column, row) of the cell holding each point."""
+        column = np.clip((x // self.cellSize).astype(np.int64),
+                         0, self.columns - 1)
+        row = np.clip((y // self.cellSize).astype(np.int64), 0, self.rows - 1)
+        return column, row
+
+    def candidatePairs(self):
+        """
+        Returns two arrays (i, j) listing every pair of balls whose cells are
+        the same or neighbors. Each pair appears once.
+        """
+        allI = []
+        allJ = []
+        balls = np.arange(self.count)
+        for dc, dr in NEIGHBOR_OFFSETS:
+            i, j = self._pairsWithOffset(balls, self.column, self.row, dc, dr)
+            if dc == 0 and dr == 0:
+                # Same cell: (i, j) and (j, i) are both found, and so is
+                # (i, i). Keep each pair once.
+                keep = i < j
+                i, j = i[keep], j[keep]
+            allI.append(i)
+            allJ.append(j)
+        return np.concatenate(allI), np.concatenate(allJ)
+
+    def nearbyPairs(self, x, y):
+        """
+        For points (x, y) that are NOT in the grid, returns two arrays
+        (point, ball) pairing each point with every ball in the grid whose
+        cell is the same as or next to the point's cell.
+        """
+        column, row = self.cellOf(x, y)
+        points = np.arange(len(x))
+        allPoints = []
+        allBalls = []
+        for dc, dr in ALL_NEIGHBOR_OFFSETS:
+            i, j = self._pairsWithOffset(points, column, row, dc, dr)
+            allPoints.append(i)
+            allBalls.append(j)
+        return np.concatenate(allPoints), np.concatenate(allBalls)
+
+    def _pairsWithOffset(self, balls, column, row, dc, dr):
+        """
+        Pairs each of `balls` (sitting in cells column/row) with every ball
+        in the grid whose cell is (dc, dr) away.
+        """
+        column = column + dc
+        row = row + dr
+        valid = ((column >= 0) & (column < self.columns) &
+                 (row >= 0) & (row < self.rows))
+        keys = column * self.rows + row
+
+        start = np.searchsorted(self.sortedKeys, keys, side='left')
+        end = np.searchsorted(self.sortedKeys, keys, side='right')
+        counts = np.where(valid, end - start, 0)
+
+        # Ball b is paired with counts[b] others: repeat b that many times,
+        # and walk through its neighbor cell's slice of `order`.
+        total = int(counts.sum())
+        i = np.repeat(balls, counts)
+        firstOfRun = np.repeat(np.cumsum(counts) - counts, counts)
+        position = np.repeat(start, counts) + (np.arange(total) - firstOfRun)
+        j = self.order[position]
+        return i, j
+
+    def touchingPairs(self, x, y, radius):
+        """Builds the grid and returns the pairs (i, j) of balls that overlap."""
+        self.build(x, y)
+        i, j = self.candidatePairs()
+        return overlapping(x, y, radius, i, j)
+
+
+# =============================================================================
+# NARROW PHASE
+# =============================================================================
+
+def overlapping(x, y, radius, i, j):
+    """Keeps only the pairs (i, j) whose circles overlap."""
+    dx = x[j] - x[i]
+    dy = y[j] - y[i]
+    reach = radius[i] + radius[j]
+    touching = dx * dx + dy * dy < reach * reach
+    return i[touching], j[touching]
+
+
+def bruteForcePairs(x, y, radius, chunkSize=1024):
+    """
+    Checks every pair of balls and returns the pairs (i, j), i < j, whose
+    circles overlap. This is the n-squared check the spatial hash avoids; it
+    is here for comparison (see bench_collisions.py). Rows are processed
+    `chunkSize` balls at a time so memory use stays bounded.
+    """
+    count = len(x)
+    allI = []
+    allJ = []
+    for first in range(0, count, chunkSize):
+        rows = np.arange(first, min(first + chunkSize, count))
+        dx = x[None, :] - x[rows, None]
+        dy = y[None, :] - y[rows, None]
+        reach = radius[None, :] + radius[rows, None]
+        touching = dx * dx + dy * dy < reach * reach
+        touching &= np.arange(count)[None, :] > rows[:, None]
+        i, j = np.nonzero(touching)
+        allI.append(rows[i])
+        allJ.append(j)
+    if not allI:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(allI), np.concatenate(allJ)
+
+
+def applyImpulses(x, y, vx, vy, radius, i, j, bounceFactor=BOUNCE_FACTOR):
+    """
+    Gives each overlapping pair (i, j) that is moving closer together an
+    impulse along the line between their centers, updating vx and vy in
+    place. Slow contacts (below RESTING_SPEED) don't bounce. A ball's mass
+    is proportional to its area (radius squared), so small balls bounce off
+    big ones harder than the other way round. Returns a boolean array
+    marking the pairs that were moving towards each other.
+    """
+    count = len(x)
+    nx, ny, distance = normals(x, y, i, j)
+    shareI, shareJ, totalInverse = massShares(radius, i, j, count)
+
+    closingSpeed = (vx[j] - vx[i]) * nx + (vy[j] - vy[i]) * ny
+    approaching = closingSpeed < 0
+    bounce = np.where(closingSpeed < -RESTING_SPEED, bounceFactor, 0)
+    impulse = np.where(approaching,
+                       -(1 + bounce) * closingSpeed / totalInverse, 0)
+    addPerBall(vx, i, -impulse * nx * shareI, count)
+    addPerBall(vy, i, -impulse * ny * shareI, count)
+    addPerBall(vx, j, impulse * nx * shareJ, count)
+    addPerBall(vy, j, impulse * ny * shareJ, count)
+    return approaching
+
+
+def separate(x, y, radius, i, j):
+    """
+    Pushes apart any of the pairs (i, j) that overlap, the lighter ball
+    moving more. Each call removes SEPARATION_STRENGTH of every overlap;
+    call it a few times to separate a crowded pile. Pairs that don't
+    overlap are left alone, so (i, j) may be the candidate pairs from the
+    broad phase. Returns the number of pairs that overlapped.
+    """
+    count = len(x)
+    nx, ny, distance = normals(x, y, i, j)
+    overlap = np.maximum(radius[i] + radius[j] - distance, 0)
+    touching = overlap > 0
+    i, j = i[touching], j[touching]
+    nx, ny, overlap = nx[touching], ny[touching], overlap[touching]
+
+    # Unlike applyImpulses, a push is not divided among a ball's contacts:
+    # pushes only move balls, they can't speed them up, so several passes
+    # of separate() can safely add up.
+    invI = 1 / (radius[i] * radius[i])
+    invJ = 1 / (radius[j] * radius[j])
+    overlap *= SEPARATION_STRENGTH / (invI + invJ)
+    addPerBall(x, i, -nx * overlap * invI, count)
+    addPerBall(y, i, -ny * overlap * invI, count)
+    addPerBall(x, j, nx * overlap * invJ, count)
+    addPerBall(y, j, ny * overlap * invJ, count)
+    return len(i)
+
+
+def normals(x, y, i, j):
+    """
+    Unit vectors (nx, ny) pointing from ball i to ball j, and the distances
+    between them. Two balls exactly on top of each other get pushed apart
+    sideways.
+    """
+    dx = x[j] - x[i]
+    dy = y[j] - y[i]
+    distance = np.sqrt(dx * dx + dy * dy)
+    same = distance == 0
+    dx[same] = 1
+    length = np.where(same, 1, distance)
+    return dx / length, dy / length, distance
+
+
+def massShares(radius, i, j, count):
+    """
+    Each ball's share of an impulse in the pairs (i, j), and the pairs'
+    total inverse mass. A ball squeezed in a pile can touch several others
+    at once. Each contact is solved on its own, so a ball's share of each
+    impulse is divided by its number of contacts; otherwise the impulses
+    add up and the pile gains energy every step.
+    """
+    inverseMass = 1 / (radius * radius)
+    invI = inverseMass[i]
+    invJ = inverseMass[j]
+    contacts = np.bincount(i, minlength=count) + np.bincount(j, minlength=count)
+    shareI = invI / np.maximum(contacts[i], 1)
+    shareJ = invJ / np.maximum(contacts[j], 1)
+    return shareI, shareJ, invI + invJ
+
+
+def addPerBall(values, balls, amounts, count):
+    """values[balls] += amounts, adding up repeated balls correctly."""
+    values += np.bincount(balls, weights=amounts, minlength=count)
@@ -0,0 +1,184 @@
+"""
+CMU Graphics - Bouncing Ball Project: Fixed-Rate Physics
+========================================================
+Runs the ball physics on a thread of its own, at a fixed rate (240 steps
+per second by default) that doesn't depend on how often onStep is called.
+
+Normally physics.step() runs once per onStep, so the simulation only
+advances when a frame is drawn: a slow frame makes the ball move in
+slow motion, and the ball can only bounce at one of 30 moments a second.
+PhysicsThread instead keeps an "accumulator" of real time that hasn't been
+simulated yet and takes as many fixed-size steps as fit into it:
+
+    every loop:  accumulator += time since the last loop
+                 while accumulator >= 1/240 s:
+                     step the physics by 1/240 s
+                     accumulator -= 1/240 s
+
+Each physics step is the same size on every computer, so the ball follows
+the same path on a fast and a slow machine; only the number of frames
+drawn along the way differs. If the thread falls far behind (the computer
+was busy), it drops the time it can't catch up on (MAX_CATCH_UP_STEPS)
+instead of stepping ever more to catch up.
+
+onStep doesn't step the physics at all. It asks for position(), which
+blends the last two physics states according to how far the clock is
+between them, so the ball moves smoothly even though physics steps and
+frames don't line up. The ball is drawn one physics step (~4 ms) behind.
+
+Python threads take turns (only one runs Python code at a time), so the
+thread doesn't make the physics any cheaper. It takes the physics out of
+onStep: the frame no longer waits for it, and the physics no longer waits
+for the frame.
+
+Prerequisites:
+- Python 3.6+
+
+Compare the path of the ball at different physics rates:
+    python fixed_rate.py
+    python fixed_rate.py --rates 30 60 240 1000
+"""
+
+import argparse
+import threading
+import time
+from contextlib import contextmanager
+
+import physics
+
+DEFAULT_RATE = 240              # Physics steps per second
+STEPS_PER_SECOND = 30           # cmu_graphics' default onStep rate
+MAX_CATCH_UP_STEPS = 30         # Most physics steps taken in one go
+
+
+class PhysicsThread(threading.Thread):
+    """
+    Steps `state` with physics.step() `rate` times per second, on a daemon
+    thread, until stop() is called. `steps` counts the physics steps taken
+    and `droppedSteps` the steps skipped after falling behind.
+
+    Anything else that changes `state` while the thread is running must do
+    it inside `with thread.edit():`.
+    """
+
+    def __init__(self, state, rate=DEFAULT_RATE, stepsPerSecond=STEPS_PER_SECOND):
+        super().__init__(daemon=True)
+        self.state = state
+        self.rate = rate
+        self.interval = 1 / rate
+        # The physics step in onStep steps (1/8 at 240 steps per second)
+        self.dt = stepsPerSecond / rate
+        self.lock = threading.Lock()
+        self.previous = self.current = (state.x, state.y)
+        self.currentTime = time.perf_counter()
+        self.steps = 0
+        self.droppedSteps = 0
+        self.stopped = False
+
+    def run(self):
+        state = self.state
+        interval = self.interval
+        accumulator = 0.0
+        last = time.perf_counter()
+        while not self.stopped:
+            now = time.perf_counter()
+            accumulator += now - last
+            last = now
+            if accumulator > MAX_CATCH_UP_STEPS * interval:
+                dropped = int(accumulator / interval) - MAX_CATCH_UP_STEPS
+                self.droppedSteps += dropped
+                accumulator -= dropped * interval
+
+            with self.lock:
+                while accumulator >= interval:
+                    physics.step(state, self.dt)
+                    self.previous = self.current
+                    self.current = (state.x, state.y)
+                    accumulator -= interval
+                    self.steps += 1
+                # The time (on the perf_counter clock) that `current` is for
+                self.currentTime = now - accumulator
+
+            time.sleep(max(0.0, interval - accumulator))
+
+    def stop(self):
+        self.stopped = True
+
+    def position(self):
+        """
+        Where to draw the ball now: between the last two physics states,
+        one physics step behind the clock.
+        """
+        with self.lock:
+            (x0, y0), (x1, y1) = self.previous, self.current
+            t = (time.perf_counter() - self.currentTime) / self.interval
+        t = min(max(t, 0.0), 1.0)
+        return x0 + (x1 - x0) * t, y0 + (y1 - y0) * t
+
+    @contextmanager
+    def edit(self):
+        """
+        Pauses the physics while the `with` block changes the state. If the
+        ball was moved, it is drawn at its new place straight away instead
+        of sliding there.
+        """
+        with self.lock:
+            state = self.state
+            before = (state.x, state.y)
+            yield state
+            if (state.x, state.y) != before:
+                self.previous = self.current = (state.x, state.y)
+
+
+# =============================================================================
+# COMPARING RATES
+# =============================================================================
+
+def simulate(rate, seconds, stepsPerSecond=STEPS_PER_SECOND):
+    """
+    Drops the ball from its starting position with physics steps at `rate`
+    steps per second. Returns the positions at every 1/stepsPerSecond
+    second (every frame), the number of bounces off the floor and the time
+    it came to rest (or None).
+    """
+    state = physics.BallState()
+    dt = stepsPerSecond / rate
+    stepsPerFrame = rate / stepsPerSecond
+    positions = []
+    bounces = 0
+    restTime = None
+    steps = int(seconds * rate)
+    for i in range(steps):
+        falling = state.velocityY > 0
+        physics.step(state, dt)
+        if falling and state.velocityY < 0:
+            bounces += 1
+        if state.atRest and restTime is None:
+            restTime = (i + 1) / rate
+        if (i + 1) % stepsPerFrame < 1:
+            positions.append((state.x, state.y))
+    return positions, bounces, restTime
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare the ball physics at different fixed rates')
+    parser.add_argument('--rates', type=int, nargs='+',
+                        default=[30, 60, 120, 240, 960])
+    parser.add_argument('--seconds', type=float, default=20)
+    args = parser.parse_args()
+
+    finest = max(args.rates)
+    reference, unused, unused = simulate(finest, args.seconds)
+    print(f'{"rate":>6}{"bounces":>9}{"at rest after":>15}'
+          f'{"max distance from " + str(finest) + " Hz":>27}')
+    for rate in args.rates:
+        positions, bounces, restTime = simulate(rate, args.seconds)
+        distance = max((abs(x - rx) ** 2 + abs(y - ry) ** 2) ** 0.5
+                       for (x, y), (rx, ry) in zip(positions, reference))
+        rest = f'{restTime:.2f} s' if restTime is not None else '-'
+        print(f'{rate:>6}{bounces:>9}{rest:>15}{distance:>24.1f} px')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+CMU Graphics - Bouncing Ball Project: Frame Budget Governor
+===========================================================
+Keeps each step within the time one frame has (33 ms at 30 steps per
+second) by turning optional work off when the steps get too slow, and back
+on when there is time to spare.
+
+The optional work is a list of quality steps, cheapest to lose first. Each
+one has a lower() that turns something off (or down) and a restore() that
+undoes it:
+
+    governor = FrameGovernor([
+        QualityStep('shadow scaling', lower=..., restore=...),
+        QualityStep('controls panel', lower=..., restore=...),
+    ], stepsPerSecond=30)
+
+    def onStep():
+        start = time.perf_counter()
+        ...
+        governor.record((time.perf_counter() - start) * 1000)
+
+The governor averages the last WINDOW_STEPS step times. When the average is
+above OVER_BUDGET of the budget, it lowers the next quality step; when it is
+below UNDER_BUDGET, it restores the last one lowered. Restoring waits longer
+than lowering, and each time a restore has to be taken back the wait
+doubles, so the level doesn't flip back and forth around the budget.
+
+The time onStep takes isn't the whole frame: cmu_graphics also spends time
+drawing. record() can be given the time since the previous step as well;
+if steps come further apart than the budget allows (but not so far apart
+that the app must have been paused), that counts as over budget too.
+
+`level` is the number of quality steps lowered (0 is full quality), and
+`decisions` lists every change: (step number, 'lower' or 'restore', quality
+step name, average ms that led to it).
+
+This file doesn't use cmu_graphics. Prerequisites:
+- Python 3.6+
+"""
+
+import collections
+
+# Steps averaged for each decision (half a second at 30 steps per second)
+WINDOW_STEPS = 15
+
+# Lower the quality when the average step takes more than this share of the
+# budget, restore it when it takes less than this share
+OVER_BUDGET = 0.9
+UNDER_BUDGET = 0.5
+
+# Steps between frames more than this share of the budget apart are late
+LATE_FRAME = 1.25
+
+# A gap between steps longer than this many budgets is a pause (the app was
+# paused, or the window dragged), not a slow frame, and is left out
+PAUSE_FRAMES = 10
+
+# Steps to wait after any change before lowering again, and at first before
+# restoring. A restore taken back within RESTORE_WAIT steps doubles the wait
+# before the next restore, up to MAX_RESTORE_WAIT.
+LOWER_WAIT = WINDOW_STEPS
+RESTORE_WAIT = 4 * WINDOW_STEPS
+MAX_RESTORE_WAIT = 64 * WINDOW_STEPS
+
+
+class QualityStep:
+    """One piece of optional work: lower() turns it off, restore() back on."""
+
+    def __init__(self, name, lower, restore):
+        self.name = name
+        self.lower = lower
+        self.restore = restore
+
+    def __repr__(self):
+        return f'QualityStep({self.name!r})'
+
+
+class FrameGovernor:
+    """
+    Lowers and restores `steps` (a list of QualityStep, first to go first)
+    to keep the step time within the budget of one frame at
+    `stepsPerSecond`. Call record() once per step.
+    """
+
+    def __init__(self, steps, stepsPerSecond=30):
+        self.steps = list(steps)
+        self.budgetMs = 1000 / stepsPerSecond
+        self.level = 0
+        self.stepTimes = collections.deque(maxlen=WINDOW_STEPS)
+        self.frameTimes = collections.deque(maxlen=WINDOW_STEPS)
+        self.stepNumber = 0
+        self.nextDecision = WINDOW_STEPS
+        self.restoreWait = RESTORE_WAIT
+        self.lastChange = 0
+        self.lastRestore = None
+        self.decisions = []
+
+    @property
+    def levelName(self):
+        """'full', or the name of the last quality step lowered."""
+        return self.steps[self.level - 1].name if self.level else 'full'
+
+    def record(self, stepMs, frameMs=None):
+        """
+        Adds one step's time (and, if known, the time since the previous
+        step) and lowers or restores a quality step if it's time to.
+        Returns the decision taken, or None.
+        """
+        self.stepNumber += 1
+        self.stepTimes.append(stepMs)
+        if frameMs is not None and frameMs < PAUSE_FRAMES * self.budgetMs:
+            self.frameTimes.append(frameMs)
+        if (self.stepNumber < self.nextDecision
+                or len(self.stepTimes) < WINDOW_STEPS):
+            return None
+
+        stepAverage = sum(self.stepTimes) / len(self.stepTimes)
+        frameAverage = (sum(self.frameTimes) / len(self.frameTimes)
+                        if self.frameTimes else 0)
+        over = (stepAverage > OVER_BUDGET * self.budgetMs
+                or frameAverage > LATE_FRAME * self.budgetMs)
+        under = (stepAverage < UNDER_BUDGET * self.budgetMs
+                 and frameAverage <= LATE_FRAME * self.budgetMs)
+        if over and self.level < len(self.steps):
+            return self.lower(stepAverage)
+        if (under and self.level > 0
+                and self.stepNumber - self.lastChange >= self.restoreWait):
+            return self.restore(stepAverage)
+        return None
+
+    def lower(self, averageMs=0.0):
+        """Lowers the next quality step (if there is one left)."""
+        if self.level == len(self.steps):
+            return None
+        step = self.steps[self.level]
+        step.lower()
+        self.level += 1
+        # A restore that didn't last: wait longer before the next one
+        if (self.lastRestore is not None
+                and self.stepNumber - self.lastRestore <= RESTORE_WAIT):
+            self.restoreWait = min(2 * self.restoreWait, MAX_RESTORE_WAIT)
+        return self.decide('lower', step, averageMs)
+
+    def restore(self, averageMs=0.0):
+        """Restores the last quality step lowered (if any)."""
+        if self.level == 0:
+            return None
+        self.level -= 1
+        step = self.steps[self.level]
+        step.restore()
+        self.lastRestore = self.stepNumber
+        return self.decide('restore', step, averageMs)
+
+    def restoreAll(self):
+        while self.level:
+            self.restore()
+
+    def decide(self, action, step, averageMs):
+        decision = (self.stepNumber, action, step.name, averageMs)
+        self.decisions.append(decision)
+        # Start the next average afresh, with the change in effect
+        self.stepTimes.clear()
+        self.frameTimes.clear()
+        self.lastChange = self.stepNumber
+        self.nextDecision = self.stepNumber + LOWER_WAIT
+        return decision
+
+    def describe(self, decision):
+        stepNumber, action, name, averageMs = decision
+        return (f'step {stepNumber}: {action} {name} '
+                f'(average {averageMs:.1f} of {self.budgetMs:.1f} ms)')
@@ -9,17 +9,46 @@ Features:
 - Bounce physics with energy loss
 - Wall collision detection
 - Click to reset ball position
+- Swarm mode: thousands of balls moved with NumPy (see swarm.py)
+- Optional ball-to-ball collisions in swarm mode (see collisions.py)
+- Optional worker processes for swarm mode, one per strip of the canvas,
+  sharing the balls' state through shared memory (see shards.py)
+- Optional continuous collisions: exact bounce times, even at high speed
+- Optional fixed-rate physics on its own thread (see fixed_rate.py)
+- Spawn mode: each click adds a ball, reusing shapes from a pool (see pool.py)
+- Optional trail of fading circles behind the ball
+- Optional frame budget governor: turns effects off, then simulates fewer
+  balls, when steps get too slow, and back on when they're fast again
+  (see governor.py)
+
+The physics itself lives in physics.py, which doesn't use cmu_graphics.
+This file is the "front end": it draws the ball and forwards the mouse and
+keyboard to the physics.
 
 Prerequisites:
 - Python 3.6+
 - cmu_graphics library installed
+- numpy installed (only for swarm and spawn modes)
 
 Run this demo:
     python main.py
+    python main.py --balls 5000     (swarm mode)
+    python main.py --balls 1000 --collide
+    python main.py --balls 20000 --collide --shards 4
+    python main.py --continuous
+    python main.py --physics-rate 240
+    python main.py --spawn 32
+    python main.py --trail 8
+    python main.py --balls 20000 --governor
 """
 
+import argparse
+import time
+
 from cmu_graphics import *
 
+import physics
+
 # =============================================================================
 # CONSTANTS
 # =============================================================================
@@ -38,35 +67,133 @@ BOUNCE_FACTOR = 0.8     # Energy retained after bounce (0.0 to 1.0)
 FRICTION = 0.99         # Horizontal friction factor
 MIN_VELOCITY = 0.5      # Minimum velocity threshold (stops tiny bounces)
 
+# Spawn mode: a spawned ball is removed after resting this many steps
+DESPAWN_STEPS = 60
+
+# Trail circles (with --trail) fade from this opacity to nothing
+TRAIL_OPACITY = 40
+
+# Swarm mode ball sizes (each ball gets a random radius in this range)
+SWARM_MIN_RADIUS = 2
+SWARM_MAX_RADIUS = 5
+
+# =============================================================================
+# COMMAND-LINE OPTIONS
+# =============================================================================
+# With --balls N (N > 1) the demo switches to swarm mode: the physics for all
+# N balls runs as NumPy array operations in swarm.py instead of physics.py.
+parser = argparse.ArgumentParser(description='Bouncing ball simulation')
+parser.add_argument('--balls', type=int, default=1,
+                    help='number of balls (more than 1 uses swarm mode)')
+parser.add_argument('--collide', action='store_true',
+                    help='make the balls bounce off each other (swarm mode)')
+parser.add_argument('--shards', type=int, default=0, metavar='N',
+                    help='step the swarm in N worker processes, one per '
+                         'strip of the canvas (see shards.py)')
+parser.add_argument('--continuous', action='store_true',
+                    help='find the exact time of each bounce within a step '
+                         '(see physics.stepContinuous)')
+parser.add_argument('--physics-rate', type=int, default=0,
+                    help='run the physics on its own thread this many times '
+                         'per second (see fixed_rate.py)')
+parser.add_argument('--spawn', type=int, default=0, metavar='N',
+                    help='each click adds a ball, up to N at once '
+                         '(see pool.py)')
+parser.add_argument('--trail', type=int, default=0, metavar='N',
+                    help='draw N fading circles behind the ball')
+parser.add_argument('--governor', action='store_true',
+                    help='lower the quality when steps take longer than the '
+                         'frame budget (see governor.py)')
+options = parser.parse_args()
+if options.spawn and options.balls > 1:
+    parser.error('--spawn works with a single ball')
+if options.physics_rate and (options.balls > 1 or options.continuous):
+    parser.error('--physics-rate works with a single ball and physics.step')
+if options.shards and options.balls <= 1:
+    parser.error('--shards works with swarm mode (--balls)')
+if options.trail and options.balls > 1:
+    parser.error('--trail works with a single ball')
+
 # =============================================================================
 # INITIAL SETUP
 # =============================================================================
 
+# The box the ball bounces in and the physics constants above
+world = physics.World(width=CANVAS_WIDTH, height=CANVAS_HEIGHT,
+                      floorY=CANVAS_HEIGHT - 5,  # Account for ground line
+                      gravity=GRAVITY, bounceFactor=BOUNCE_FACTOR,
+                      friction=FRICTION, minVelocity=MIN_VELOCITY)
+
+# The ball's position and velocity. It starts near the top, moving right
+# (velocityX = 3) and starting to fall (velocityY = 0).
+state = physics.BallState(CANVAS_WIDTH // 2, BALL_RADIUS + 10, BALL_RADIUS,
+                          world=world)
+
 # Create the ball shape
-ball = Circle(CANVAS_WIDTH // 2, BALL_RADIUS + 10, BALL_RADIUS, 
+ball = Circle(state.x, state.y, BALL_RADIUS,
               fill=BALL_COLOR, border=BALL_BORDER_COLOR, borderWidth=2)
 
-# Initialize velocity components
-app.velocityX = 3       # Initial horizontal velocity
-app.velocityY = 0       # Initial vertical velocity (starts falling)
+# With --physics-rate, a thread steps the physics and onStep only draws the
+# ball where the thread says it is
+physicsThread = None
+if options.physics_rate:
+    from fixed_rate import PhysicsThread
+
+    physicsThread = PhysicsThread(state, options.physics_rate,
+                                  app.stepsPerSecond)
+    physicsThread.start()
+
+# =============================================================================
+# SWARM MODE SETUP
+# =============================================================================
+swarm = None
+if options.balls > 1:
+    from swarm import BallSwarm
+
+    # The single ball is not used in swarm mode
+    ball.visible = False
+
+    if options.shards:
+        # The same swarm, stepped by worker processes (see shards.py)
+        from shards import ShardedSwarm
+
+        swarm = ShardedSwarm(options.balls, options.shards,
+                             radius=SWARM_MIN_RADIUS, maxRadius=SWARM_MAX_RADIUS,
+                             world=world, collide=options.collide)
+    else:
+        swarm = BallSwarm(options.balls, radius=SWARM_MIN_RADIUS,
+                          maxRadius=SWARM_MAX_RADIUS, world=world,
+                          collide=options.collide)
 
-# Track if the ball is at rest
-app.atRest = False
+    # One Circle per ball. The physics never touches these; onStep copies the
+    # swarm's positions onto them once per step.
+    app.maxShapeCount = max(app.maxShapeCount, options.balls + 100)
+    swarmCircles = [Circle(x, y, r, fill=BALL_COLOR)
+                    for x, y, r in zip(swarm.x.tolist(), swarm.y.tolist(),
+                                       swarm.radius.tolist())]
+
+    # Measured physics time per step, shown in the corner
+    app.physicsTimes = []
+    frameTimeLabel = Label('', CANVAS_WIDTH - 10, 45, size=10,
+                           fill='gray', align='right')
+    # Shown times differ on every run; demokit's replay leaves these out
+    # when it checks that two runs ended the same
+    app.clockDependent = [frameTimeLabel, 'physicsTimes']
 
 # =============================================================================
 # USER INTERFACE ELEMENTS
 # =============================================================================
 
 # Title label
-Label('Bouncing Ball Simulation', CANVAS_WIDTH // 2, 20, 
+Label('Bouncing Ball Simulation', CANVAS_WIDTH // 2, 20,
       size=18, bold=True, fill='darkSlateGray')
 
 # Instructions label
-Label('Click anywhere to reset the ball', CANVAS_WIDTH // 2, CANVAS_HEIGHT - 20, 
+Label('Click anywhere to reset the ball', CANVAS_WIDTH // 2, CANVAS_HEIGHT - 20,
       size=12, fill='gray')
 
 # Ground line (visual reference)
-Line(0, CANVAS_HEIGHT - 5, CANVAS_WIDTH, CANVAS_HEIGHT - 5, 
+Line(0, CANVAS_HEIGHT - 5, CANVAS_WIDTH, CANVAS_HEIGHT - 5,
      fill='darkGray', lineWidth=2)
 
 # =============================================================================
@@ -76,69 +203,53 @@ Line(0, CANVAS_HEIGHT - 5, CANVAS_WIDTH, CANVAS_HEIGHT - 5,
 def onStep():
     """
     Called automatically ~30 times per second.
-    Updates ball position based on velocity and handles collisions.
+    Advances the physics by one step (see physics.step for gravity, friction
+    and the collisions), then moves the ball to its new position.
     """
+    if swarm is not None:
+        stepSwarm()
+        return
+
+    if physicsThread is not None:
+        ball.centerX, ball.centerY = physicsThread.position()
+        return
+
     # Skip physics if ball is at rest
-    if app.atRest:
+    if state.atRest:
         return
-    
-    # -------------------------------------------------------------------------
-    # Apply Gravity
-    # -------------------------------------------------------------------------
-    # Gravity increases downward velocity each step
-    app.velocityY += GRAVITY
-    
-    # -------------------------------------------------------------------------
-    # Apply Friction to Horizontal Movement
-    # -------------------------------------------------------------------------
-    app.velocityX *= FRICTION
-    
-    # -------------------------------------------------------------------------
-    # Update Position
-    # -------------------------------------------------------------------------
-    ball.centerX += app.velocityX
-    ball.centerY += app.velocityY
-    
-    # -------------------------------------------------------------------------
-    # Floor Collision Detection
-    # -------------------------------------------------------------------------
-    floorY = CANVAS_HEIGHT - 5  # Account for ground line
-    
-    if ball.centerY + BALL_RADIUS >= floorY:
-        # Place ball exactly at floor level
-        ball.centerY = floorY - BALL_RADIUS
-        
-        # Reverse and reduce vertical velocity (bounce)
-        app.velocityY = -app.velocityY * BOUNCE_FACTOR
-        
-        # Check if ball should stop bouncing
-        if abs(app.velocityY) < MIN_VELOCITY:
-            app.velocityY = 0
-            # Check if horizontal movement should also stop
-            if abs(app.velocityX) < MIN_VELOCITY:
-                app.velocityX = 0
-                app.atRest = True
-    
-    # -------------------------------------------------------------------------
-    # Ceiling Collision Detection
-    # -------------------------------------------------------------------------
-    if ball.centerY - BALL_RADIUS <= 0:
-        ball.centerY = BALL_RADIUS
-        app.velocityY = -app.velocityY * BOUNCE_FACTOR
-    
-    # -------------------------------------------------------------------------
-    # Left Wall Collision Detection
-    # -------------------------------------------------------------------------
-    if ball.centerX - BALL_RADIUS <= 0:
-        ball.centerX = BALL_RADIUS
-        app.velocityX = -app.velocityX * BOUNCE_FACTOR
-    
-    # -------------------------------------------------------------------------
-    # Right Wall Collision Detection
-    # -------------------------------------------------------------------------
-    if ball.centerX + BALL_RADIUS >= CANVAS_WIDTH:
-        ball.centerX = CANVAS_WIDTH - BALL_RADIUS
-        app.velocityX = -app.velocityX * BOUNCE_FACTOR
+
+    if options.continuous:
+        physics.stepContinuous(state)
+    else:
+        physics.step(state)
+
+    ball.centerX = state.x
+    ball.centerY = state.y
+
+def stepSwarm():
+    """
+    Swarm mode version of onStep: moves every awake ball with one
+    vectorized physics step, then copies the new positions onto the Circles.
+    """
+    start = time.perf_counter()
+    swarm.step()
+    app.physicsTimes.append((time.perf_counter() - start) * 1000)
+
+    # Only the balls that were awake can have moved; sleeping balls' Circles
+    # are already in the right place
+    moved = swarm.moved
+    for index, x, y in zip(moved.tolist(), swarm.x[moved].tolist(),
+                           swarm.y[moved].tolist()):
+        circle = swarmCircles[index]
+        circle.centerX = x
+        circle.centerY = y
+
+    # Show the average physics time over the last 15 steps (~0.5 seconds)
+    if len(app.physicsTimes) == 15:
+        average = sum(app.physicsTimes) / 15
+        frameTimeLabel.value = (f'{swarm.count} balls ({len(swarm.awake)} awake): '
+                                f'{average:.2f} ms/step')
+        app.physicsTimes = []
 
 # =============================================================================
 # USER INTERACTION
@@ -149,53 +260,96 @@ def onMousePress(mouseX, mouseY):
     Called when the user clicks on the canvas.
     Resets the ball to the clicked position with new velocity.
     """
-    # Reset ball position to click location
-    ball.centerX = mouseX
-    ball.centerY = mouseY
-    
-    # Give the ball a new random-ish velocity
-    # (Using a simple formula based on click position)
-    app.velocityX = (mouseX - CANVAS_WIDTH // 2) / 30
-    app.velocityY = 0  # Start falling from rest
-    
-    # Wake up the ball if it was at rest
-    app.atRest = False
+    if swarm is not None:
+        # Gather the whole swarm around the click
+        swarm.moveTo(mouseX, mouseY)
+        app.paused = False
+        return
+
+    if spawnPool is not None:
+        spawnBall(mouseX, mouseY)
+        return
+
+    # Reset ball position to click location, with a new velocity based on
+    # the click position. This also wakes up the ball if it was at rest.
+    if physicsThread is not None:
+        with physicsThread.edit():
+            physics.moveTo(state, mouseX, mouseY)
+    else:
+        physics.moveTo(state, mouseX, mouseY)
+    ball.centerX = state.x
+    ball.centerY = state.y
 
 def onKeyPress(key):
     """
     Called when the user presses a key.
     Provides additional controls for the simulation.
     """
+    if swarm is not None:
+        handleSwarmKey(key)
+    elif physicsThread is not None:
+        # The physics thread must not step the ball halfway through a change
+        with physicsThread.edit():
+            handleBallKey(key)
+    else:
+        handleBallKey(key)
+
+def handleBallKey(key):
+    """The keyboard controls for the single ball."""
     if key == 'space':
         # Toggle pause by inverting atRest state
-        app.atRest = not app.atRest
+        state.atRest = not state.atRest
     elif key == 'r':
-        # Reset to initial position
-        ball.centerX = CANVAS_WIDTH // 2
-        ball.centerY = BALL_RADIUS + 10
-        app.velocityX = 3
-        app.velocityY = 0
-        app.atRest = False
+        # Reset to initial position (and take away any spawned balls)
+        physics.reset(state)
+        if spawnPool is not None:
+            spawnPool.releaseAll()
+            spawnBodies.freeAll()
     elif key == 'up':
         # Give the ball an upward boost
-        app.velocityY -= 10
-        app.atRest = False
+        physics.push(state, 0, -10)
     elif key == 'left':
         # Push the ball left
-        app.velocityX -= 5
-        app.atRest = False
+        physics.push(state, -5, 0)
     elif key == 'right':
         # Push the ball right
-        app.velocityX += 5
-        app.atRest = False
+        physics.push(state, 5, 0)
+
+def handleSwarmKey(key):
+    """The same keyboard controls as onKeyPress, applied to every ball."""
+    if key == 'space':
+        app.paused = not app.paused
+        return
+    elif key == 'r':
+        swarm.reset()
+    elif key == 'up':
+        swarm.push(0, -10)
+    elif key == 'left':
+        swarm.push(-5, 0)
+    elif key == 'right':
+        swarm.push(5, 0)
+    app.paused = False
 
 # =============================================================================
 # ADDITIONAL VISUAL FEEDBACK
 # =============================================================================
 
 # Add a shadow under the ball for depth perception
-shadow = Oval(ball.centerX, CANVAS_HEIGHT - 8, BALL_RADIUS * 1.5, 8, 
-              fill='gray', opacity=30)
+shadow = Oval(ball.centerX, CANVAS_HEIGHT - 8, BALL_RADIUS * 1.5, 8,
+              fill='gray', opacity=30, visible=(swarm is None))
+
+# Shadows grow and fade with the ball's height (the governor can turn this off)
+app.scaleShadows = True
+
+# With --trail N, N circles follow the ball, each one step further behind and
+# fainter than the last. app.trailPositions holds the ball's last N centers.
+trailCircles = [Circle(ball.centerX, ball.centerY, BALL_RADIUS, fill=BALL_COLOR,
+                       opacity=TRAIL_OPACITY * (options.trail - i) // (options.trail + 1))
+                for i in range(options.trail)]
+app.trailPositions = []
+app.showTrail = bool(trailCircles)
+if trailCircles:
+    ball.toFront()
 
 # Update shadow position in onStep
 original_onStep = onStep
@@ -205,19 +359,119 @@ def onStep():
     Extended onStep that also updates the shadow position.
     """
     original_onStep()
-    
+
+    # Balls in swarm mode have no shadows
+    if swarm is not None:
+        return
+
+    placeShadow(shadow, ball.centerX, ball.centerY)
+
+    if app.showTrail:
+        stepTrail()
+
+    if spawnPool is not None:
+        stepSpawnedBalls()
+
+def placeShadow(oval, x, y):
+    """Moves a shadow Oval under a ball at (x, y)."""
     # Update shadow position to match ball's X position
-    shadow.centerX = ball.centerX
-    
+    oval.centerX = x
+    if not app.scaleShadows:
+        return
+
     # Scale shadow size based on ball height
     # Shadow is larger when ball is higher (simulates light from above)
-    height_factor = ball.centerY / CANVAS_HEIGHT
-    shadow.width = BALL_RADIUS * (1.5 + (1 - height_factor))
-    shadow.opacity = 20 + int(30 * height_factor)
+    height_factor = y / CANVAS_HEIGHT
+    oval.width = BALL_RADIUS * (1.5 + (1 - height_factor))
+    oval.opacity = 20 + int(30 * height_factor)
+
+def stepTrail():
+    """Moves each trail circle to where the ball was one step further back."""
+    positions = app.trailPositions
+    positions.insert(0, (ball.centerX, ball.centerY))
+    del positions[len(trailCircles) + 1:]
+    for circle, (x, y) in zip(trailCircles, positions[1:]):
+        circle.centerX = x
+        circle.centerY = y
+
+def showTrail(visible):
+    """Shows or hides the trail; a trail shown again starts at the ball."""
+    app.showTrail = visible
+    app.trailPositions = []
+    for circle in trailCircles:
+        circle.centerX = ball.centerX
+        circle.centerY = ball.centerY
+        circle.visible = visible
+
+# =============================================================================
+# SPAWN MODE
+# =============================================================================
+# With --spawn N, each click adds a new ball with its own shadow instead of
+# moving the ball. The shapes for all N balls are made up front, hidden, in
+# a ShapePool (see pool.py): a spawned ball that has been at rest for
+# DESPAWN_STEPS steps is hidden and its shapes reused, and once N balls are
+# out the oldest one is taken for the next click. Clicking fast, or for a
+# long time, never creates more shapes.
+spawnPool = None
+if options.spawn:
+    from bodies import makeBodies
+    from pool import ShapePool
+
+    def makeSpawnedBall():
+        spawnedShadow = Oval(0, CANVAS_HEIGHT - 8, BALL_RADIUS * 1.5, 8,
+                             fill='gray', opacity=30)
+        spawnedBall = Circle(0, 0, BALL_RADIUS, fill=BALL_COLOR,
+                             border=BALL_BORDER_COLOR, borderWidth=2)
+        return spawnedShadow, spawnedBall
+
+    app.maxShapeCount = max(app.maxShapeCount, 2 * options.spawn + 100)
+    spawnPool = ShapePool(makeSpawnedBall, options.spawn)
+
+    # The spawned balls' physics: one slot per pool slot, in NumPy arrays
+    # for a hundred balls or more and in BallStates below that or with
+    # --continuous (see bodies.py)
+    spawnBodies = makeBodies(options.spawn, radius=BALL_RADIUS, world=world,
+                             continuous=options.continuous)
+
+    # At most this many spawned balls at once (the governor can lower it)
+    app.spawnLimit = options.spawn
+
+def spawnBall(x, y):
+    """Adds a ball at (x, y), moving like the ball does after a click."""
+    limitSpawnedBalls(app.spawnLimit - 1)
+    slot = spawnPool.acquire()
+    spawnBodies.moveTo(slot, x, y)
+    spawnedShadow, spawnedBall = spawnPool.items[slot]
+    spawnedBall.centerX = x
+    spawnedBall.centerY = y
+    placeShadow(spawnedShadow, x, y)
+
+def stepSpawnedBalls():
+    """
+    Moves every spawned ball, then copies the new positions onto the shapes
+    of the balls that moved. Balls that have been at rest for DESPAWN_STEPS
+    steps go back into the pool.
+    """
+    spawnBodies.step()
+    for slot, x, y in spawnBodies.movedPositions():
+        spawnedShadow, spawnedBall = spawnPool.items[slot]
+        spawnedBall.centerX = x
+        spawnedBall.centerY = y
+        placeShadow(spawnedShadow, x, y)
+
+    for slot in spawnBodies.restedFor(DESPAWN_STEPS):
+        spawnPool.release(slot)
+        spawnBodies.free(slot)
+
+def limitSpawnedBalls(count):
+    """Takes away the oldest spawned balls until at most `count` are left."""
+    for slot in list(spawnPool)[:max(len(spawnPool) - count, 0)]:
+        spawnPool.release(slot)
+        spawnBodies.free(slot)
 
 # Keyboard controls info (displayed at bottom)
 controlsGroup = Group(
-    Rect(5, CANVAS_HEIGHT - 85, 120, 60, fill='white', opacity=80, 
+    Rect(5, CANVAS_HEIGHT - 85, 120, 60, fill='white', opacity=80,
          border='lightGray', borderWidth=1),
     Label('Controls:', 65, CANVAS_HEIGHT - 75, size=10, bold=True, fill='darkGray'),
     Label('SPACE: Pause/Resume', 65, CANVAS_HEIGHT - 60, size=9, fill='gray'),
@@ -225,6 +479,86 @@ controlsGroup = Group(
     Label('Arrows: Push Ball', 65, CANVAS_HEIGHT - 36, size=9, fill='gray')
 )
 
+# =============================================================================
+# FRAME BUDGET GOVERNOR
+# =============================================================================
+# With --governor, every step is timed. When steps take too long for the
+# frame rate, the governor turns optional work off, one piece at a time in
+# this order, and turns it back on when there is time to spare (see
+# governor.py). The quality level is shown in the corner, and each change is
+# printed.
+governor = None
+if options.governor:
+    from governor import FrameGovernor, QualityStep
+
+    def limitBodies(share):
+        """Simulates and shows only `share` of the balls."""
+        if swarm is not None:
+            active = int((~swarm.parked).sum())
+            count = max(int(swarm.count * share), 1)
+            swarm.setActiveCount(count)
+            for circle in swarmCircles[count:active]:
+                circle.visible = False
+            for circle in swarmCircles[active:count]:
+                circle.visible = True
+        else:
+            app.spawnLimit = max(int(options.spawn * share), 1)
+            limitSpawnedBalls(app.spawnLimit)
+
+    def hideControls():
+        controlsGroup.visible = False
+
+    def showControls():
+        controlsGroup.visible = True
+
+    qualitySteps = []
+    if swarm is None:
+        qualitySteps.append(QualityStep(
+            'shadow scaling',
+            lambda: setattr(app, 'scaleShadows', False),
+            lambda: setattr(app, 'scaleShadows', True)))
+    qualitySteps.append(QualityStep('controls panel', hideControls, showControls))
+    if trailCircles:
+        qualitySteps.append(QualityStep('trail', lambda: showTrail(False),
+                                        lambda: showTrail(True)))
+    if swarm is not None or spawnPool is not None:
+        qualitySteps.append(QualityStep('half the balls',
+                                        lambda: limitBodies(1 / 2),
+                                        lambda: limitBodies(1)))
+        qualitySteps.append(QualityStep('a quarter of the balls',
+                                        lambda: limitBodies(1 / 4),
+                                        lambda: limitBodies(1 / 2)))
+
+    governor = FrameGovernor(qualitySteps, app.stepsPerSecond)
+    app.qualityLevel = 0
+    app.lastStepStart = None
+    qualityLabel = Label('quality: full', 10, 45, size=10, fill='gray',
+                         align='left')
+
+    governed_onStep = onStep
+
+    def onStep():
+        """
+        Extended onStep that times the step (and the time since the last
+        one) and lets the governor lower or restore the quality.
+        """
+        start = time.perf_counter()
+        governed_onStep()
+        stepMs = (time.perf_counter() - start) * 1000
+        frameMs = None
+        if app.lastStepStart is not None:
+            frameMs = (start - app.lastStepStart) * 1000
+        app.lastStepStart = start
+
+        decision = governor.record(stepMs, frameMs)
+        if decision is not None:
+            app.qualityLevel = governor.level
+            qualityLabel.value = (f'quality: {governor.level} of '
+                                  f'{len(qualitySteps)} lowered '
+                                  f'(last: {governor.levelName})'
+                                  if governor.level else 'quality: full')
+            print(governor.describe(decision))
+
 # =============================================================================
 # START THE APPLICATION
 # =============================================================================
@@ -0,0 +1,447 @@
+"""
+CMU Graphics - Bouncing Ball Project: Physics
+=============================================
+The bouncing ball physics on its own, without any graphics.
+
+main.py keeps the ball's position and velocity in a BallState object and
+calls step(state) from onStep, then moves the Circle to match. Because this
+module never imports cmu_graphics, the simulation can also be stepped,
+tested and profiled without opening a window:
+
+    from physics import BallState, step
+    state = BallState()
+    for i in range(1000):
+        step(state)
+    print(state.y, state.atRest)
+
+Prerequisites:
+- Python 3.6+
+
+Time or profile the physics from the command line:
+    python physics.py --steps 1000000
+    python physics.py --steps 200000 --profile
+    python physics.py --steps 200000 --continuous
+"""
+
+import argparse
+import math
+import time
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+# These match the constants at the top of main.py.
+CANVAS_WIDTH = 400
+CANVAS_HEIGHT = 400
+FLOOR_Y = CANVAS_HEIGHT - 5     # Top of the ground line
+
+BALL_RADIUS = 20
+
+GRAVITY = 0.5           # Acceleration due to gravity (pixels per step^2)
+BOUNCE_FACTOR = 0.8     # Energy retained after bounce (0.0 to 1.0)
+FRICTION = 0.99         # Horizontal friction factor
+MIN_VELOCITY = 0.5      # Minimum velocity threshold (stops tiny bounces)
+
+# Continuous collision mode: the most bounces worked out in a single step.
+# A ball wedged in a corner at high speed could otherwise bounce back and
+# forth forever within one step.
+MAX_BOUNCES_PER_STEP = 16
+
+# Where a ball starts (and goes back to when R is pressed)
+START_X = CANVAS_WIDTH // 2
+START_Y = BALL_RADIUS + 10
+START_VELOCITY_X = 3
+
+
+class World:
+    """
+    The size of the box the ball bounces in and the physics constants.
+    main.py builds one from its own constants, so changing GRAVITY (or any
+    other constant) at the top of main.py changes the simulation.
+    """
+
+    def __init__(self, width=CANVAS_WIDTH, height=CANVAS_HEIGHT,
+                 floorY=FLOOR_Y, gravity=GRAVITY, bounceFactor=BOUNCE_FACTOR,
+                 friction=FRICTION, minVelocity=MIN_VELOCITY):
+        self.width = width
+        self.height = height
+        self.floorY = floorY
+        self.gravity = gravity
+        self.bounceFactor = bounceFactor
+        self.friction = friction
+        self.minVelocity = minVelocity
+
+
+DEFAULT_WORLD = World()
+
+
+class BallState:
+    """
+    Everything that changes while the ball bounces: where it is (x, y), how
+    fast it is moving (velocityX, velocityY) and whether it has stopped
+    (atRest). This replaces the app.velocityX, app.velocityY and app.atRest
+    variables, and the ball Circle's centerX/centerY, of the original demo.
+
+    __slots__ gives a BallState fixed fields instead of a dictionary of
+    attributes: it takes less memory, and a misspelled field
+    (state.velocityx = 3) is an error instead of a new attribute. It isn't
+    faster: bench_bodies.py times the same class without __slots__, and
+    stepping either takes the same time.
+    """
+
+    __slots__ = ('x', 'y', 'radius', 'velocityX', 'velocityY', 'atRest',
+                 'world')
+
+    def __init__(self, x=START_X, y=START_Y, radius=BALL_RADIUS,
+                 velocityX=START_VELOCITY_X, velocityY=0, world=DEFAULT_WORLD):
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.velocityX = velocityX
+        self.velocityY = velocityY
+        self.atRest = False
+        self.world = world
+
+    def __repr__(self):
+        return (f'BallState(x={self.x:.2f}, y={self.y:.2f}, '
+                f'velocityX={self.velocityX:.2f}, '
+                f'velocityY={self.velocityY:.2f}, atRest={self.atRest})')
+
+
+# =============================================================================
+# PHYSICS
+# =============================================================================
+
+def step(state, dt=1):
+    """
+    Advances the ball by one step (one call of onStep, ~1/30 of a second):
+    applies gravity and friction, moves the ball, and bounces it off the
+    floor, ceiling and walls.
+
+    dt is the length of the step in onStep steps. The physics thread in
+    fixed_rate.py takes smaller steps (dt=1/8 for 240 steps per second);
+    velocities stay in pixels per onStep step either way.
+    """
+    # Skip physics if ball is at rest
+    if state.atRest:
+        return
+
+    world = state.world
+    radius = state.radius
+
+    # Gravity increases downward velocity each step; friction slows the
+    # horizontal movement. Then the ball moves by its velocity.
+    if dt == 1:
+        state.velocityY += world.gravity
+        state.velocityX *= world.friction
+        state.x += state.velocityX
+        state.y += state.velocityY
+    else:
+        state.velocityY += world.gravity * dt
+        state.velocityX *= world.friction ** dt
+        state.x += state.velocityX * dt
+        state.y += state.velocityY * dt
+
+    # Floor collision
+    if state.y + radius >= world.floorY:
+        # Place ball exactly at floor level
+        state.y = world.floorY - radius
+
+        # Reverse and reduce vertical velocity (bounce)
+        state.velocityY = -state.velocityY * world.bounceFactor
+
+        # Check if ball should stop bouncing
+        if abs(state.velocityY) < world.minVelocity:
+            state.velocityY = 0
+            # Check if horizontal movement should also stop
+            if abs(state.velocityX) < world.minVelocity:
+                state.velocityX = 0
+                state.atRest = True
+
+    # Ceiling collision
+    if state.y - radius <= 0:
+        state.y = radius
+        state.velocityY = -state.velocityY * world.bounceFactor
+
+    # Left wall collision
+    if state.x - radius <= 0:
+        state.x = radius
+        state.velocityX = -state.velocityX * world.bounceFactor
+
+    # Right wall collision
+    if state.x + radius >= world.width:
+        state.x = world.width - radius
+        state.velocityX = -state.velocityX * world.bounceFactor
+
+
+def run(state, steps):
+    """
+    Runs `steps` steps, exactly like calling step(state) that many times,
+    but several times faster: the loop keeps the ball's numbers in local
+    variables and only writes them back to `state` at the end. Use this for
+    long headless runs. Returns the number of steps actually simulated
+    (fewer than `steps` if the ball came to rest).
+    """
+    world = state.world
+    x, y = state.x, state.y
+    velocityX, velocityY = state.velocityX, state.velocityY
+    radius = state.radius
+    gravity, friction = world.gravity, world.friction
+    bounce, minVelocity = world.bounceFactor, world.minVelocity
+    floor = world.floorY - radius
+    right = world.width - radius
+
+    simulated = 0
+    while simulated < steps and not state.atRest:
+        simulated += 1
+        velocityY += gravity
+        velocityX *= friction
+        x += velocityX
+        y += velocityY
+        if y >= floor:
+            y = floor
+            velocityY = -velocityY * bounce
+            if -minVelocity < velocityY < minVelocity:
+                velocityY = 0
+                if -minVelocity < velocityX < minVelocity:
+                    velocityX = 0
+                    state.atRest = True
+        if y <= radius:
+            y = radius
+            velocityY = -velocityY * bounce
+        if x <= radius:
+            x = radius
+            velocityX = -velocityX * bounce
+        if x >= right:
+            x = right
+            velocityX = -velocityX * bounce
+
+    state.x, state.y = x, y
+    state.velocityX, state.velocityY = velocityX, velocityY
+    return simulated
+
+
+# =============================================================================
+# CONTINUOUS COLLISIONS
+# =============================================================================
+# step() moves the ball by its whole velocity and only then checks whether
+# it went past the floor, ceiling or a wall. At high speed (say, after a few
+# presses of the up arrow) the ball can travel far past a wall within one
+# step, and the bounce happens in the wrong place and at the wrong time.
+#
+# stepContinuous() instead works out the exact moment within the step when
+# the ball touches each surface, moves the ball to that moment, bounces it,
+# and carries on with the rest of the step. Under gravity the ball follows a
+# parabola, y(t) = y + velocityY*t + gravity*t^2/2, so the time it touches
+# the floor or ceiling is the solution of a quadratic equation. Several
+# bounces can happen in one step.
+
+def timeToFloor(distance, velocityY, gravity):
+    """
+    How long until a ball `distance` pixels above the floor, moving down at
+    velocityY (negative = moving up) and pulled down by gravity, touches
+    the floor. Solves gravity/2 * t^2 + velocityY * t = distance.
+    Returns math.inf if it never does, and 0 if the ball is already on or
+    past the floor and not leaving it.
+    """
+    if gravity == 0:
+        if velocityY <= 0:
+            return math.inf
+        return max(distance, 0) / velocityY
+    discriminant = velocityY * velocityY + 2 * gravity * distance
+    if discriminant < 0:
+        # Only possible below the floor (distance < 0)
+        return 0
+    root = math.sqrt(discriminant)
+    if velocityY + root > 1e-12:
+        # The same root as (root - velocityY) / gravity, written so that it
+        # stays accurate when distance is tiny
+        return 2 * distance / (velocityY + root)
+    return (root - velocityY) / gravity
+
+
+def timeToCeiling(distance, velocityY, gravity):
+    """
+    How long until a ball `distance` pixels below the ceiling, moving at
+    velocityY, touches the ceiling. Returns math.inf if gravity pulls it
+    back down first (or it is moving down).
+    """
+    if velocityY >= 0:
+        return math.inf
+    if distance <= 0:
+        return 0
+    discriminant = velocityY * velocityY - 2 * gravity * distance
+    if discriminant < 0:
+        return math.inf
+    return 2 * distance / (-velocityY + math.sqrt(discriminant))
+
+
+def stepContinuous(state):
+    """
+    Advances the ball by one step like step(), but finds the exact time of
+    every bounce within the step instead of checking for collisions only at
+    the end. Returns the number of bounces in this step.
+    """
+    if state.atRest:
+        return 0
+
+    world = state.world
+    radius = state.radius
+    gravity = world.gravity
+    floor = world.floorY - radius
+    right = world.width - radius
+
+    state.velocityX *= world.friction
+    # A ball can start the step outside the box (moveTo puts it exactly
+    # where the mouse was), so put it back inside first, as step() does.
+    # Then no time of impact below is ever negative: a ball on a wall and
+    # moving into it bounces at once.
+    x = min(max(state.x, radius), right)
+    y = min(max(state.y, radius), floor)
+    velocityX, velocityY = state.velocityX, state.velocityY
+
+    # A ball that has stopped bouncing slides along the floor: gravity is
+    # held up by the floor for the rest of the step.
+    onFloor = y >= floor and velocityY == 0
+
+    # The floor branch below never runs for a sliding ball, so it stops
+    # here once it is slow enough, as in step()
+    if onFloor and abs(velocityX) < world.minVelocity:
+        state.velocityX = 0
+        state.atRest = True
+        return 0
+
+    remaining = 1.0
+    bounces = 0
+    while remaining > 0:
+        fall = 0 if onFloor else gravity
+
+        # When does the ball reach each surface?
+        tFloor = math.inf if onFloor else timeToFloor(floor - y, velocityY, fall)
+        tCeiling = timeToCeiling(y - radius, velocityY, fall)
+        tLeft = (x - radius) / -velocityX if velocityX < 0 else math.inf
+        tRight = (right - x) / velocityX if velocityX > 0 else math.inf
+        t = min(tFloor, tCeiling, tLeft, tRight)
+
+        if t >= remaining or bounces == MAX_BOUNCES_PER_STEP:
+            t = remaining
+
+        # Move to the moment of impact (or the end of the step)
+        x += velocityX * t
+        y += velocityY * t + fall * t * t / 2
+        velocityY += fall * t
+        remaining -= t
+        if remaining <= 0:
+            break
+        bounces += 1
+
+        if t == tFloor:
+            y = floor
+            velocityY = -velocityY * world.bounceFactor
+            if abs(velocityY) < world.minVelocity:
+                velocityY = 0
+                onFloor = True
+                if abs(velocityX) < world.minVelocity:
+                    velocityX = 0
+                    state.atRest = True
+                    break
+        elif t == tCeiling:
+            y = radius
+            velocityY = -velocityY * world.bounceFactor
+        elif t == tLeft:
+            x = radius
+            velocityX = -velocityX * world.bounceFactor
+        else:
+            x = right
+            velocityX = -velocityX * world.bounceFactor
+
+    # Never leave the ball outside the box, even if it ran out of bounces
+    state.x = min(max(x, radius), right)
+    state.y = min(max(y, radius), floor)
+    state.velocityX, state.velocityY = velocityX, velocityY
+    return bounces
+
+
+# =============================================================================
+# CONTROLS
+# =============================================================================
+# What the mouse and keyboard do to the ball. main.py calls these from
+# onMousePress and onKeyPress.
+
+def moveTo(state, x, y):
+    """Puts the ball at (x, y) with a velocity based on the click position."""
+    state.x = x
+    state.y = y
+    state.velocityX = (x - state.world.width // 2) / 30
+    state.velocityY = 0  # Start falling from rest
+    state.atRest = False
+
+
+def reset(state):
+    """Puts the ball back at its starting position."""
+    state.x = state.world.width // 2
+    state.y = state.radius + 10
+    state.velocityX = START_VELOCITY_X
+    state.velocityY = 0
+    state.atRest = False
+
+
+def push(state, dvx, dvy):
+    """Adds (dvx, dvy) to the ball's velocity and wakes it up."""
+    state.velocityX += dvx
+    state.velocityY += dvy
+    state.atRest = False
+
+
+# =============================================================================
+# TIMING AND PROFILING
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the ball physics headlessly')
+    parser.add_argument('--steps', type=int, default=1000000)
+    parser.add_argument('--profile', action='store_true',
+                        help='profile step() with cProfile')
+    parser.add_argument('--continuous', action='store_true',
+                        help='time stepContinuous() instead of step()')
+    args = parser.parse_args()
+    stepFn = stepContinuous if args.continuous else step
+
+    # The ball comes to rest after a few hundred steps, so keep kicking it
+    # back up to keep the physics busy.
+    def kickIfResting(state):
+        if state.atRest:
+            push(state, 5, -10)
+
+    state = BallState()
+    start = time.perf_counter()
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for i in range(args.steps):
+            stepFn(state)
+            kickIfResting(state)
+        profiler.disable()
+        profiler.print_stats('cumulative')
+    else:
+        for i in range(args.steps):
+            stepFn(state)
+            kickIfResting(state)
+    stepSeconds = time.perf_counter() - start
+
+    state = BallState()
+    start = time.perf_counter()
+    remaining = args.steps
+    while remaining > 0:
+        remaining -= run(state, remaining)
+        kickIfResting(state)
+    runSeconds = time.perf_counter() - start
+
+    print(f'{stepFn.__name__}(): {args.steps / stepSeconds:12,.0f} steps per second')
+    print(f'run():  {args.steps / runSeconds:12,.0f} steps per second')
+    print(f'Final state: {state}')
+
+
+if __name__ == '__main__':
+    main()
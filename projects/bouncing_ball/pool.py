@@ -0,0 +1,92 @@
+"""
+CMU Graphics - Bouncing Ball Project: Shape Pool
+================================================
+Keeps a fixed number of shapes ready to be shown, so a demo that keeps
+adding and removing things (a new ball on every click) reuses the same
+shapes instead of creating new ones.
+
+Creating a shape in cmu_graphics adds it to the canvas, and removing one
+leaves it for Python's garbage collector. A demo that creates a ball per
+click and removes it later grows the scene without limit if the user keeps
+clicking, and pauses now and then to clean up. ShapePool instead creates
+all the shapes once, up front, hidden:
+
+    pool = ShapePool(lambda: (Oval(0, 0, 30, 8, fill='gray'),
+                              Circle(0, 0, 10, fill='red')), capacity=32)
+    slot = pool.acquire()           # shows a hidden pair of shapes
+    shadow, circle = pool.items[slot]
+    ...
+    pool.release(slot)              # hides them again for later
+
+Each item in the pool is whatever create() returns: one shape or a tuple
+of shapes that are shown and hidden together. acquire() returns the item's
+slot number (0 to capacity - 1), so the caller can keep its own data for
+the item in a list of the same size. When every item is in use, acquire()
+takes back the one that was acquired longest ago.
+
+Prerequisites:
+- Python 3.6+
+"""
+
+import collections
+
+
+class ShapePool:
+    """
+    `capacity` items made by create(), all hidden to begin with. `items`
+    holds them by slot; iterating over the pool gives the slots in use,
+    oldest first. `acquired` and `recycled` count the calls to acquire()
+    and the ones that had to take back an item still in use.
+    """
+
+    def __init__(self, create, capacity):
+        if capacity < 1:
+            raise ValueError('a pool needs a capacity of at least 1')
+        self.capacity = capacity
+        self.items = []
+        for i in range(capacity):
+            item = create()
+            self.items.append(item if isinstance(item, tuple) else (item,))
+            self.hide(i)
+        # Free slots are taken from the end; slots in use, oldest first
+        self.free = list(range(capacity - 1, -1, -1))
+        self.inUse = collections.OrderedDict()
+        self.acquired = 0
+        self.recycled = 0
+
+    def hide(self, slot):
+        for shape in self.items[slot]:
+            shape.visible = False
+
+    def acquire(self):
+        """
+        Shows a hidden item and returns its slot. If none are hidden, the
+        oldest item in use is returned instead (it stays visible).
+        """
+        self.acquired += 1
+        if self.free:
+            slot = self.free.pop()
+            for shape in self.items[slot]:
+                shape.visible = True
+        else:
+            slot, unused = self.inUse.popitem(last=False)
+            self.recycled += 1
+        self.inUse[slot] = None
+        return slot
+
+    def release(self, slot):
+        """Hides the item in `slot` and makes it available again."""
+        del self.inUse[slot]
+        self.hide(slot)
+        self.free.append(slot)
+
+    def releaseAll(self):
+        for slot in list(self.inUse):
+            self.release(slot)
+
+    def __iter__(self):
+        # A copy, so slots can be released while looping
+        return iter(list(self.inUse))
+
+    def __len__(self):
+        return len(self.inUse)
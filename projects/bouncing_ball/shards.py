@@ -0,0 +1,322 @@
+"""
+CMU Graphics - Bouncing Ball Project: Sharded Swarm
+===================================================
+Splits the swarm's physics between worker processes, one per region of the
+canvas, so very large swarms can use more than one CPU core.
+
+Python runs one thread of Python code at a time, so a single process can't
+step the swarm on more than one core. ShardedSwarm starts one worker
+process per region: the canvas is cut into vertical strips, and each worker
+steps the balls in its strip. The balls' state lives in one block of shared
+memory (multiprocessing.shared_memory) that every process sees, so nothing
+is copied through pipes on each step:
+
+    x, y, vx, vy, radius - the same arrays as BallSwarm
+    owner                - the region whose worker steps each ball, or
+                           PARKED for a ball left out (see setActiveCount)
+
+One step goes like this:
+
+1. The main process (the one drawing) lets the workers go.
+2. Each worker moves the balls it owns (gravity, friction, bounces).
+3. With collide=True, each worker copies the balls of other regions that
+   are close to its strip ("ghosts"), waits until every worker has, then
+   solves the collisions of its own balls, with the ghosts held in place.
+   Two balls touching across a border are each pushed by their own worker.
+4. Once every worker has found its balls (and ghosts), a ball that has
+   left the strip is handed off: its worker sets its owner to the region
+   it is in now, and that region's worker steps it from the next step on.
+5. Once every worker is done, the main process reads x and y to move the
+   Circles. It only writes to the arrays between steps (click, R, arrows).
+
+ShardedSwarm has the same methods as BallSwarm, so main.py uses it in
+place of one (python main.py --balls 100000 --shards 4). Balls don't fall
+asleep in a sharded swarm: every ball that isn't parked is stepped.
+
+This module doesn't import cmu_graphics. Time it against BallSwarm with
+bench_shards.py.
+
+Prerequisites:
+- Python 3.8+ (for multiprocessing.shared_memory)
+- numpy installed (pip install numpy)
+"""
+
+import atexit
+import contextlib
+import multiprocessing
+import sys
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from collisions import SpatialHash, applyImpulses, overlapping, separate
+from physics import DEFAULT_WORLD
+from swarm import SEPARATION_PASSES, BallSwarm, moveBalls
+
+# The float arrays in the shared block, in order; then owner and a stop flag
+FIELDS = ['x', 'y', 'vx', 'vy', 'radius']
+
+# The owner of a parked ball
+PARKED = -1
+
+# Seconds a process waits for the others at a barrier before giving up
+# (a worker that crashed or was killed never gets there)
+BARRIER_TIMEOUT = 10
+
+# Seconds to wait for the workers to start (each one is a new Python that
+# imports NumPy)
+STARTUP_TIMEOUT = 60
+
+
+class SharedState:
+    """
+    The arrays for `count` balls in one block of shared memory. With a name,
+    attaches to the block another process created.
+    """
+
+    def __init__(self, count, name=None):
+        size = count * (8 * len(FIELDS) + 4) + 4
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        buffer = self.memory.buf
+        offset = 0
+        for field in FIELDS:
+            setattr(self, field, np.ndarray(count, np.float64, buffer, offset))
+            offset += 8 * count
+        self.owner = np.ndarray(count, np.int32, buffer, offset)
+        offset += 4 * count
+        self.stop = np.ndarray(1, np.int32, buffer, offset)
+
+    def close(self):
+        # The arrays point into the block, so they must go before it closes
+        for field in FIELDS + ['owner', 'stop']:
+            setattr(self, field, None)
+        self.memory.close()
+
+
+def regionOf(x, regions, width):
+    """The region (vertical strip) each x in `x` is in."""
+    return np.clip((x * (regions / width)).astype(np.int32), 0, regions - 1)
+
+
+# =============================================================================
+# WORKERS
+# =============================================================================
+
+def runWorker(name, count, region, regions, world, collide, maxRadius,
+              start, middle, done):
+    """One worker process: steps the balls of `region` until told to stop."""
+    state = SharedState(count, name)
+    try:
+        worker = RegionWorker(state, region, regions, world, collide, maxRadius)
+        done.wait(STARTUP_TIMEOUT)
+        while True:
+            start.wait(BARRIER_TIMEOUT)
+            if state.stop[0]:
+                break
+            worker.step(middle)
+            done.wait(BARRIER_TIMEOUT)
+    except threading.BrokenBarrierError:
+        pass
+    except BaseException:
+        # Wake the other processes instead of leaving them waiting
+        for barrier in (start, middle, done):
+            barrier.abort()
+        raise
+    finally:
+        state.close()
+
+
+class RegionWorker:
+    """The physics for the balls in one vertical strip of the canvas."""
+
+    def __init__(self, state, region, regions, world, collide, maxRadius):
+        self.state = state
+        self.region = region
+        self.regions = regions
+        self.world = world
+        self.left = world.width * region / regions
+        self.right = world.width * (region + 1) / regions
+        # Balls of other regions this close to the strip can touch its balls
+        self.margin = 2 * maxRadius
+        self.grid = None
+        if collide:
+            self.grid = SpatialHash(cellSize=2 * maxRadius, width=world.width,
+                                    height=world.height)
+
+    def step(self, middle):
+        state = self.state
+        mine = np.flatnonzero(state.owner == self.region)
+        x, y = state.x[mine], state.y[mine]
+        vx, vy = state.vx[mine], state.vy[mine]
+        r = state.radius[mine]
+        moveBalls(x, y, vx, vy, r, self.world)
+        state.x[mine], state.y[mine] = x, y
+        state.vx[mine], state.vy[mine] = vx, vy
+
+        if self.grid is not None:
+            # Every worker has moved its balls before any ghosts are copied,
+            # and copied its ghosts before any balls are pushed apart
+            middle.wait(BARRIER_TIMEOUT)
+            ghosts = self.ghosts()
+            ghostState = (state.x[ghosts], state.y[ghosts],
+                          state.vx[ghosts], state.vy[ghosts])
+            middle.wait(BARRIER_TIMEOUT)
+            self.collide(mine, ghosts, *ghostState)
+
+        # Hand off the balls that have left the strip, once every worker has
+        # found its own balls for this step (and its ghosts): a ball handed
+        # off earlier could be stepped twice, or not at all
+        middle.wait(BARRIER_TIMEOUT)
+        now = regionOf(state.x[mine], self.regions, self.world.width)
+        left = now != self.region
+        state.owner[mine[left]] = now[left]
+
+    def ghosts(self):
+        """Other regions' balls close enough to touch this strip's balls."""
+        state = self.state
+        owner = state.owner
+        x = state.x
+        near = ((x > self.left - self.margin) & (x < self.right + self.margin)
+                & (owner != self.region) & (owner != PARKED))
+        return np.flatnonzero(near)
+
+    def collide(self, mine, ghosts, ghostX, ghostY, ghostVX, ghostVY):
+        """
+        Bounces and separates this strip's balls, like BallSwarm.collide
+        does for awake balls, with the ghosts in the place of sleeping
+        balls: they take part but don't move. The ghosts' positions and
+        velocities are copies taken before any worker started changing
+        its own balls.
+        """
+        state = self.state
+        world = self.world
+        moving = len(mine)
+        x = np.concatenate([state.x[mine], ghostX])
+        y = np.concatenate([state.y[mine], ghostY])
+        vx = np.concatenate([state.vx[mine], ghostVX])
+        vy = np.concatenate([state.vy[mine], ghostVY])
+        r = np.concatenate([state.radius[mine], state.radius[ghosts]])
+
+        self.grid.build(x, y)
+        nearI, nearJ = self.grid.candidatePairs()
+        # Pairs of two ghosts are their own workers' business
+        keep = (nearI < moving) | (nearJ < moving)
+        nearI, nearJ = nearI[keep], nearJ[keep]
+        i, j = overlapping(x, y, r, nearI, nearJ)
+        applyImpulses(x, y, vx, vy, r, i, j, world.bounceFactor)
+
+        startX = x[:moving].copy()
+        startY = y[:moving].copy()
+        for n in range(SEPARATION_PASSES):
+            separate(x, y, r, nearI, nearJ)
+            x[moving:] = ghostX
+            y[moving:] = ghostY
+            np.clip(x, r, world.width - r, out=x)
+            np.clip(y, r, world.floorY - r, out=y)
+
+        state.x[mine], state.y[mine] = x[:moving], y[:moving]
+        state.vx[mine] = vx[:moving] + x[:moving] - startX
+        state.vy[mine] = vy[:moving] + y[:moving] - startY
+
+
+# =============================================================================
+# THE MAIN PROCESS'S SIDE
+# =============================================================================
+
+@contextlib.contextmanager
+def mainModuleHidden():
+    """
+    New processes are started with "spawn" (a fresh Python, which is safe
+    next to a window, unlike a fork of the process that has one). A spawned
+    process runs the main script again first, unless it can't find it; the
+    demo's main script would open a second window, so it is hidden while
+    the workers start.
+    """
+    main = sys.modules['__main__']
+    saved = {name: getattr(main, name)
+             for name in ('__file__', '__spec__') if hasattr(main, name)}
+    main.__spec__ = None
+    main.__dict__.pop('__file__', None)
+    try:
+        yield
+    finally:
+        main.__dict__.update(saved)
+
+
+class ShardedSwarm(BallSwarm):
+    """
+    A BallSwarm whose balls are stepped by `regions` worker processes, one
+    per vertical strip of the canvas, through shared memory. Call close()
+    when done (it is also called at exit).
+    """
+
+    def __init__(self, count, regions=2, radius=4, maxRadius=None, seed=None,
+                 world=DEFAULT_WORLD, collide=False):
+        self.shared = None
+        self.regions = regions
+        # The swarm's own arrays are set up (and the balls placed) as usual,
+        # then moved into shared memory
+        super().__init__(count, radius, maxRadius, seed, world)
+        self.shared = SharedState(count)
+        for field in FIELDS:
+            array = getattr(self.shared, field)
+            array[:] = getattr(self, field)
+            setattr(self, field, array)
+        self.shared.stop[0] = 0
+        self.sleepersChanged()
+
+        context = multiprocessing.get_context('spawn')
+        self.start = context.Barrier(regions + 1)
+        self.done = context.Barrier(regions + 1)
+        self.middle = context.Barrier(regions)
+        maxRadius = float(self.radius.max())
+        self.workers = [
+            context.Process(target=runWorker, daemon=True,
+                            args=(self.shared.name, count, region, regions,
+                                  world, collide, maxRadius, self.start,
+                                  self.middle, self.done))
+            for region in range(regions)]
+        with mainModuleHidden():
+            for worker in self.workers:
+                worker.start()
+        atexit.register(self.close)
+        # Wait until every worker is ready for the first step
+        self.done.wait(STARTUP_TIMEOUT)
+
+    def sleepersChanged(self):
+        # Nothing sleeps here: every ball that isn't parked is stepped. This
+        # is also where balls moved by the main process get their owners.
+        self.awake = self.moved = np.flatnonzero(~self.parked)
+        self.sleeping = self.awake[:0]
+        if self.shared is not None:
+            owner = regionOf(self.x, self.regions, self.world.width)
+            owner[self.parked] = PARKED
+            self.shared.owner[:] = owner
+
+    def step(self):
+        """Lets every worker step its region, and waits until they're done."""
+        self.start.wait(BARRIER_TIMEOUT)
+        self.done.wait(BARRIER_TIMEOUT)
+
+    def close(self):
+        """Stops the workers and frees the shared memory."""
+        if self.shared is None:
+            return
+        self.shared.stop[0] = 1
+        try:
+            self.start.wait(BARRIER_TIMEOUT)
+        except threading.BrokenBarrierError:
+            pass
+        for worker in self.workers:
+            worker.join(BARRIER_TIMEOUT)
+        # Keep plain copies, so the swarm can still be looked at
+        for field in FIELDS:
+            setattr(self, field, getattr(self, field).copy())
+        self.shared.close()
+        self.shared.memory.unlink()
+        self.shared = None
@@ -0,0 +1,399 @@
+"""
+CMU Graphics - Bouncing Ball Project: Ball Swarm
+================================================
+A vectorized version of the bouncing ball physics that can move thousands
+of balls at once.
+
+In main.py a single ball keeps its position and velocity in a
+physics.BallState (x, y, velocityX, velocityY), and physics.step() moves
+it. Here every ball's position, velocity and radius is stored in a NumPy
+array instead, and each step applies gravity,
+friction and the floor/ceiling/wall bounces to ALL balls with a handful of
+array operations. There is no Python loop over the balls.
+
+With collide=True the balls also bounce off each other, using the spatial
+hash broad phase and impulse narrow phase from collisions.py.
+
+Each ball can fall asleep on its own. A sleeping ball is skipped by the
+physics entirely (no gravity, no moving, no collision checks of its own),
+so a settled pile costs almost nothing per step. Touching balls fall
+asleep together as an "island" once all of them have been still for a
+while, and wake up together when one of them is hit, pushed or reset.
+
+The physics constants come from a physics.World, just like the single
+ball's. This module does not import cmu_graphics, so the swarm can be
+stepped and timed without opening a window (see bench_swarm.py).
+
+Prerequisites:
+- Python 3.6+
+- numpy installed (pip install numpy)
+"""
+
+import numpy as np
+
+from collisions import SpatialHash, applyImpulses, overlapping, separate
+from physics import DEFAULT_WORLD
+
+# How many times per step overlapping balls are pushed apart. One push per
+# step is not enough for a pile, where pushing one ball out of its neighbor
+# pushes it into the next one.
+SEPARATION_PASSES = 8
+
+# Sleeping (with collide=True): a ball that moves less than SLEEP_SPEED
+# pixels per step for SLEEP_STEPS steps in a row is ready to sleep, and falls asleep
+# once every ball touching it is ready too. A sleeping ball hit by a ball
+# faster than WAKE_SPEED wakes up; slower balls just rest on it.
+SLEEP_SPEED = 0.3
+SLEEP_STEPS = 15
+WAKE_SPEED = 1.0
+
+
+class BallSwarm:
+    """
+    The state of many balls, stored as parallel NumPy arrays:
+
+      x, y      - ball centers
+      vx, vy    - velocities (pixels per step)
+      radius    - ball radii
+      atRest    - True for sleeping balls (ones that have stopped moving)
+      island    - which group of touching balls a sleeping ball fell asleep
+                  with; the whole island wakes up together
+      parked    - True for balls left out of the simulation for now
+                  (see setActiveCount); they are kept asleep
+
+    Ball i is described by x[i], y[i], vx[i], vy[i], radius[i] and atRest[i].
+    After step(), `moved` holds the indices of the balls that may have
+    moved, so only their shapes need updating.
+    """
+
+    def __init__(self, count, radius=4, maxRadius=None, seed=None,
+                 world=DEFAULT_WORLD, collide=False):
+        """
+        Creates `count` balls scattered across the top half of the canvas.
+        If maxRadius is given, each ball gets a random radius between
+        radius and maxRadius; otherwise every ball has the same radius.
+        With collide=True, balls also bounce off each other.
+        """
+        self.count = count
+        self.world = world
+        self.random = np.random.default_rng(seed)
+
+        if maxRadius is None:
+            self.radius = np.full(count, float(radius))
+        else:
+            self.radius = self.random.uniform(radius, maxRadius, count)
+
+        self.x = np.zeros(count)
+        self.y = np.zeros(count)
+        self.vx = np.zeros(count)
+        self.vy = np.zeros(count)
+        self.atRest = np.zeros(count, dtype=bool)
+        self.parked = np.zeros(count, dtype=bool)
+        self.island = np.zeros(count, dtype=np.int64)
+        self.stillSteps = np.zeros(count, dtype=np.int64)
+        self.nextIsland = 0
+
+        # The grid cells must be at least as wide as the biggest ball, so
+        # two touching balls are always in the same or neighboring cells.
+        self.grid = None
+        self.sleepGrid = None
+        self.contacts = 0
+        if collide:
+            self.grid = SpatialHash(cellSize=2 * self.radius.max(),
+                                    width=world.width, height=world.height)
+            self.sleepGrid = SpatialHash(cellSize=self.grid.cellSize,
+                                         width=world.width, height=world.height)
+        self.reset()
+
+    # -------------------------------------------------------------------------
+    # Setting up and pushing the balls
+    # -------------------------------------------------------------------------
+    def reset(self):
+        """
+        Scatters the balls across the top half of the canvas with random
+        horizontal velocities (like pressing R in the single ball demo).
+        """
+        r = self.radius
+        self.x[:] = self.random.uniform(r, self.world.width - r)
+        self.y[:] = self.random.uniform(r, self.world.height / 2)
+        self.vx[:] = self.random.uniform(-5, 5, self.count)
+        self.vy[:] = 0
+        self.wakeAll()
+
+    def moveTo(self, x, y, spread=30):
+        """
+        Gathers every ball around (x, y) and gives each a new horizontal
+        velocity, using the same formula as onMousePress in main.py plus a
+        little random spread so the balls don't all overlap.
+        """
+        r = self.radius
+        world = self.world
+        self.x[:] = np.clip(x + self.random.uniform(-spread, spread, self.count),
+                            r, world.width - r)
+        self.y[:] = np.clip(y + self.random.uniform(-spread, spread, self.count),
+                            r, world.floorY - r)
+        self.vx[:] = (self.x - world.width // 2) / 30
+        self.vy[:] = 0
+        self.wakeAll()
+
+    def push(self, dvx, dvy):
+        """Adds (dvx, dvy) to every ball's velocity and wakes them all up."""
+        self.vx[~self.parked] += dvx
+        self.vy[~self.parked] += dvy
+        self.wakeAll()
+
+    # -------------------------------------------------------------------------
+    # Sleeping and waking
+    # -------------------------------------------------------------------------
+    def wakeAll(self):
+        """Wakes every ball (except parked ones)."""
+        self.atRest[:] = self.parked
+        self.stillSteps[:] = 0
+        self.sleepersChanged()
+
+    def wake(self, balls):
+        """Wakes the sleeping balls `balls` and every ball in their islands."""
+        islands = np.unique(self.island[balls])
+        woken = self.atRest & ~self.parked & np.isin(self.island, islands)
+        self.atRest[woken] = False
+        self.stillSteps[woken] = 0
+        self.sleepersChanged()
+
+    def sleep(self, balls):
+        """Puts the balls `balls` to sleep, stopping them where they are."""
+        self.atRest[balls] = True
+        self.vx[balls] = 0
+        self.vy[balls] = 0
+        self.stillSteps[balls] = 0
+        self.sleepersChanged()
+
+    def sleepersChanged(self):
+        """
+        Updates the lists of awake and sleeping balls. The sleeping balls'
+        grid is only rebuilt here, not every step: sleeping balls don't move.
+        """
+        self.awake = np.flatnonzero(~self.atRest)
+        self.sleeping = np.flatnonzero(self.atRest & ~self.parked)
+        if self.sleepGrid is not None:
+            self.sleepGrid.build(self.x[self.sleeping], self.y[self.sleeping])
+
+    def setActiveCount(self, count):
+        """
+        Simulates only the first `count` balls. The others are parked: they
+        stop where they are, and are skipped by the physics and collisions
+        until a later call takes them back in (they wake up again).
+        """
+        parked = np.arange(self.count) >= count
+        unparked = self.parked & ~parked
+        self.parked = parked
+        self.atRest[parked] = True
+        self.vx[parked] = 0
+        self.vy[parked] = 0
+        self.atRest[unparked] = False
+        self.stillSteps[unparked] = 0
+        self.sleepersChanged()
+
+    # -------------------------------------------------------------------------
+    # Physics
+    # -------------------------------------------------------------------------
+    def step(self):
+        """
+        Advances every awake ball by one step. This is the same sequence as
+        onStep in main.py (gravity, friction, move, floor, ceiling, walls),
+        written as whole-array operations. Sleeping balls are skipped.
+        """
+        awake = self.awake
+        self.moved = awake
+        if len(awake) == 0:
+            return
+
+        # Work on the awake balls only. When every ball is awake, a slice
+        # gives views of the arrays instead of copies.
+        balls = slice(None) if len(awake) == self.count else awake
+        x, y = self.x[balls], self.y[balls]
+        vx, vy = self.vx[balls], self.vy[balls]
+        r = self.radius[balls]
+        startX, startY = x.copy(), y.copy()
+        stopped = moveBalls(x, y, vx, vy, r, self.world)
+
+        self.x[balls], self.y[balls] = x, y
+        self.vx[balls], self.vy[balls] = vx, vy
+
+        if self.grid is None:
+            # Without collisions a stopped ball touches nothing, so it can
+            # go to sleep right away, as an island of its own
+            if stopped.any():
+                self.sleep(awake[stopped])
+        else:
+            i, j = self.collide(awake)
+            distance = np.hypot(self.x[awake] - startX, self.y[awake] - startY)
+            self.settle(awake, distance, i, j)
+
+    def collide(self, awake):
+        """
+        Ball-to-ball collisions for the awake balls: bounces the balls that
+        overlap, then pushes them apart (keeping them inside the canvas).
+        Returns the overlapping pairs (i, j) of awake balls.
+
+        Sleeping balls that an awake ball touches take part too, but they
+        don't move: they act like part of the floor. A sleeping ball that
+        gets hit harder than WAKE_SPEED wakes up (with its island) for the
+        next step.
+
+        The distance a ball is pushed is also added to its velocity. That is
+        what holds up a pile: a ball sitting on others is pushed up by about
+        as much as gravity pulls it down each step, so it stays put instead
+        of slowly sinking into the balls below.
+        """
+        world = self.world
+
+        # Broad phase: awake balls near each other, then awake balls near
+        # sleeping ones (using the sleeping balls' saved grid)
+        self.grid.build(self.x[awake], self.y[awake])
+        nearI, nearJ = self.grid.candidatePairs()
+        nearI, nearJ = awake[nearI], awake[nearJ]
+        if len(self.sleeping):
+            point, sleeper = self.sleepGrid.nearbyPairs(self.x[awake],
+                                                       self.y[awake])
+            sleepI, sleepJ = overlapping(self.x, self.y, self.radius,
+                                         awake[point], self.sleeping[sleeper])
+        else:
+            sleepI = sleepJ = np.zeros(0, dtype=np.int64)
+        hitSpeed = np.hypot(self.vx[sleepI], self.vy[sleepI])
+
+        # Solve the awake balls plus the sleeping balls they touch, in small
+        # arrays of their own ("local" numbering), so the work depends on
+        # the number of awake balls, not on the total
+        sleepers = np.unique(sleepJ)
+        balls = np.concatenate([awake, sleepers])
+        order = np.argsort(balls)
+
+        def local(ball):
+            return order[np.searchsorted(balls, ball, sorter=order)]
+
+        x, y = self.x[balls], self.y[balls]
+        vx, vy = self.vx[balls], self.vy[balls]
+        r = self.radius[balls]
+        moving = len(awake)
+
+        nearI = np.concatenate([local(nearI), local(sleepI)])
+        nearJ = np.concatenate([local(nearJ), local(sleepJ)])
+        i, j = overlapping(x, y, r, nearI, nearJ)
+        applyImpulses(x, y, vx, vy, r, i, j, world.bounceFactor)
+        self.contacts = len(i)
+
+        startX = x[:moving].copy()
+        startY = y[:moving].copy()
+        for n in range(SEPARATION_PASSES):
+            separate(x, y, r, nearI, nearJ)
+            x[moving:] = self.x[sleepers]
+            y[moving:] = self.y[sleepers]
+            np.clip(x, r, world.width - r, out=x)
+            np.clip(y, r, world.floorY - r, out=y)
+
+        self.x[awake], self.y[awake] = x[:moving], y[:moving]
+        self.vx[awake] = vx[:moving] + x[:moving] - startX
+        self.vy[awake] = vy[:moving] + y[:moving] - startY
+
+        # Wake the sleeping balls that were hit hard
+        hard = hitSpeed > WAKE_SPEED
+        if hard.any():
+            self.wake(sleepJ[hard])
+
+        awakePairs = (i < moving) & (j < moving)
+        return awake[i[awakePairs]], awake[j[awakePairs]]
+
+    def settle(self, awake, distance, i, j):
+        """
+        Puts islands of touching balls to sleep. `distance` is how far each
+        awake ball moved in this step and (i, j) are the pairs of awake
+        balls that touch. A ball that has moved less than SLEEP_SPEED per
+        step for SLEEP_STEPS steps is ready to sleep; an island of touching
+        balls falls asleep when every ball in it is ready.
+
+        (The distance moved is used rather than the velocity: a ball wedged
+        in a pile can keep a small velocity that the other balls cancel out
+        every step, so it never actually goes anywhere.)
+        """
+        still = np.where(distance < SLEEP_SPEED, self.stillSteps[awake] + 1, 0)
+        self.stillSteps[awake] = still
+        ready = still >= SLEEP_STEPS
+        if not ready.any():
+            return
+
+        # A ball touching a ball that isn't ready isn't ready either. Spread
+        # that through the touching pairs until nothing changes.
+        i = np.searchsorted(awake, i)
+        j = np.searchsorted(awake, j)
+        while True:
+            blocked = ready[i] != ready[j]
+            if not blocked.any():
+                break
+            ready[i[blocked]] = False
+            ready[j[blocked]] = False
+        if not ready.any():
+            return
+
+        # Number the islands among the balls falling asleep: every ball
+        # takes the smallest label of the balls it touches, until no label
+        # changes
+        label = np.arange(len(awake))
+        while True:
+            smallest = np.minimum(label[i], label[j])
+            before = label.copy()
+            np.minimum.at(label, i, smallest)
+            np.minimum.at(label, j, smallest)
+            label = label[label]
+            if np.array_equal(label, before):
+                break
+        islands, number = np.unique(label[ready], return_inverse=True)
+        self.island[awake[ready]] = self.nextIsland + number
+        self.nextIsland += len(islands)
+        self.sleep(awake[ready])
+
+    def allAtRest(self):
+        """Returns True once every ball has stopped bouncing."""
+        return bool(self.atRest.all())
+
+
+def moveBalls(x, y, vx, vy, r, world=DEFAULT_WORLD):
+    """
+    One step of gravity, friction, moving and the floor, ceiling and wall
+    bounces for the balls in the arrays x, y, vx, vy and r, changing them in
+    place. Returns a mask of the balls that have stopped on the floor.
+    """
+    bounce = world.bounceFactor
+    minVelocity = world.minVelocity
+
+    vy += world.gravity
+    vx *= world.friction
+    x += vx
+    y += vy
+
+    # Floor: place the ball on the floor and bounce it back up
+    hitFloor = y + r >= world.floorY
+    np.copyto(y, world.floorY - r, where=hitFloor)
+    np.multiply(vy, -bounce, out=vy, where=hitFloor)
+
+    # Stop tiny bounces, and stop balls that have also (almost) stopped
+    # moving sideways
+    stopped = hitFloor & (np.abs(vy) < minVelocity)
+    vy[stopped] = 0
+    stopped &= np.abs(vx) < minVelocity
+    vx[stopped] = 0
+
+    # Ceiling
+    hitCeiling = y - r <= 0
+    np.copyto(y, r, where=hitCeiling)
+    np.multiply(vy, -bounce, out=vy, where=hitCeiling)
+
+    # Left wall
+    hitLeft = x - r <= 0
+    np.copyto(x, r, where=hitLeft)
+    np.multiply(vx, -bounce, out=vx, where=hitLeft)
+
+    # Right wall
+    hitRight = x + r >= world.width
+    np.copyto(x, world.width - r, where=hitRight)
+    np.multiply(vx, -bounce, out=vx, where=hitRight)
+    return stopped
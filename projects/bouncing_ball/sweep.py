@@ -0,0 +1,259 @@
+"""
+CMU Graphics - Bouncing Ball Project: Parameter Sweep
+=====================================================
+Tries every combination of a range of GRAVITY, BOUNCE_FACTOR, FRICTION and
+MIN_VELOCITY values without opening a window, and reports how the ball
+behaves with each:
+
+- stepsToRest: steps until the ball stopped (state.atRest), or -1 if it
+  was still moving after --max-steps steps
+- bounces: how many times it bounced off the floor
+- maxHeight: the highest it got after its first bounce, in pixels above
+  the floor (the start height is the same for every combination)
+
+Each combination is one ball, dropped from the start position of
+physics.BallState. All the balls are simulated together as NumPy arrays,
+one value per combination, with exactly the arithmetic of physics.step(),
+so a row gives the same numbers as running physics.step() with those
+constants. Balls that have stopped are dropped from the arrays as the
+sweep goes on. The combinations are split into chunks of CHUNK_CONFIGS,
+and a process pool simulates the chunks in parallel.
+
+A range is start:stop:count (count evenly spaced values, stop included)
+or a comma-separated list. Constants that aren't given keep their
+default value.
+
+Prerequisites:
+- Python 3.6+
+- numpy installed
+- pandas and pyarrow installed (only for .parquet output)
+
+Run a sweep:
+    python sweep.py --gravity 0.1:1.0:10 --bounce 0.5:0.95:10 --out sweep.csv
+    python sweep.py --gravity 0.1:1.0:40 --bounce 0.5:0.95:40 \\
+        --friction 0.95,0.98,0.99,1.0 --min-velocity 0.1:1.0:10 --out sweep.parquet
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+import physics
+
+# Combinations simulated together by one worker
+CHUNK_CONFIGS = 4096
+
+# When fewer than this fraction of a chunk's balls are still moving, the
+# arrays are shrunk to the moving ones
+COMPACT_FRACTION = 0.5
+
+DEFAULT_MAX_STEPS = 5000
+
+PARAMETERS = ['gravity', 'bounceFactor', 'friction', 'minVelocity']
+METRICS = ['stepsToRest', 'bounces', 'maxHeight']
+
+
+def parseValues(text):
+    """'0.1:1.0:10' -> 10 evenly spaced values; '0.9,0.99' -> [0.9, 0.99]."""
+    if ':' in text:
+        start, stop, count = text.split(':')
+        return np.linspace(float(start), float(stop), int(count)).tolist()
+    return [float(value) for value in text.split(',')]
+
+
+def combinations(gravity, bounceFactor, friction, minVelocity):
+    """Every combination of the values, as four arrays of the same length."""
+    grids = np.meshgrid(gravity, bounceFactor, friction, minVelocity,
+                        indexing='ij')
+    return [grid.ravel() for grid in grids]
+
+
+# =============================================================================
+# SIMULATION
+# =============================================================================
+
+def simulate(gravity, bounceFactor, friction, minVelocity,
+             maxSteps=DEFAULT_MAX_STEPS, world=physics.DEFAULT_WORLD):
+    """
+    Drops one ball per combination (element i of the four arrays) and
+    steps them all until they stop or `maxSteps` steps have passed. Returns
+    the stepsToRest, bounces and maxHeight arrays.
+    """
+    count = len(gravity)
+    start = physics.BallState(world=world)
+    radius = start.radius
+    floor = world.floorY - radius
+    right = world.width - radius
+
+    stepsToRest = np.full(count, -1, dtype=np.int64)
+    bounces = np.zeros(count, dtype=np.int64)
+    maxHeight = np.zeros(count)
+
+    # The moving balls: `index` says which combination each one is
+    index = np.arange(count)
+    g, b, f, m = gravity, bounceFactor, friction, minVelocity
+    x = np.full(count, float(start.x))
+    y = np.full(count, float(start.y))
+    vx = np.full(count, float(start.velocityX))
+    vy = np.full(count, float(start.velocityY))
+    ballBounces = np.zeros(count, dtype=np.int64)
+    highest = np.full(count, np.inf)     # lowest y after the first bounce
+
+    for stepNumber in range(1, maxSteps + 1):
+        # physics.step(), one array operation per line
+        vy += g
+        vx *= f
+        x += vx
+        y += vy
+
+        hit = y + radius >= world.floorY
+        y[hit] = floor
+        vy[hit] = -vy[hit] * b[hit]
+        small = hit & (np.abs(vy) < m)
+        vy[small] = 0
+        # (index is -1 for balls that stopped earlier and are kept frozen)
+        stopped = small & (np.abs(vx) < m) & (index >= 0)
+        vx[stopped] = 0
+        ballBounces += hit & ~small
+
+        top = y - radius <= 0
+        y[top] = radius
+        vy[top] = -vy[top] * b[top]
+        left = x - radius <= 0
+        x[left] = radius
+        vx[left] = -vx[left] * b[left]
+        wall = x + radius >= world.width
+        x[wall] = right
+        vx[wall] = -vx[wall] * b[wall]
+
+        np.minimum(highest, np.where(ballBounces > 0, y, np.inf), out=highest)
+
+        if stopped.any():
+            stepsToRest[index[stopped]] = stepNumber
+            moving = ~stopped & (index >= 0)
+            # Write out the finished balls' numbers, and shrink the arrays
+            # when enough of them have stopped
+            done = index[stopped]
+            bounces[done] = ballBounces[stopped]
+            maxHeight[done] = heightAbove(floor, highest[stopped])
+            if moving.sum() < COMPACT_FRACTION * len(index) or not moving.any():
+                index, g, b, f, m = (index[moving], g[moving], b[moving],
+                                     f[moving], m[moving])
+                x, y, vx, vy = x[moving], y[moving], vx[moving], vy[moving]
+                ballBounces = ballBounces[moving]
+                highest = highest[moving]
+                if len(index) == 0:
+                    break
+            else:
+                # Keep stopped balls in the arrays but frozen in place
+                g = np.where(stopped, 0.0, g)
+                vx[stopped] = 0
+                vy[stopped] = 0
+                f = np.where(stopped, 1.0, f)
+                b = np.where(stopped, 0.0, b)
+                m = np.where(stopped, np.inf, m)
+                ballBounces[stopped] = 0
+                index = np.where(stopped, -1, index)
+
+    # Balls still moving at the end
+    live = index >= 0
+    bounces[index[live]] = ballBounces[live]
+    maxHeight[index[live]] = heightAbove(floor, highest[live])
+    return stepsToRest, bounces, maxHeight
+
+
+def heightAbove(floor, lowestY):
+    """Height above the floor of the lowest y reached (0 if none)."""
+    return np.where(np.isinf(lowestY), 0.0, floor - lowestY)
+
+
+def simulateChunk(chunk):
+    """simulate() for one chunk (a tuple of the four arrays and maxSteps)."""
+    *parameters, maxSteps = chunk
+    return simulate(*parameters, maxSteps=maxSteps)
+
+
+def sweep(gravity, bounceFactor, friction, minVelocity,
+          maxSteps=DEFAULT_MAX_STEPS, workers=1):
+    """
+    Simulates every combination of the given values, `workers` processes
+    at a time. Returns a dictionary of equal-length arrays, one per
+    parameter and metric.
+    """
+    parameters = combinations(gravity, bounceFactor, friction, minVelocity)
+    count = len(parameters[0])
+    chunks = [tuple(values[i:i + CHUNK_CONFIGS] for values in parameters)
+              + (maxSteps,) for i in range(0, count, CHUNK_CONFIGS)]
+    if workers > 1 and len(chunks) > 1:
+        with Pool(min(workers, len(chunks))) as pool:
+            results = pool.map(simulateChunk, chunks)
+    else:
+        results = [simulateChunk(chunk) for chunk in chunks]
+
+    table = dict(zip(PARAMETERS, parameters))
+    for name, column in zip(METRICS, zip(*results)):
+        table[name] = np.concatenate(column)
+    return table
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def writeTable(table, path):
+    """Writes the sweep results as CSV, or as Parquet for a .parquet path."""
+    names = PARAMETERS + METRICS
+    if path.endswith('.parquet'):
+        import pandas
+
+        pandas.DataFrame({name: table[name] for name in names}).to_parquet(path)
+        return
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(names)
+        writer.writerows(zip(*(table[name].tolist() for name in names)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Simulate every combination of the physics constants')
+    parser.add_argument('--gravity', default=str(physics.GRAVITY))
+    parser.add_argument('--bounce', default=str(physics.BOUNCE_FACTOR),
+                        help='BOUNCE_FACTOR values')
+    parser.add_argument('--friction', default=str(physics.FRICTION))
+    parser.add_argument('--min-velocity', default=str(physics.MIN_VELOCITY))
+    parser.add_argument('--max-steps', type=int, default=DEFAULT_MAX_STEPS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--out', help='write the results to a .csv or '
+                                      '.parquet file')
+    args = parser.parse_args()
+
+    values = [parseValues(text) for text in
+              (args.gravity, args.bounce, args.friction, args.min_velocity)]
+    start = time.perf_counter()
+    table = sweep(*values, maxSteps=args.max_steps, workers=args.workers)
+    seconds = time.perf_counter() - start
+    count = len(table['gravity'])
+    print(f'{count} combinations in {seconds:.2f} s '
+          f'({count / seconds * 60:,.0f} per minute, {args.workers} workers)')
+
+    stopped = table['stepsToRest'] >= 0
+    print(f'{stopped.sum()} came to rest within {args.max_steps} steps')
+    if args.out:
+        writeTable(table, args.out)
+        print(f'Results written to {args.out}')
+    else:
+        for row in itertools.islice(zip(*(table[name] for name in
+                                          PARAMETERS + METRICS)), 10):
+            print('  ' + '  '.join(f'{value:g}' for value in row))
+        if count > 10:
+            print(f'  ... ({count - 10} more; use --out to save them all)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+CMU Graphics - Orbits Project: Orbit System Benchmark
+=====================================================
+Measures the time per frame to work out every body's place, rotation and
+size, comparing:
+
+- one by one: a Python loop over the bodies, parents first, calling
+              math.cos and math.sin for each one (what simple_animation.py
+              does for its orbiting dot)
+- numpy trig: the same in NumPy arrays, one level at a time, with np.cos
+              and np.sin on every frame
+- tables:     the OrbitSystem from orbits.py, which looks the angles up in
+              its sin/cos tables
+
+The bodies are solar systems from orbits.addSystems (suns, planets, moons
+and moons of moons). The three results are checked against each other
+before they are timed. No window is opened. Run this benchmark:
+    python bench_orbits.py
+    python bench_orbits.py --bodies 100 1000 10000 --frames 600
+"""
+
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+from orbits import DEGREES_PER_STEP, TABLE_STEPS, OrbitSystem, addSystems
+
+RADIANS_PER_STEP = math.radians(DEGREES_PER_STEP)
+
+
+def oneByOne(orbits):
+    """Every body worked out in a Python loop: (x, y, rotateAngle, size)."""
+    frame = orbits.frame
+    count = len(orbits)
+    parent = orbits.parent.tolist()
+    centerX, centerY = orbits.centerX.tolist(), orbits.centerY.tolist()
+    orbitRadius = orbits.orbitRadius.tolist()
+    angle, speed = orbits.angle.tolist(), orbits.speed.tolist()
+    spin, spinSpeed = orbits.spin.tolist(), orbits.spinSpeed.tolist()
+    baseSize, pulse = orbits.baseSize.tolist(), orbits.pulse.tolist()
+    pulseAngle = orbits.pulseAngle.tolist()
+    pulseSpeed = orbits.pulseSpeed.tolist()
+
+    x, y = [0.0] * count, [0.0] * count
+    arm = [0] * count
+    rotateAngle, size = [0.0] * count, [0.0] * count
+    # Parents are added before their children, so they are always placed first
+    for i in range(count):
+        above = parent[i]
+        turn = angle[i] + speed[i] * frame
+        if above < 0:
+            startX, startY = centerX[i], centerY[i]
+        else:
+            startX, startY = x[above], y[above]
+            turn += arm[above]
+        turn %= TABLE_STEPS
+        arm[i] = turn
+        radians = turn * RADIANS_PER_STEP
+        x[i] = startX + orbitRadius[i] * math.cos(radians)
+        y[i] = startY + orbitRadius[i] * math.sin(radians)
+        rotateAngle[i] = ((spin[i] + spinSpeed[i] * frame + turn)
+                          % TABLE_STEPS) * DEGREES_PER_STEP
+        wave = (pulseAngle[i] + pulseSpeed[i] * frame) * RADIANS_PER_STEP
+        size[i] = baseSize[i] * (1 + pulse[i] * math.sin(wave))
+    return x, y, rotateAngle, size
+
+
+def numpyTrig(orbits):
+    """OrbitSystem.update() with np.cos and np.sin instead of the tables."""
+    frame = orbits.frame
+    arm = (orbits.angle + orbits.speed * frame) % TABLE_STEPS
+    x = orbits.centerX.copy()
+    y = orbits.centerY.copy()
+    roots = orbits.roots
+    radians = arm[roots] * RADIANS_PER_STEP
+    x[roots] += orbits.orbitRadius[roots] * np.cos(radians)
+    y[roots] += orbits.orbitRadius[roots] * np.sin(radians)
+    for children, parents in orbits.levels:
+        arm[children] = (arm[children] + arm[parents]) % TABLE_STEPS
+        radians = arm[children] * RADIANS_PER_STEP
+        radius = orbits.orbitRadius[children]
+        x[children] = x[parents] + radius * np.cos(radians)
+        y[children] = y[parents] + radius * np.sin(radians)
+    spin = (orbits.spin + orbits.spinSpeed * frame + arm) % TABLE_STEPS
+    wave = (orbits.pulseAngle + orbits.pulseSpeed * frame) * RADIANS_PER_STEP
+    size = orbits.baseSize * (1 + orbits.pulse * np.sin(wave))
+    return x, y, spin * DEGREES_PER_STEP, size
+
+
+def tables(orbits):
+    orbits.update()
+    return orbits.x, orbits.y, orbits.rotateAngle, orbits.size
+
+
+def check(orbits, frames=(0, 1, 77, 12345)):
+    """Raises AssertionError if the three ways disagree on any frame."""
+    for frame in frames:
+        orbits.frame = frame
+        expected = [np.array(values) for values in oneByOne(orbits)]
+        for way in (numpyTrig, tables):
+            for name, want, got in zip(['x', 'y', 'rotateAngle', 'size'],
+                                       expected, way(orbits)):
+                error = float(np.max(np.abs(want - got), initial=0))
+                assert error < 1e-6, \
+                    f'{way.__name__} {name} is off by {error} on frame {frame}'
+
+
+def timeFrames(way, orbits, frames):
+    times = []
+    for frame in range(frames):
+        orbits.frame = frame
+        start = time.perf_counter()
+        way(orbits)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def summarize(name, count, times):
+    times = sorted(times)
+    mean = sum(times) / len(times)
+    p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+    print(f'{name:>12} {count:>7} bodies: mean {mean:8.3f} ms   '
+          f'p99 {p99:8.3f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Time working out orbiting bodies')
+    parser.add_argument('--bodies', type=int, nargs='+',
+                        default=[300, 3000, 30000])
+    parser.add_argument('--frames', type=int, default=300)
+    args = parser.parse_args()
+
+    for count in args.bodies:
+        orbits = OrbitSystem()
+        addSystems(orbits, count, random.Random(1))
+        orbits.update()
+        check(orbits)
+        for name, way in [('one by one', oneByOne), ('numpy trig', numpyTrig),
+                          ('tables', tables)]:
+            summarize(name, count, timeFrames(way, orbits, args.frames))
+
+
+if __name__ == '__main__':
+    main()
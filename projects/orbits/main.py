@@ -0,0 +1,195 @@
+"""
+CMU Graphics - Orbits Project
+=============================
+Hundreds of orbiting, spinning and pulsating bodies, all worked out with
+one NumPy pass per step.
+
+basics/simple_animation.py has one orbiting dot (math.cos and math.sin of
+app.orbitAngle on every step), one rotating star and one pulsating
+rectangle. The top row here has the same three, and below them are solar
+systems (300 bodies by default): suns that spin and pulse, planets
+orbiting them, moons orbiting the planets and small moons orbiting some
+of the moons. An OrbitSystem (see orbits.py) works out every body's place,
+rotation and size on each step, with sin/cos tables and one array step
+per level of moons; onStep then copies the results onto the shapes.
+
+The label at the bottom shows how long working out the bodies and moving
+the shapes take per step.
+
+Prerequisites:
+- Python 3.6+
+- cmu_graphics library installed
+- numpy installed (pip install numpy)
+
+Run this demo:
+    python main.py
+    python main.py --bodies 1000
+"""
+
+import argparse
+import time
+
+from cmu_graphics import *
+
+# Imported after cmu_graphics, whose `import *` has a random() function of
+# its own that would otherwise replace the random module
+import random
+
+from orbits import OrbitSystem, addSystems
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+CANVAS_WIDTH = 400
+CANVAS_HEIGHT = 400
+
+# The solar systems fill this part of the canvas
+SYSTEMS_TOP = 140
+SYSTEMS_HEIGHT = 235
+
+ROLE_COLORS = {
+    'sun': 'gold',
+    'planet': 'steelBlue',
+    'moon': 'gray',
+    'moonlet': 'darkGray',
+}
+
+# =============================================================================
+# COMMAND-LINE OPTIONS
+# =============================================================================
+parser = argparse.ArgumentParser(description='Orbiting bodies demo')
+parser.add_argument('--bodies', type=int, default=300,
+                    help='number of bodies in the solar systems')
+parser.add_argument('--seed', type=int, default=1,
+                    help='seed for the random speeds')
+options = parser.parse_args()
+
+app.background = 'white'
+orbits = OrbitSystem()
+
+# =============================================================================
+# TITLE
+# =============================================================================
+Label('Orbits', 200, 30, size=18, bold=True, fill='navy')
+Label('Every body below is placed, turned and sized in one NumPy pass.',
+      200, 50, size=12, fill='gray')
+
+# =============================================================================
+# THE THREE ANIMATIONS FROM simple_animation.py
+# =============================================================================
+# Each body is a shape and its index in `orbits`; onStep copies the
+# system's arrays onto the shapes. A body's size is the radius of a Circle
+# or Star, and half the side of a Rect.
+shapes = []
+roles = []
+
+# 1. Pulsating rectangle: 30 to 80 pixels and back every 100 steps
+pulsatingRect = Rect(60, 100, 55, 55, fill='crimson', align='center')
+orbits.add(centerX=60, centerY=100, size=27.5, pulse=0.45, pulseSpeed=3.6)
+shapes.append(pulsatingRect)
+roles.append('rect')
+
+# 2. Rotating star: 3 degrees per step
+rotatingStar = Star(200, 100, 30, 5, fill='gold')
+orbits.add(centerX=200, centerY=100, size=30, spinSpeed=3)
+shapes.append(rotatingStar)
+roles.append('star')
+
+# 3. Orbiting dot: about 0.05 radians (2.9 degrees) per step around a ring
+Oval(330, 100, 70, 70, fill=None, border='lightGray', borderWidth=1)
+orbitDot = Circle(365, 100, 8, fill='darkGreen')
+orbits.add(centerX=330, centerY=100, orbitRadius=35, speed=2.9, size=8)
+shapes.append(orbitDot)
+roles.append('dot')
+
+# =============================================================================
+# SOLAR SYSTEMS
+# =============================================================================
+roles += addSystems(orbits, options.bodies, random.Random(options.seed),
+                    0, SYSTEMS_TOP, CANVAS_WIDTH, SYSTEMS_HEIGHT)
+orbits.update()
+
+app.maxShapeCount = max(app.maxShapeCount, len(orbits) + 100)
+xs, ys = orbits.x.tolist(), orbits.y.tolist()
+sizes = orbits.size.tolist()
+for index in range(len(shapes), len(orbits)):
+    role = roles[index]
+    if role == 'sun':
+        shape = Star(xs[index], ys[index], sizes[index], 8, roundness=40,
+                     fill=ROLE_COLORS[role])
+    elif role == 'planet' and index % 2 == 0:
+        side = 2 * sizes[index]
+        shape = Rect(xs[index], ys[index], side, side, align='center',
+                     fill=ROLE_COLORS[role])
+        roles[index] = 'rect'
+    else:
+        shape = Circle(xs[index], ys[index], sizes[index],
+                       fill=ROLE_COLORS[role])
+    shapes.append(shape)
+
+statusLabel = Label('', 200, 388, size=11, fill='gray')
+app.stepTimes = []
+# Shown times differ on every run; demokit's replay leaves these out when
+# it checks that two runs ended the same
+app.clockDependent = [statusLabel, 'stepTimes']
+
+# =============================================================================
+# ANIMATION
+# =============================================================================
+
+def onStep():
+    """
+    Called automatically ~30 times per second. Works out every body's new
+    place, rotation and size, then copies them onto the bodies whose
+    values change.
+    """
+    start = time.perf_counter()
+    orbits.step()
+    computed = time.perf_counter()
+
+    # Sizes first: a Rect keeps its left and top when its width changes, so
+    # a pulsating Rect is put back on its center afterwards
+    pulsing = orbits.pulsing
+    for index, size, x, y in zip(pulsing.tolist(),
+                                 orbits.size[pulsing].tolist(),
+                                 orbits.x[pulsing].tolist(),
+                                 orbits.y[pulsing].tolist()):
+        shape = shapes[index]
+        if roles[index] == 'rect':
+            shape.width = shape.height = 2 * size
+            shape.centerX = x
+            shape.centerY = y
+        else:
+            shape.radius = size
+
+    moving = orbits.moving
+    for index, x, y in zip(moving.tolist(), orbits.x[moving].tolist(),
+                           orbits.y[moving].tolist()):
+        shape = shapes[index]
+        shape.centerX = x
+        shape.centerY = y
+
+    spinning = orbits.spinning
+    for index, angle in zip(spinning.tolist(),
+                            orbits.rotateAngle[spinning].tolist()):
+        shapes[index].rotateAngle = angle
+
+    end = time.perf_counter()
+    app.stepTimes.append(((computed - start) * 1000, (end - computed) * 1000))
+
+    # Show the average times over the last 15 steps (~0.5 seconds)
+    if len(app.stepTimes) == 15:
+        computeMs = sum(times[0] for times in app.stepTimes) / 15
+        shapesMs = sum(times[1] for times in app.stepTimes) / 15
+        statusLabel.value = (f'{len(orbits)} bodies: {computeMs:.2f} ms to '
+                             f'work out, {shapesMs:.2f} ms to move the shapes')
+        app.stepTimes = []
+
+
+def onKeyPress(key):
+    """Space pauses and resumes every animation."""
+    if key == 'space':
+        app.paused = not app.paused
+
+
+cmu_graphics.run()
@@ -0,0 +1,284 @@
+"""
+CMU Graphics - Orbits Project: Orbit System
+===========================================
+Works out where hundreds of orbiting, spinning and pulsating bodies are on
+each frame, all at once with NumPy.
+
+In simple_animation.py, one dot orbits by adding 0.05 to app.orbitAngle
+and calling math.cos and math.sin on every step; a star spins by adding 3
+to its rotateAngle. Doing that for hundreds of bodies, with moons orbiting
+planets orbiting suns, means hundreds of trig calls in a Python loop, and
+every moon has to wait for its planet to be placed first.
+
+An OrbitSystem keeps every body in NumPy arrays instead:
+
+- Every angle is a whole number of steps of 1/10 of a degree
+  (TABLE_STEPS per turn), and sin and cos of every step are worked out
+  once, in SIN and COS. Looking up a few hundred angles in a table is one
+  array index, not a few hundred calls.
+- A body orbits its parent: its arm turns by `speed` steps per frame, and
+  the arm is attached to the parent's arm, so a moon's arm turns with its
+  planet's (the angles add up, like rotating a Group of shapes). A body's
+  rotateAngle turns with its arm too, plus its own spin. Adding two
+  angles is adding two whole numbers, so nothing ever drifts.
+- The bodies are sorted by depth (suns, then planets, then moons...), and
+  all the bodies of one depth are placed in one step from their parents'
+  places. A system with moons of moons takes four array steps, however
+  many bodies it has.
+- Spinning (rotateAngle) and pulsating (size) are worked out from the
+  frame number, for every body at once.
+
+The angle of a body on frame `frame` is angle + speed * frame (in steps),
+so any frame can be worked out directly, and a paused or skipped frame
+doesn't change the motion.
+
+    orbits = OrbitSystem()
+    sun = orbits.add(centerX=200, centerY=200, spinSpeed=1)
+    planet = orbits.add(parent=sun, orbitRadius=80, speed=2)
+    moon = orbits.add(parent=planet, orbitRadius=20, speed=-6, pulse=0.2)
+
+    def onStep():
+        orbits.step()
+        # orbits.x, orbits.y, orbits.rotateAngle and orbits.size now hold
+        # every body's place, rotation and size
+
+This module doesn't import cmu_graphics. Time it against working out
+every body with math.cos and math.sin with bench_orbits.py.
+
+Prerequisites:
+- Python 3.6+
+- numpy installed (pip install numpy)
+"""
+
+import math
+
+import numpy as np
+
+# Steps in a full turn; every angle and speed is a whole number of them
+TABLE_STEPS = 3600
+
+# sin and cos of every step around the circle
+SIN = np.sin(np.arange(TABLE_STEPS) * (2 * math.pi / TABLE_STEPS))
+COS = np.cos(np.arange(TABLE_STEPS) * (2 * math.pi / TABLE_STEPS))
+
+DEGREES_PER_STEP = 360 / TABLE_STEPS
+
+# Fields of every body, with the value a body gets when it isn't given
+BODY_FIELDS = {
+    'parent': -1,
+    'centerX': 0.0,         # where a body without a parent orbits
+    'centerY': 0.0,
+    'orbitRadius': 0.0,
+    'angle': 0,             # where the arm starts (steps)
+    'speed': 0,             # how far the arm turns per frame (steps)
+    'spin': 0,              # rotateAngle at the start (steps)
+    'spinSpeed': 0,         # how far rotateAngle turns per frame (steps)
+    'size': 1.0,
+    'pulse': 0.0,           # how far the size swings: 0.2 is 80% to 120%
+    'pulseSpeed': 0,        # steps of the pulse's sine wave per frame
+    'pulseAngle': 0,        # where on the sine wave the pulse starts (steps)
+}
+
+
+def steps(degrees):
+    """An angle in degrees as the nearest whole number of table steps."""
+    return round(degrees / DEGREES_PER_STEP)
+
+
+class OrbitSystem:
+    """
+    Orbiting, spinning and pulsating bodies. Add them with add(), then
+    call step() once per frame. After each step these arrays hold one
+    value per body (in the order they were added):
+
+      x, y         - the body's center
+      rotateAngle  - its rotation in degrees (0 to 360)
+      size         - its size with the pulse applied
+
+    `moving`, `spinning` and `pulsing` hold the indices of the bodies whose
+    place, rotation and size change from frame to frame, so only their
+    shapes need updating.
+    """
+
+    def __init__(self):
+        self.frame = 0
+        self.count = 0
+        self.fields = {name: [] for name in BODY_FIELDS}
+        self.built = False
+
+    def add(self, parent=None, centerX=0, centerY=0, orbitRadius=0,
+            angle=0, speed=0, spin=0, spinSpeed=0, size=1, pulse=0,
+            pulseSpeed=0, pulseAngle=0):
+        """
+        Adds a body and returns its index. It orbits `parent` (the index
+        of a body added before it), or the point (centerX, centerY) if it
+        has none, at a distance of orbitRadius. The angles and speeds are
+        in degrees and degrees per frame, rounded to the nearest
+        1/10 of a degree.
+        """
+        if parent is not None and not 0 <= parent < self.count:
+            raise ValueError(f'parent {parent} must be a body added earlier')
+        if not 0 <= pulse < 1:
+            raise ValueError('pulse must be at least 0 and less than 1')
+        values = {
+            'parent': -1 if parent is None else parent,
+            'centerX': centerX, 'centerY': centerY,
+            'orbitRadius': orbitRadius,
+            'angle': steps(angle), 'speed': steps(speed),
+            'spin': steps(spin), 'spinSpeed': steps(spinSpeed),
+            'size': size, 'pulse': pulse,
+            'pulseSpeed': steps(pulseSpeed), 'pulseAngle': steps(pulseAngle),
+        }
+        for name, value in values.items():
+            self.fields[name].append(value)
+        self.count += 1
+        self.built = False
+        return self.count - 1
+
+    def __len__(self):
+        return self.count
+
+    # -------------------------------------------------------------------------
+    # Arrays
+    # -------------------------------------------------------------------------
+    def build(self):
+        """
+        Turns the added bodies into arrays and sorts them into levels by
+        depth. Called by update() when bodies were added since.
+        """
+        for name, default in BODY_FIELDS.items():
+            dtype = np.float64 if isinstance(default, float) else np.int64
+            setattr(self, name, np.array(self.fields[name], dtype))
+        # size is worked out on every frame from the size without the pulse
+        self.baseSize = self.size
+
+        # Parents are added before their children, so one pass finds every
+        # body's depth
+        parent = self.parent.tolist()
+        depth = [0] * self.count
+        for index, above in enumerate(parent):
+            if above >= 0:
+                depth[index] = depth[above] + 1
+        depth = np.array(depth, np.int64)
+        self.roots = np.flatnonzero(depth == 0)
+        self.levels = []
+        for level in range(1, int(depth.max(initial=0)) + 1):
+            children = np.flatnonzero(depth == level)
+            self.levels.append((children, self.parent[children]))
+
+        # How fast each arm really turns (its parents' turning included); a
+        # body moves if any arm between it and the center turns and has a
+        # length
+        rate = self.speed % TABLE_STEPS
+        for children, parents in self.levels:
+            rate[children] = (rate[children] + rate[parents]) % TABLE_STEPS
+        moves = (rate != 0) & (self.orbitRadius != 0)
+        for children, parents in self.levels:
+            moves[children] |= moves[parents]
+        self.moving = np.flatnonzero(moves)
+        self.spinning = np.flatnonzero((self.spinSpeed + rate) % TABLE_STEPS
+                                       != 0)
+        self.pulsing = np.flatnonzero((self.pulse != 0)
+                                      & (self.pulseSpeed % TABLE_STEPS != 0))
+
+        self.armAngle = np.zeros(self.count, np.int64)
+        self.x = np.zeros(self.count)
+        self.y = np.zeros(self.count)
+        self.built = True
+
+    # -------------------------------------------------------------------------
+    # Animation
+    # -------------------------------------------------------------------------
+    def step(self, frames=1):
+        """Moves on by `frames` frames and works out every body's state."""
+        self.frame += frames
+        self.update()
+
+    def update(self):
+        """Works out every body's state on the current frame."""
+        if not self.built:
+            self.build()
+        frame = self.frame
+
+        # Each arm's own angle on this frame, in table steps
+        armAngle = (self.angle + self.speed * frame) % TABLE_STEPS
+
+        # Suns and other bodies without a parent orbit their own center
+        roots = self.roots
+        rootAngle = armAngle[roots]
+        self.armAngle[roots] = rootAngle
+        radius = self.orbitRadius[roots]
+        self.x[roots] = self.centerX[roots] + radius * COS[rootAngle]
+        self.y[roots] = self.centerY[roots] + radius * SIN[rootAngle]
+
+        # Then each level from its parents: the arm is turned by the parent's
+        # arm, and starts at the parent's center
+        for children, parents in self.levels:
+            angle = (armAngle[children] + self.armAngle[parents]) % TABLE_STEPS
+            self.armAngle[children] = angle
+            radius = self.orbitRadius[children]
+            self.x[children] = self.x[parents] + radius * COS[angle]
+            self.y[children] = self.y[parents] + radius * SIN[angle]
+
+        # A body turns with its arm, like a shape in a rotating Group, and
+        # spins on top of that
+        spin = self.spin + self.spinSpeed * frame + self.armAngle
+        self.rotateAngle = (spin % TABLE_STEPS) * DEGREES_PER_STEP
+        pulse = (self.pulseAngle + self.pulseSpeed * frame) % TABLE_STEPS
+        self.size = self.baseSize * (1 + self.pulse * SIN[pulse])
+
+
+# =============================================================================
+# SOLAR SYSTEMS
+# =============================================================================
+# Each system is a spinning, pulsating sun with PLANETS planets, each with
+# MOONS moons; each planet's first moon has a moon of its own. That is 13
+# bodies, four levels deep.
+PLANETS = 3
+MOONS = 2
+
+
+def addSystems(orbits, count, rng, left=0, top=0, width=400, height=400):
+    """
+    Adds `count` bodies to `orbits` as solar systems laid out in a grid
+    over the given part of the canvas, with random speeds from `rng` (a
+    random.Random). Returns a list with the role of every body added, in
+    order: 'sun', 'planet', 'moon' or 'moonlet'.
+    """
+    bodies = 1 + PLANETS * (1 + MOONS + 1)
+    systems = max(1, math.ceil(count / bodies))
+    columns = max(1, math.ceil(math.sqrt(systems * width / height)))
+    rows = math.ceil(systems / columns)
+    cell = min(width / columns, height / rows)
+    roles = []
+
+    def add(role, **options):
+        if len(roles) < count:
+            roles.append(role)
+            return orbits.add(**options)
+        return None
+
+    def turn(low, high):
+        return rng.choice([-1, 1]) * rng.uniform(low, high)
+
+    for system in range(systems):
+        row, column = divmod(system, columns)
+        sun = add('sun', centerX=left + (column + 0.5) * cell,
+                  centerY=top + (row + 0.5) * cell, size=max(2, 0.1 * cell),
+                  spinSpeed=turn(1, 3), pulse=0.15,
+                  pulseSpeed=rng.uniform(4, 8), pulseAngle=rng.uniform(0, 360))
+        for p in range(PLANETS):
+            planet = add('planet', parent=sun,
+                         orbitRadius=cell * (0.18 + 0.1 * p),
+                         angle=rng.uniform(0, 360), speed=turn(0.5, 3),
+                         size=max(1, 0.04 * cell), spinSpeed=turn(0, 6))
+            for m in range(MOONS):
+                moon = add('moon', parent=planet,
+                           orbitRadius=cell * (0.05 + 0.025 * m),
+                           angle=rng.uniform(0, 360), speed=turn(3, 8),
+                           size=max(1, 0.02 * cell))
+                if m == 0:
+                    add('moonlet', parent=moon, orbitRadius=cell * 0.03,
+                        angle=rng.uniform(0, 360), speed=turn(8, 15),
+                        size=max(1, 0.01 * cell))
+    return roles
@@ -0,0 +1,110 @@
+"""
+CMU Graphics - Timeline Project: Scheduler Benchmark
+====================================================
+Measures the time per frame to run many independent animations, comparing:
+
+- every frame: every animation works out its value on every frame and
+               sets it if it changed (what counters like app.colorCounter
+               do: they are checked on every step)
+- timeline:    the Timeline from timeline.py, which only runs the
+               animations that change on that frame
+
+Most of the animations hold a value for 20-90 frames at a time, like the
+blinking squares in main.py; a small share of them move smoothly every
+frame. No window is opened. Run this benchmark:
+    python bench_timeline.py
+    python bench_timeline.py --animations 1000 10000 --frames 600
+"""
+
+import argparse
+import random
+import time
+
+from timeline import Timeline
+
+COLORS = ['red', 'orange', 'yellow', 'green', 'blue', 'purple']
+MOVING_SHARE = 0.05         # Share of animations that change every frame
+
+
+class Target:
+    """A stand-in for a shape: just somewhere to store the properties."""
+
+    def __init__(self):
+        self.fill = None
+        self.centerX = 0
+
+
+def addAnimations(timeline, count, rng):
+    for i in range(count):
+        target = Target()
+        if rng.random() < MOVING_SHARE:
+            timeline.tween(target, 'centerX', 0, 400,
+                           frames=rng.randint(30, 200), repeat='pingpong')
+        else:
+            keys = []
+            frame = 0
+            for color in rng.sample(COLORS, 3):
+                keys.append((frame, color))
+                frame += rng.randint(20, 90)
+            keys.append((frame, keys[0][1]))
+            timeline.keyframes(target, 'fill', keys, repeat='loop',
+                               delay=rng.randint(0, 60))
+
+
+def stepEveryFrame(timeline, animations):
+    """Advances one frame, working out every animation's value."""
+    timeline.frame += 1
+    frame = timeline.frame
+    for animation in animations:
+        t = frame - animation.startFrame
+        if t < 0:
+            continue
+        p, forwards = animation.position(t)
+        value = animation.valueAt(p)
+        if value != animation.value:
+            animation.value = value
+            setattr(animation.target, animation.name, value)
+    return len(animations)
+
+
+def timeFrames(stepFn, frames):
+    times = []
+    calls = 0
+    for i in range(frames):
+        start = time.perf_counter()
+        calls += stepFn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times, calls / frames
+
+
+def summarize(name, count, times, perFrame):
+    times = sorted(times)
+    mean = sum(times) / len(times)
+    p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+    print(f'{name:>12} {count:>7} animations: mean {mean:8.3f} ms   '
+          f'p99 {p99:8.3f} ms   {perFrame:8.1f} run per frame')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the timeline scheduler')
+    parser.add_argument('--animations', type=int, nargs='+',
+                        default=[100, 1000, 10000])
+    parser.add_argument('--frames', type=int, default=300)
+    args = parser.parse_args()
+
+    for count in args.animations:
+        everyFrame = Timeline()
+        addAnimations(everyFrame, count, random.Random(1))
+        animations = [animation for due, order, animation in everyFrame.queue]
+        times, perFrame = timeFrames(lambda: stepEveryFrame(everyFrame, animations),
+                                     args.frames)
+        summarize('every frame', count, times, perFrame)
+
+        timeline = Timeline()
+        addAnimations(timeline, count, random.Random(1))
+        times, perFrame = timeFrames(timeline.step, args.frames)
+        summarize('timeline', count, times, perFrame)
+
+
+if __name__ == '__main__':
+    main()
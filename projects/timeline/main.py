@@ -0,0 +1,188 @@
+"""
+CMU Graphics - Timeline Animation Project
+=========================================
+The animations from basics/simple_animation.py (a moving circle, a
+pulsating rectangle, a rotating star, a color-changing circle and an
+orbiting dot), built with a timeline of tweens instead of counters that
+are checked on every step.
+
+In simple_animation.py, onStep keeps app.circleDirection, app.rectGrowing,
+app.colorCounter and app.orbitAngle up to date by hand. Here each
+animation is described once, as keyframes ("fill is red at frame 0, orange
+at frame 15, ...") with a repeat mode and an easing curve, and onStep just
+calls timeline.step(). The timeline only updates the animations that
+change on that step (see timeline.py).
+
+Below the five animations is a grid of extra squares (200 by default),
+each with its own blinking colors and an occasional flash. Most of them are
+holding a color on any given step, so they cost nothing until their next
+change. The label at the bottom shows how many animations ran on the last
+step.
+
+Prerequisites:
+- Python 3.6+
+- cmu_graphics library installed
+
+Run this demo:
+    python main.py
+    python main.py --shapes 800
+"""
+
+import argparse
+import math
+
+from cmu_graphics import *
+
+# Imported after cmu_graphics, whose `import *` has a random() function of
+# its own that would otherwise replace the random module
+import random
+
+from timeline import Timeline
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+CANVAS_WIDTH = 400
+CANVAS_HEIGHT = 400
+
+COLORS = ['red', 'orange', 'yellow', 'green', 'blue', 'purple']
+COLOR_FRAMES = 15       # Steps between color changes (~0.5 seconds)
+
+ORBIT_CENTER_X = 300
+ORBIT_CENTER_Y = 300
+ORBIT_RADIUS = 40
+ORBIT_FRAMES = 126      # Steps per orbit (0.05 radians per step)
+
+# The grid of extra blinking squares
+GRID_LEFT = 20
+GRID_TOP = 330
+GRID_WIDTH = 200
+GRID_HEIGHT = 45
+GRID_COLORS = ['lightSteelBlue', 'steelBlue', 'lightCoral', 'khaki',
+               'paleGreen', 'plum']
+
+# =============================================================================
+# COMMAND-LINE OPTIONS
+# =============================================================================
+parser = argparse.ArgumentParser(description='Timeline animation demo')
+parser.add_argument('--shapes', type=int, default=200,
+                    help='number of extra blinking squares')
+options = parser.parse_args()
+
+app.background = 'white'
+timeline = Timeline()
+
+# =============================================================================
+# TITLE
+# =============================================================================
+Label('Timeline Animations', 200, 30, size=18, bold=True, fill='navy')
+Label('Every animation below is a list of keyframes on one timeline.',
+      200, 50, size=12, fill='gray')
+
+# =============================================================================
+# THE FIVE ANIMATIONS FROM simple_animation.py
+# =============================================================================
+
+# 1. Moving circle: back and forth across the canvas. 'pingpong' plays the
+#    keyframes forwards, then backwards, so no direction variable is needed.
+movingCircle = Circle(25, 100, 25, fill='cyan')
+timeline.tween(movingCircle, 'centerX', 25, 375, frames=175,
+               repeat='pingpong')
+
+# 2. Pulsating rectangle: grows from 30 to 80 pixels and back, slowing down
+#    at each end (easeInOut)
+pulsatingRect = Rect(200, 200, 50, 50, fill='crimson', align='center')
+for name in ['width', 'height']:
+    timeline.tween(pulsatingRect, name, 30, 80, frames=50,
+                   easing='easeInOut', repeat='pingpong')
+
+# 3. Rotating star: 3 degrees per step, one full turn every 120 steps
+rotatingStar = Star(350, 100, 30, 5, fill='gold')
+timeline.tween(rotatingStar, 'rotateAngle', 0, 360, frames=120, repeat='loop')
+
+# 4. Color-changing circle: a new color every COLOR_FRAMES steps. Colors
+#    can't be in-between, so each one is held until the next keyframe and
+#    the animation only runs once every COLOR_FRAMES steps.
+Label('Color-changing circle:', 100, 260, size=12, fill='gray')
+colorCircle = Circle(100, 290, 20, fill=COLORS[0])
+timeline.keyframes(colorCircle, 'fill',
+                   [(i * COLOR_FRAMES, color) for i, color in enumerate(COLORS)]
+                   + [(len(COLORS) * COLOR_FRAMES, COLORS[0])],
+                   repeat='loop')
+
+# 5. Orbiting dot: the timeline animates the angle, and a function places
+#    the dot on the circle for each new angle
+Oval(ORBIT_CENTER_X, ORBIT_CENTER_Y, ORBIT_RADIUS * 2, ORBIT_RADIUS * 2,
+     fill=None, border='lightGray', borderWidth=1)
+orbitDot = Circle(ORBIT_CENTER_X + ORBIT_RADIUS, ORBIT_CENTER_Y, 10,
+                  fill='darkGreen')
+
+
+def moveOrbitDot(angle):
+    orbitDot.centerX = ORBIT_CENTER_X + ORBIT_RADIUS * math.cos(angle)
+    orbitDot.centerY = ORBIT_CENTER_Y + ORBIT_RADIUS * math.sin(angle)
+
+
+timeline.tween(moveOrbitDot, None, 0, 2 * math.pi, frames=ORBIT_FRAMES,
+               repeat='loop')
+
+# =============================================================================
+# MANY INDEPENDENT ANIMATIONS
+# =============================================================================
+# Each square blinks through a few colors, holding each one for 20-90 steps,
+# and now and then fades out and back in. The timeline only visits a square when
+# one of its keyframes is reached.
+
+def addBlinkingSquare(left, top, size):
+    square = Rect(left, top, size, size, fill=random.choice(GRID_COLORS))
+    keys = []
+    frame = 0
+    for color in random.sample(GRID_COLORS, 3):
+        keys.append((frame, color))
+        frame += random.randint(20, 90)
+    keys.append((frame, keys[0][1]))
+    timeline.keyframes(square, 'fill', keys, repeat='loop',
+                       delay=random.randint(0, 60))
+
+    # A quick flash: stay opaque, then fade to 30% and back in 8 steps
+    pause = random.randint(60, 240)
+    timeline.keyframes(square, 'opacity',
+                       [(0, 100), (pause, 100), (pause + 4, 30),
+                        (pause + 8, 100)],
+                       easing='easeOut', repeat='loop')
+    return square
+
+
+columns = max(1, math.ceil(math.sqrt(options.shapes * GRID_WIDTH / GRID_HEIGHT)))
+rows = max(1, math.ceil(options.shapes / columns))
+cellSize = min(GRID_WIDTH / columns, GRID_HEIGHT / rows)
+app.maxShapeCount = max(app.maxShapeCount, options.shapes + 100)
+for index in range(options.shapes):
+    row, column = divmod(index, columns)
+    addBlinkingSquare(GRID_LEFT + column * cellSize, GRID_TOP + row * cellSize,
+                      max(1, cellSize - 1))
+
+statusLabel = Label('', 200, 385, size=11, fill='gray')
+
+# =============================================================================
+# ANIMATION
+# =============================================================================
+
+def onStep():
+    """
+    Called automatically ~30 times per second. The timeline updates the
+    animations that change on this step and skips the rest.
+    """
+    timeline.step()
+    if timeline.frame % 15 == 0:
+        statusLabel.value = (f'{len(timeline)} animations, '
+                             f'{timeline.updates} ran on this step')
+
+
+def onKeyPress(key):
+    """Space pauses and resumes every animation."""
+    if key == 'space':
+        app.paused = not app.paused
+
+
+cmu_graphics.run()
@@ -0,0 +1,262 @@
+"""
+CMU Graphics - Timeline Project: Tween Scheduler
+================================================
+Animates shape properties over time from a list of keyframes, instead of
+keeping counters like app.colorCounter or app.rectGrowing and checking
+them on every step.
+
+    timeline = Timeline()
+    timeline.tween(rect, 'width', 30, 80, frames=50, repeat='pingpong',
+                   easing='easeInOut')
+    timeline.keyframes(circle, 'fill', [(0, 'red'), (15, 'orange'),
+                                        (30, 'yellow')], repeat='loop')
+
+    def onStep():
+        timeline.step()
+
+Each animation knows the next frame on which its value will change. The
+timeline keeps the animations in a priority queue (Python's heapq) ordered
+by that frame, so step() only looks at the animations that are due on this
+frame. An animation that is holding a value (a color that changes every 15
+steps, a shape waiting out a delay) is not touched at all until its next
+change, and a finished animation is dropped. Hundreds of mostly idle
+animations cost almost nothing per frame.
+
+An animation works on any object and property (`setattr(target, name,
+value)`), or calls a function with the new value if `name` is None, so this
+module does not need cmu_graphics.
+
+Prerequisites:
+- Python 3.6+
+"""
+
+import bisect
+import heapq
+import math
+
+# =============================================================================
+# EASING CURVES
+# =============================================================================
+# An easing curve turns "how far through this part of the animation we are"
+# (0.0 at the start, 1.0 at the end) into "how far the value has moved".
+# linear moves at a steady speed; the others speed up and/or slow down.
+
+def linear(x):
+    return x
+
+
+def easeIn(x):
+    return x * x
+
+
+def easeOut(x):
+    return x * (2 - x)
+
+
+def easeInOut(x):
+    return 2 * x * x if x < 0.5 else 1 - 2 * (1 - x) * (1 - x)
+
+
+def easeInOutSine(x):
+    return (1 - math.cos(math.pi * x)) / 2
+
+
+EASINGS = {
+    'linear': linear,
+    'easeIn': easeIn,
+    'easeOut': easeOut,
+    'easeInOut': easeInOut,
+    'easeInOutSine': easeInOutSine,
+}
+
+# What happens when an animation reaches its last keyframe
+REPEAT_MODES = [None, 'loop', 'pingpong']
+
+
+def isNumber(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# =============================================================================
+# ANIMATIONS
+# =============================================================================
+
+class Animation:
+    """
+    One property of one object, animated through a list of (frame, value)
+    keyframes. Between two keyframes with different numbers the value is
+    eased from one to the other; otherwise (the same number, or values like
+    colors that can't be in-between, or step=True) the first value is held
+    until the next keyframe.
+
+    repeat is None (stop at the last keyframe), 'loop' (jump back to the
+    first keyframe) or 'pingpong' (play backwards to the first keyframe,
+    then forwards again, and so on).
+    """
+
+    def __init__(self, timeline, target, name, keys, easing='linear',
+                 repeat=None, step=False, startFrame=0):
+        if not keys:
+            raise ValueError('an animation needs at least one keyframe')
+        if repeat not in REPEAT_MODES:
+            raise ValueError(f'repeat must be one of {REPEAT_MODES}, not {repeat!r}')
+        keys = sorted(keys, key=lambda key: key[0])
+        self.timeline = timeline
+        self.target = target
+        self.name = name
+        self.times = [frame for frame, value in keys]
+        self.values = [value for frame, value in keys]
+        self.duration = self.times[-1]
+        self.easing = EASINGS[easing] if isinstance(easing, str) else easing
+        self.repeat = repeat
+        self.step = step
+        self.startFrame = startFrame
+        self.value = None
+        self.cancelled = False
+        self.finished = False
+
+    def position(self, t):
+        """
+        Where in the keyframes (0 to duration) the animation is, `t` frames
+        after it started, and whether it is playing forwards.
+        """
+        duration = self.duration
+        if duration <= 0 or self.repeat is None:
+            return min(t, duration), True
+        if self.repeat == 'loop':
+            return t % duration, True
+        t %= 2 * duration
+        if t < duration:
+            return t, True
+        return 2 * duration - t, False
+
+    def segment(self, p):
+        """The index of the keyframe at or just before position p."""
+        return bisect.bisect_right(self.times, p) - 1
+
+    def moving(self, i):
+        """True if the value changes smoothly between keyframes i and i + 1."""
+        if self.step or i + 1 >= len(self.times):
+            return False
+        start, end = self.values[i], self.values[i + 1]
+        return isNumber(start) and isNumber(end) and start != end
+
+    def valueAt(self, p):
+        i = max(self.segment(p), 0)
+        if not self.moving(i):
+            return self.values[i]
+        t0, t1 = self.times[i], self.times[i + 1]
+        start, end = self.values[i], self.values[i + 1]
+        return start + (end - start) * self.easing((p - t0) / (t1 - t0))
+
+    def update(self, frame):
+        """
+        Sets the property to its value on `frame` (if it changed) and
+        returns the next frame on which the value will change, or None if
+        the animation is over.
+        """
+        t = frame - self.startFrame
+        p, forwards = self.position(t)
+        value = self.valueAt(p)
+        if value != self.value:
+            self.value = value
+            if self.name is None:
+                self.target(value)
+            else:
+                setattr(self.target, self.name, value)
+
+        if (self.repeat is None or self.duration <= 0) and t >= self.duration:
+            return None
+
+        i = max(self.segment(p), 0)
+        if self.moving(i if forwards else i - 1 if p == self.times[i] else i):
+            return frame + 1
+        if forwards:
+            # Holding: nothing changes until the next keyframe (or the end,
+            # where a loop jumps back and a ping-pong turns around)
+            if i + 1 < len(self.times):
+                wait = self.times[i + 1] - p
+            else:
+                wait = self.duration - p if self.repeat == 'loop' else 1
+        else:
+            # Playing backwards: the value changes as soon as the position
+            # drops below this keyframe
+            wait = p - self.times[i] + 1 if i + 1 < len(self.times) else 1
+        return frame + max(1, math.ceil(wait))
+
+    def cancel(self):
+        """Stops the animation, leaving the property where it is."""
+        if not self.cancelled and not self.finished:
+            self.cancelled = True
+            self.timeline.active -= 1
+
+
+# =============================================================================
+# TIMELINE
+# =============================================================================
+
+class Timeline:
+    """
+    Runs any number of animations. Call step() once per frame (from
+    onStep). `frame` counts the steps so far; `updates` is how many
+    animations were due on the last step and `active` how many are still
+    running.
+    """
+
+    def __init__(self):
+        self.frame = 0
+        self.queue = []         # (next frame, order added, animation)
+        self.added = 0
+        self.updates = 0
+        self.active = 0
+
+    def keyframes(self, target, name, keys, easing='linear', repeat=None,
+                  delay=0, step=False):
+        """
+        Animates target.name through `keys`, a list of (frame, value) pairs
+        with frames counted from the start of the animation. The animation
+        starts `delay` frames after the next step (which shows the first
+        keyframe). Returns the Animation.
+        """
+        start = self.frame + 1 + delay
+        animation = Animation(self, target, name, keys, easing, repeat, step,
+                              startFrame=start)
+        self.schedule(animation, start)
+        self.active += 1
+        return animation
+
+    def tween(self, target, name, start, end, frames, easing='linear',
+              repeat=None, delay=0):
+        """Animates target.name from `start` to `end` over `frames` frames."""
+        return self.keyframes(target, name, [(0, start), (frames, end)],
+                              easing, repeat, delay)
+
+    def schedule(self, animation, frame):
+        heapq.heappush(self.queue, (frame, self.added, animation))
+        self.added += 1
+
+    def step(self):
+        """
+        Advances one frame and updates only the animations that are due.
+        Returns the number of animations updated.
+        """
+        self.frame += 1
+        frame = self.frame
+        queue = self.queue
+        updates = 0
+        while queue and queue[0][0] <= frame:
+            due, order, animation = heapq.heappop(queue)
+            if animation.cancelled:
+                continue
+            updates += 1
+            nextFrame = animation.update(frame)
+            if nextFrame is None:
+                animation.finished = True
+                self.active -= 1
+            else:
+                self.schedule(animation, nextFrame)
+        self.updates = updates
+        return updates
+
+    def __len__(self):
+        return self.active